@@ -0,0 +1,85 @@
+"""Benchmark memory held by discovered workspaces in a large monorepo.
+
+Run with `python -m benchmarks.bench_discovery_memory`.
+"""
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from poetry_workspaces_plugin.config import Config
+from poetry_workspaces_plugin.discovery import get_workspaces
+
+
+N_WORKSPACES = 2000
+
+
+def make_repo(root: Path, n: int):
+    (root / 'pyproject.toml').write_text(
+        '[tool.poetry-workspaces-plugin]\nworkspaces = ["packages/*"]\n'
+    )
+
+    for i in range(n):
+        workspace = root / 'packages' / f'package-{i}'
+        workspace.mkdir(parents=True)
+
+        dependencies = ',\n'.join(f'    "dependency-{j} (>={j}.0)"' for j in range(i % 40))
+
+        (workspace / 'pyproject.toml').write_text(
+            '[project]\n'
+            f'name = "package-{i}"\n'
+            'version = "0.1.0"\n'
+            'requires-python = ">=3.11"\n'
+            f'dependencies = [\n{dependencies}\n]\n'
+            '\n'
+            '[dependency-groups]\n'
+            'test = ["pytest (>=8.0)"]\n'
+        )
+
+
+def measure(label, load):
+    gc.collect()
+    tracemalloc.start()
+
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f'{label}: {elapsed * 1000:.0f} ms, {current / 2**20:.1f} MiB held,'
+        f' {peak / 2**20:.1f} MiB peak'
+    )
+
+    return result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+
+        make_repo(root, N_WORKSPACES)
+
+        config = Config(workspaces=['packages/*'])
+
+        workspaces = measure(
+            f'records ({N_WORKSPACES} workspaces)',
+            lambda: get_workspaces(config, root / 'pyproject.toml'),
+        )
+
+        del workspaces
+
+        measure(
+            f'full documents ({N_WORKSPACES} workspaces)',
+            lambda: [
+                workspace.pyproject.data_raw
+                for workspace in get_workspaces(config, root / 'pyproject.toml')
+            ],
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark hashing workspace sources cold and with a warm stat cache.
+
+Set `BENCH_HASHING_MB` to change the total size of the generated sources.
+Run with `python -m benchmarks.bench_hashing`.
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from poetry_workspaces_plugin import hashing
+from poetry_workspaces_plugin.hashing import StatCache, hash_directories
+
+
+N_WORKSPACES = 50
+FILE_SIZE = 256 * 1024
+TOTAL_MB = int(os.environ.get('BENCH_HASHING_MB', '512'))
+
+
+def make_repo(root: Path) -> list[Path]:
+    n_files = TOTAL_MB * 2**20 // FILE_SIZE // N_WORKSPACES
+    block = os.urandom(FILE_SIZE)
+    old = time.time_ns() - 10 * hashing.RACY_INTERVAL_NS
+
+    workspace_dirs = []
+
+    for i in range(N_WORKSPACES):
+        workspace_dir = root / 'packages' / f'package-{i}'
+        source_dir = workspace_dir / 'src' / f'package_{i}'
+        source_dir.mkdir(parents=True)
+
+        (workspace_dir / 'pyproject.toml').write_text(f'[project]\nname = "package-{i}"\n')
+
+        for j in range(n_files):
+            path = source_dir / f'module_{j}.py'
+            path.write_bytes(block[j:] + block[:j])
+
+        for path in [workspace_dir / 'pyproject.toml', *source_dir.iterdir()]:
+            os.utime(path, ns=(old, old))
+
+        workspace_dirs.append(workspace_dir)
+
+    return workspace_dirs
+
+
+def measure(label, run):
+    start = time.perf_counter()
+    run()
+    print(f'{label}: {(time.perf_counter() - start) * 1000:.0f} ms')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        workspace_dirs = make_repo(root)
+        cache_path = root / 'hash-stat.bin'
+
+        print(f'{TOTAL_MB} MiB in {N_WORKSPACES} workspaces')
+
+        measure('cold', lambda: hash_directories(root, workspace_dirs, None, StatCache(cache_path)))
+        measure('warm', lambda: hash_directories(root, workspace_dirs, None, StatCache(cache_path)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Benchmark locking several lock groups one after another and on threads.
+
+Resolution itself is CPU-bound and holds the GIL, so threads can only help by overlapping
+the time the solver waits on package indexes. Packages are served from memory, optionally
+with a delay per lookup that stands in for the requests to an index.
+Run with `python -m benchmarks.bench_lock_groups`.
+"""
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from unittest import mock
+
+from poetry.core.packages.dependency import Dependency
+from poetry.core.packages.package import Package
+from poetry.repositories import Repository, RepositoryPool
+
+from benchmarks.bench_workspaces_poetry import SynchronousExecutor
+from testing.utils import create_synthetic_repo, run
+
+
+N_GROUPS = 4
+N_PACKAGES = 40
+N_VERSIONS = 30
+LATENCY_SECONDS = 0.005
+
+
+class SlowRepository(Repository):
+    """Repository that waits before every lookup, as an index on the network would."""
+
+    def __init__(self, name, packages, latency: float):
+        super().__init__(name, packages)
+
+        self._latency = latency
+
+    def find_packages(self, dependency):
+        time.sleep(self._latency)
+
+        return super().find_packages(dependency)
+
+
+def create_packages() -> list[Package]:
+    packages = []
+
+    for i in range(N_PACKAGES):
+        for v in range(N_VERSIONS):
+            package = Package(f'dep-{i}', f'1.{v}.0')
+
+            for j in range(i + 1, min(i + 4, N_PACKAGES)):
+                package.add_dependency(Dependency(f'dep-{j}', f'>=1.{v // 2}'))
+
+            packages.append(package)
+
+    return packages
+
+
+def create_repo(root: Path):
+    create_synthetic_repo(root, 0)
+
+    for group in range(N_GROUPS):
+        workspace_dir = root / 'packages' / f'group-{group}'
+        (workspace_dir / f'group_{group}').mkdir(parents=True)
+        (workspace_dir / f'group_{group}' / '__init__.py').write_text('')
+
+        dependencies = ', '.join(
+            f'"dep-{(group * 5 + k) % N_PACKAGES}>=1.0"' for k in range(5)
+        )
+
+        (workspace_dir / 'pyproject.toml').write_text(
+            '[project]\n'
+            f'name = "group-{group}"\n'
+            'version = "0.1.0"\n'
+            'requires-python = ">=3.11,<4.0"\n'
+            f'dependencies = [{dependencies}]\n'
+        )
+
+    root_path = root / 'pyproject.toml'
+    root_path.write_text(
+        root_path.read_text()
+        + '\n[tool.poetry-workspaces-plugin.lock-groups]\n'
+        + ''.join(f'group-{g} = ["packages/group-{g}"]\n' for g in range(1, N_GROUPS))
+    )
+
+
+def lock(packages: list[Package], threads: bool, latency: float) -> float:
+    from poetry_workspaces_plugin.commands import lock as lock_module
+    from poetry_workspaces_plugin.factory import Factory
+
+    def create_pool(*args, **kwargs):
+        return RepositoryPool([SlowRepository('local', packages, latency)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / 'repo'
+
+        create_repo(root)
+
+        with mock.patch.object(Factory, 'create_pool', create_pool):
+            if threads:
+                executor = nullcontext()
+            else:
+                executor = mock.patch.object(
+                    lock_module, 'ThreadPoolExecutor', lambda **kwargs: SynchronousExecutor()
+                )
+
+            with executor:
+                start = time.perf_counter()
+
+                result = run(root, ['poetry', 'lock'])
+
+                elapsed = time.perf_counter() - start
+
+        assert f'to poetry.group-{N_GROUPS - 1}.lock' in result.output, result.error_output
+
+        return elapsed
+
+
+def main():
+    packages = create_packages()
+
+    # Warm up imports shared by every variant
+    lock(packages, threads=False, latency=0)
+
+    print(f'{N_GROUPS} lock groups, {N_PACKAGES} packages of {N_VERSIONS} versions')
+
+    for latency in (0, LATENCY_SECONDS):
+        for label, threads in (('sequential', False), ('threads', True)):
+            elapsed = min(lock(packages, threads, latency) for _ in range(3))
+
+            print(f'{label:>12}: {elapsed:.3f}s with {latency * 1000:g}ms per lookup')
+
+
+if __name__ == '__main__':
+    main()
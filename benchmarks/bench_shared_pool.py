@@ -0,0 +1,133 @@
+"""Benchmark index requests made while resolving metadata for every workspace.
+
+A local simple index stands in for the private package index and counts requests.
+Run with `python -m benchmarks.bench_shared_pool`.
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+N_WORKSPACES = 50
+N_PACKAGES = 40
+N_DEPENDENCIES = 15
+
+requests: Counter[str] = Counter()
+
+
+class IndexHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        requests[self.path] += 1
+
+        name = self.path.strip('/').split('/')[-1]
+        links = '\n'.join(
+            f'<a href="/files/{name}-{v}.0.tar.gz">{name}-{v}.0.tar.gz</a>' for v in range(1, 6)
+        )
+        body = f'<html><body>\n{links}\n</body></html>'.encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_repo(root: Path, url: str):
+    (root / 'pyproject.toml').write_text(
+        '[project]\nname = "root"\nversion = "0.1.0"\nrequires-python = ">=3.11"\n\n'
+        '[tool.poetry-workspaces-plugin]\nworkspaces = ["packages/*"]\n\n'
+        f'[[tool.poetry.source]]\nname = "local"\nurl = "{url}"\npriority = "primary"\n'
+    )
+
+    for i in range(N_WORKSPACES):
+        workspace = root / 'packages' / f'workspace-{i}'
+        workspace.mkdir(parents=True)
+
+        dependencies = ',\n'.join(
+            f'    "package-{(i + j) % N_PACKAGES} (>=1.0)"' for j in range(N_DEPENDENCIES)
+        )
+
+        (workspace / 'pyproject.toml').write_text(
+            '[project]\n'
+            f'name = "workspace-{i}"\n'
+            'version = "0.1.0"\n'
+            'requires-python = ">=3.11"\n'
+            f'dependencies = [\n{dependencies}\n]\n'
+        )
+
+
+def run(root: Path, shared: bool):
+    from poetry_workspaces_plugin.config import Config
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.discovery import get_workspaces
+    from poetry_workspaces_plugin.factory import Factory
+    from poetry_workspaces_plugin.pyproject import PyProjectTOML
+
+    config = Config(workspaces=['packages/*'])
+    root_pyproject = PyProjectTOML(root / 'pyproject.toml')
+    context = Context(
+        root_pyproject,
+        root_pyproject,
+        get_workspaces(config, root_pyproject.path),
+        config=config,
+    )
+
+    requests.clear()
+    start = time.perf_counter()
+
+    for workspace_pyproject in context.workspaces_pyprojects:
+        workspace_context = Context(
+            root_pyproject,
+            workspace_pyproject,
+            [],
+            config=config,
+            pool_cache=context.pool_cache if shared else {},
+        )
+
+        poetry = Factory().create_poetry(workspace_context)
+
+        for dependency in poetry.package.all_requires:
+            poetry.pool.find_packages(dependency)
+
+    elapsed = time.perf_counter() - start
+
+    return elapsed, sum(requests.values()), max(requests.values())
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), IndexHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    url = f'http://127.0.0.1:{server.server_address[1]}/simple'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep Poetry's HTTP caches out of the user's cache directory
+        os.environ['POETRY_CACHE_DIR'] = str(Path(tmp) / 'cache')
+
+        root = Path(tmp) / 'repo'
+        root.mkdir()
+
+        make_repo(root, url)
+
+        print(f'{N_WORKSPACES} workspaces, {N_DEPENDENCIES} dependencies each, {N_PACKAGES} packages')
+
+        for shared in (False, True):
+            elapsed, total, most = run(root, shared)
+
+            label = 'shared pool' if shared else 'pool per context'
+
+            print(f'{label:>18}: {elapsed:.3f}s, {total} requests, at most {most} per page')
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark applying a merged pyproject diff to a target with large dependency lists.
+
+Run with `python -m benchmarks.bench_update_from_diff`.
+"""
+import timeit
+from copy import deepcopy
+
+import tomlkit
+
+from poetry_workspaces_plugin.utils import update_from_diff
+
+
+# Entries of the dependency list, and how many of them are replaced by new ones
+SIZES = [(1000, 10), (1000, 500), (2000, 1000)]
+REPEAT = 5
+
+
+def make_target(n: int):
+    # Parsed rather than built item by item, which tomlkit does in quadratic time
+    lines = ''.join(f'    "package-{i} (>={i % 10}.0)",\n' for i in range(n))
+
+    return tomlkit.parse(f'[project]\nname = "bench"\ndependencies = [\n{lines}]\n')
+
+
+def bench(n_entries: int, n_changed: int):
+    target = make_target(n_entries)
+
+    old = target.unwrap()
+    new = deepcopy(old)
+
+    dependencies = new['project']['dependencies']
+
+    del dependencies[:n_changed]
+    dependencies.extend(f'added-{i} (>=1.0)' for i in range(n_changed))
+
+    # Copies are made up front so only the diff application itself is timed
+    documents = [deepcopy(target) for _ in range(REPEAT + 1)]
+
+    def run():
+        document = documents.pop()
+
+        update_from_diff(old, new, document)
+
+        return document
+
+    document = run()
+
+    assert len(document['project']['dependencies']) == n_entries
+
+    apply_time = min(timeit.repeat(run, number=1, repeat=REPEAT))
+    dump_time = min(timeit.repeat(lambda: tomlkit.dumps(document), number=1, repeat=REPEAT))
+
+    print(
+        f'update_from_diff ({n_entries} entries, {n_changed} changed):'
+        f' {apply_time * 1000:.1f} ms, tomlkit.dumps after diff: {dump_time * 1000:.1f} ms'
+    )
+
+
+def main():
+    for n_entries, n_changed in SIZES:
+        bench(n_entries, n_changed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark building the Poetry instance of every workspace during an install.
+
+Building a Poetry instance is CPU-bound, so threads can only help by overlapping the
+builds with the install of the root's dependencies, which mostly waits on downloads and
+installer processes. A sleep on the main thread stands in for that install.
+Run with `python -m benchmarks.bench_workspaces_poetry`.
+"""
+import tempfile
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from pathlib import Path
+
+from testing.utils import create_synthetic_repo
+
+
+N_WORKSPACES = 200
+INSTALL_SECONDS = 1.0
+
+
+class SynchronousExecutor(Executor):
+    """Executor that runs each call as it is submitted."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+
+        return future
+
+
+def create_context(root: Path):
+    from poetry_workspaces_plugin.config import Config
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.discovery import get_workspaces
+    from poetry_workspaces_plugin.pyproject import PyProjectTOML
+
+    config = Config(workspaces=['packages/*'])
+    root_pyproject = PyProjectTOML(root / 'pyproject.toml')
+
+    return Context(
+        root_pyproject,
+        root_pyproject,
+        get_workspaces(config, root_pyproject.path),
+        config=config,
+    )
+
+
+def run(root: Path, max_workers: int | None, install: bool) -> float:
+    from poetry_workspaces_plugin.factory import Factory
+
+    context = create_context(root)
+
+    start = time.perf_counter()
+
+    if max_workers == 0:
+        executor = SynchronousExecutor()
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    with executor:
+        futures = Factory().create_workspaces_poetry(context, executor)
+
+        if install:
+            time.sleep(INSTALL_SECONDS)
+
+        for future in futures.values():
+            future.result()
+
+    return time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / 'repo'
+
+        create_synthetic_repo(root, N_WORKSPACES)
+
+        # Warm up imports and caches shared by every variant
+        run(root, 0, install=False)
+
+        print(f'{N_WORKSPACES} workspaces, {INSTALL_SECONDS:g}s install of dependencies')
+
+        for label, max_workers in (
+            ('sequential', 0),
+            ('one thread', 1),
+            ('thread pool', None),
+        ):
+            builds = min(run(root, max_workers, install=False) for _ in range(3))
+            total = min(run(root, max_workers, install=True) for _ in range(3))
+
+            print(f'{label:>12}: {builds:.3f}s builds alone, {total:.3f}s with install')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,16 @@
 import pytest
+from contextlib import contextmanager
 from pytest import FixtureRequest
 from pathlib import Path
 from poetry.toml import TOMLFile
 from tomlkit import table
 
+from poetry_workspaces_plugin import counters
+from poetry_workspaces_plugin.config import Config
 from poetry_workspaces_plugin.constants import SECTION_KEY
+from poetry_workspaces_plugin.context import Context
+from poetry_workspaces_plugin.discovery import get_workspaces
+from poetry_workspaces_plugin.pyproject import PyProjectTOML
 
 from testing.utils import create_project_pyproject, create_poetry_pyproject
 
@@ -74,3 +80,50 @@ def test_package(tmp_path: Path, request: FixtureRequest):
         workspace_files.append(workspace_file)
 
     return root_file, workspace_files
+
+
+@pytest.fixture
+def create_context(test_package):
+    """Create a context for the root of the test package, with the given configuration.
+
+        context = create_context(merge_mode='intersect')
+    """
+    root_file, _ = test_package
+
+    def create(**options) -> Context:
+        config = Config(workspaces=['packages/*'], **options)
+        root_pyproject = PyProjectTOML(root_file.path)
+
+        return Context(
+            root_pyproject,
+            root_pyproject,
+            get_workspaces(config, root_file.path),
+            config=config,
+        )
+
+    return create
+
+
+@pytest.fixture
+def operation_budget():
+    """Assert upper bounds on the operations counted while running a block.
+
+        with operation_budget(create_poetry=2, merge_data=2):
+            run(...)
+    """
+    @contextmanager
+    def budget(**bounds: int):
+        counters.reset()
+
+        yield counters.COUNTERS
+
+        counts = counters.snapshot()
+        exceeded = {
+            operation: f'{counts[operation]} > {bound}'
+            for operation, bound in bounds.items()
+            if counts[operation] > bound
+        }
+
+        assert not exceeded, f'Operation counts over budget: {exceeded}'
+
+    return budget
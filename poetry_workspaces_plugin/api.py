@@ -0,0 +1,190 @@
+"""Read-only Python API for querying workspaces without starting Poetry.
+
+    from poetry_workspaces_plugin import api
+
+    project = api.load('path/to/monorepo')
+
+    for workspace in project.workspaces:
+        print(workspace.name, workspace.version, project.dependents(workspace.name))
+"""
+from __future__ import annotations
+
+import json
+import tomllib
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+
+from packaging.utils import canonicalize_name
+
+from poetry_workspaces_plugin.config import Config
+from poetry_workspaces_plugin.constants import SECTION_KEY
+from poetry_workspaces_plugin.discovery import WorkspaceInfo, get_workspaces, is_poetry_project
+from poetry_workspaces_plugin.utils import get_path
+
+
+if TYPE_CHECKING:
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.lock_index import LockIndex
+
+
+@dataclass(frozen=True)
+class Workspace:
+    name: str
+    version: str
+    # Directory of the workspace, relative to the root project
+    path: str
+    dependencies: list[str]
+    workspace_dependencies: list[str]
+
+    @classmethod
+    def from_info(cls, info: WorkspaceInfo, root_dir: Path) -> Workspace:
+        return cls(
+            name=info.name,
+            version=info.version,
+            path=info.path.parent.relative_to(root_dir).as_posix(),
+            dependencies=list(info.dependencies),
+            workspace_dependencies=list(info.workspace_dependencies),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class Project:
+    name: str
+    # Absolute path of the root project directory
+    root: str
+    workspaces: list[Workspace]
+    config: Config = field(repr=False, compare=False)
+    # Directory the project was loaded from, which selects the lock group of `lock_index`
+    cwd: str | None = field(default=None, repr=False, compare=False)
+
+    @cached_property
+    def workspaces_by_name(self) -> dict[str, Workspace]:
+        return {canonicalize_name(workspace.name): workspace for workspace in self.workspaces}
+
+    @cached_property
+    def graph(self) -> dict[str, list[str]]:
+        """Names of the workspaces each workspace depends on."""
+        return {
+            workspace.name: [
+                self.workspaces_by_name[name].name
+                for name in workspace.dependencies
+                if name in self.workspaces_by_name
+            ]
+            for workspace in self.workspaces
+        }
+
+    def dependents(self, name: str) -> list[str]:
+        """Get the names of the workspaces that depend on a workspace directly."""
+        workspace = self.workspaces_by_name[canonicalize_name(name)]
+
+        return [other for other, names in self.graph.items() if workspace.name in names]
+
+    @cached_property
+    def context(self) -> Context:
+        """Plugin context of the project, targeting the project it was loaded from."""
+        from poetry_workspaces_plugin.context import Context
+        from poetry_workspaces_plugin.pyproject import PyProjectTOML, locate_poetry_pyproject
+
+        root_pyproject = PyProjectTOML(Path(self.root) / 'pyproject.toml')
+
+        return Context(
+            root_pyproject=root_pyproject,
+            target_pyproject=locate_poetry_pyproject(self.cwd or self.root) or root_pyproject,
+            workspaces=get_workspaces(self.config, root_pyproject.path),
+            config=self.config,
+        )
+
+    @cached_property
+    def lock_index(self) -> LockIndex | None:
+        """Index of the lock file of the target's lock group, None when it is not locked yet."""
+        from poetry_workspaces_plugin.lock_groups import load_lock_index
+
+        context = self.context.for_target_lock_group()
+
+        return load_lock_index(context, context.lock_group)
+
+    def locked_versions(self, package: str) -> list[str]:
+        """Get the versions of a package in the lock file of the target's lock group."""
+        return self.lock_index.versions(package) if self.lock_index else []
+
+    def hashes(self, names: Iterable[str] | None = None) -> dict[str, str]:
+        """Hash the source files of workspaces, all of them by default, by workspace name."""
+        from poetry_workspaces_plugin.hashing import STAT_CACHE_FILE, StatCache, hash_directories
+
+        root = Path(self.root)
+        workspaces = self.workspaces
+
+        if names is not None:
+            workspaces = [self.workspaces_by_name[canonicalize_name(name)] for name in names]
+
+        hashes = hash_directories(
+            root,
+            [root / workspace.path for workspace in self.workspaces],
+            None if names is None else [root / workspace.path for workspace in workspaces],
+            StatCache(root / self.config.cache_dir / STAT_CACHE_FILE),
+        )
+
+        return {workspace.name: hashes[root / workspace.path] for workspace in workspaces}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'name': self.name,
+            'root': self.root,
+            'workspaces': [workspace.to_dict() for workspace in self.workspaces],
+            'graph': self.graph,
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+def find_root(cwd: str | Path | None = None) -> Path | None:
+    """Get the nearest ancestor pyproject.toml that has managed workspaces."""
+    cwd = Path(cwd or Path.cwd()).resolve()
+
+    for directory in [cwd, *cwd.parents]:
+        path = directory / 'pyproject.toml'
+
+        try:
+            with path.open('rb') as f:
+                data = tomllib.load(f)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+
+        if is_poetry_project(data) and get_path(data, f'tool.{SECTION_KEY}') is not None:
+            return path
+
+
+def load(root: str | Path | None = None) -> Project:
+    """Load the project whose root is found from a directory, the working directory by default."""
+    root_path = find_root(root)
+
+    if root_path is None:
+        raise FileNotFoundError(
+            'Could not find a pyproject.toml file with plugin configuration in'
+            f' {root or Path.cwd()} or its parents.'
+        )
+
+    with root_path.open('rb') as f:
+        data = tomllib.load(f)
+
+    config = Config()
+    config.load(data['tool'][SECTION_KEY])
+
+    name = get_path(data, 'project.name') or get_path(data, 'tool.poetry.name') or ''
+
+    return Project(
+        name=name,
+        root=root_path.parent.as_posix(),
+        workspaces=[
+            Workspace.from_info(info, root_path.parent)
+            for info in get_workspaces(config, root_path)
+        ],
+        config=config,
+        cwd=Path(root or Path.cwd()).resolve().as_posix(),
+    )
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from importlib import metadata
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import tomlkit
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+from poetry_workspaces_plugin.hashing import hash_tree
+from poetry_workspaces_plugin.utils import get_path
+
+
+if TYPE_CHECKING:
+    from poetry.installation.chef import Chef
+
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.pyproject import PyProjectTOML
+
+
+def link_or_copy(source: Path, destination: Path):
+    """Hardlink a file to a destination, falling back to a copy across devices."""
+    destination.unlink(missing_ok=True)
+
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def builds_with_installed_poetry_core(pyproject: PyProjectTOML) -> bool:
+    """Check whether Poetry builds a project in process, with its own poetry-core.
+
+    Poetry only does so when poetry-core alone builds the project, at a version that the
+    installed one satisfies, and otherwise builds it in an isolated environment.
+    """
+    requires = get_path(pyproject.data_raw, 'build-system.requires') or []
+
+    if len(requires) != 1 or get_path(pyproject.data_raw, 'tool.poetry.build'):
+        return False
+
+    try:
+        requirement = Requirement(requires[0])
+    except InvalidRequirement:
+        return False
+
+    return (
+        canonicalize_name(requirement.name) == 'poetry-core' and
+        requirement.url is None and
+        requirement.specifier.contains(metadata.version('poetry-core'), prereleases=True)
+    )
+
+
+def get_build_cache_key(
+    pyproject: PyProjectTOML,
+    workspace_versions: dict[str, str],
+    distribution: str,
+    config_settings: dict[str, Any] | None = None,
+    isolated: bool = False,
+) -> str:
+    """Get the cache key of a workspace build artifact.
+
+    The key covers the workspace source tree, its pyproject as rendered with the current
+    workspace versions, and the build backend that will produce the artifact. That is
+    the installed poetry-core for builds in process, and otherwise the backend as
+    required by the project, as isolated builds install it from that requirement.
+    """
+    build_system = pyproject.data_raw.get('build-system', {})
+
+    if not isolated and builds_with_installed_poetry_core(pyproject):
+        backend_version = metadata.version('poetry-core')
+    else:
+        backend_version = None
+
+    components = {
+        'distribution': distribution,
+        'source': hash_tree(pyproject.path.parent),
+        'pyproject': tomlkit.dumps(pyproject.render(workspace_versions)),
+        'backend': build_system.get('build-backend'),
+        'requires': get_path(build_system, 'requires'),
+        'backend-version': backend_version,
+        'config-settings': config_settings or {},
+    }
+
+    content = json.dumps(components, sort_keys=True, default=str)
+
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class WheelCache:
+    """Content-addressed store of workspace build artifacts with LRU eviction.
+
+    Each entry is a directory named after its cache key. The modification time of an
+    entry is refreshed on every hit, and the least recently used entries are evicted
+    once the total size of the cache exceeds max_size bytes.
+    """
+
+    def __init__(self, directory: Path, max_size: int) -> None:
+        self.directory = directory
+        self.max_size = max_size
+
+    @classmethod
+    def from_context(cls, context: Context) -> WheelCache:
+        return cls(context.cache_dir / 'wheels', context.config.wheel_cache_size * 1024 * 1024)
+
+    def get(self, key: str) -> list[Path] | None:
+        """Get the cached artifacts for a key, marking the entry as recently used."""
+        entry = self.directory / key
+
+        if not entry.is_dir():
+            return
+
+        artifacts = sorted(p for p in entry.iterdir() if not p.name.startswith('.'))
+
+        if not artifacts:
+            return
+
+        os.utime(entry)
+
+        return artifacts
+
+    def put(self, key: str, artifacts: list[Path]) -> list[Path]:
+        """Store the artifacts for a key and evict entries beyond the size bound."""
+        entry = self.directory / key
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        staging = Path(tempfile.mkdtemp(prefix=f'.{key}.', dir=self.directory))
+
+        try:
+            # Copied, as builders write artifacts in place, which would change a linked entry
+            for artifact in artifacts:
+                shutil.copy2(artifact, staging / artifact.name)
+
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(staging, entry)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict(keep=key)
+
+        return sorted(entry.iterdir())
+
+    def evict(self, keep: str | None = None):
+        """Remove the least recently used entries until the cache fits its size bound."""
+        if not self.directory.is_dir():
+            return
+
+        entries = []
+        total = 0
+
+        for entry in self.directory.iterdir():
+            if not entry.is_dir() or entry.name.startswith('.'):
+                continue
+
+            size = sum(p.stat().st_size for p in entry.iterdir())
+
+            entries.append((entry.stat().st_mtime, size, entry))
+            total += size
+
+        for _, size, entry in sorted(entries):
+            if total <= self.max_size:
+                break
+
+            if entry.name == keep:
+                continue
+
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+class CachingChef:
+    """Wrap a Chef so that non-editable workspace wheels are reused from the wheel cache."""
+
+    def __init__(self, chef: Chef, context: Context, cache: WheelCache) -> None:
+        self._chef = chef
+        self._context = context
+        self._cache = cache
+
+    def __getattr__(self, name: str):
+        return getattr(self._chef, name)
+
+    def prepare(self, archive: Path, output_dir: Path | None = None, **kwargs) -> Path:
+        pyproject = None
+
+        if not kwargs.get('editable') and archive.is_dir():
+            path = (archive / 'pyproject.toml').resolve()
+            if workspace := self._context.workspaces_by_path.get(path):
+                pyproject = workspace.pyproject
+
+        if pyproject is None:
+            return self._chef.prepare(archive, output_dir, **kwargs)
+
+        # The chef always builds in an isolated environment
+        key = get_build_cache_key(
+            pyproject,
+            self._context.workspace_versions,
+            'wheel',
+            kwargs.get('config_settings'),
+            isolated=True,
+        )
+
+        destination = output_dir or Path(tempfile.mkdtemp(prefix='poetry-chef-'))
+
+        if cached := self._cache.get(key):
+            wheel = destination / cached[0].name
+
+            # The executor removes the prepared wheel once installed, so it gets a copy
+            shutil.copy2(cached[0], wheel)
+
+            return wheel
+
+        wheel = self._chef.prepare(archive, destination, **kwargs)
+
+        self._cache.put(key, [wheel])
+
+        return wheel
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from importlib.metadata import version as package_version
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+from packaging.utils import canonicalize_name
+from poetry.core.constraints.version import Version, parse_constraint
+from poetry.core.factory import Factory as BaseFactory
+
+from poetry_workspaces_plugin import counters
+from poetry_workspaces_plugin.pyproject import (
+    PyProjectTOML,
+    parse_workspace_pep_508,
+    parse_workspace_version,
+    render_version,
+)
+from poetry_workspaces_plugin.utils import get_path
+
+
+if TYPE_CHECKING:
+    from poetry_workspaces_plugin.context import Context
+
+
+# Bump whenever checks change, so that cached results are not reused
+CHECK_VERSION = 1
+
+
+@dataclass
+class CheckResult:
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+def iter_workspace_references(data: dict[str, Any]) -> Iterator[tuple[str, str, str]]:
+    """Yield the location, package name and specification of every `workspace:` reference."""
+    sections = {'project.dependencies': get_path(data, 'project.dependencies') or []}
+
+    for parent in ('project.optional-dependencies', 'dependency-groups', 'project.dependency-groups'):
+        for group, requirements in (get_path(data, parent) or {}).items():
+            sections[f'{parent}.{group}'] = requirements
+
+    for location, requirements in sections.items():
+        for requirement in requirements:
+            if isinstance(requirement, str) and 'workspace:' in requirement:
+                match = parse_workspace_pep_508(requirement)
+                name = match.group('name') if match else requirement.split('@')[0].strip()
+
+                yield location, name, requirement
+
+    tables = {'tool.poetry.dependencies': get_path(data, 'tool.poetry.dependencies') or {}}
+
+    for group, group_table in (get_path(data, 'tool.poetry.group') or {}).items():
+        tables[f'tool.poetry.group.{group}.dependencies'] = group_table.get('dependencies') or {}
+
+    for location, table in tables.items():
+        for name, spec in table.items():
+            if isinstance(spec, dict):
+                spec = spec.get('version', '')
+
+            if isinstance(spec, str) and 'workspace:' in spec:
+                yield location, name, spec
+
+
+def check_references(data: dict[str, Any], versions: dict[str, str]) -> list[str]:
+    """Check that every `workspace:` reference names a workspace and matches its version."""
+    errors = []
+
+    # References name workspaces as any package, which are matched by normalized name
+    versions = {canonicalize_name(name): version for name, version in versions.items()}
+
+    for location, name, spec in iter_workspace_references(data):
+        if location.startswith('tool.poetry'):
+            match = parse_workspace_version(spec)
+        else:
+            match = parse_workspace_pep_508(spec)
+
+        if match is None:
+            errors.append(f'{location}: invalid workspace reference "{spec}"')
+
+            continue
+
+        canonical_name = canonicalize_name(name)
+
+        if canonical_name not in versions:
+            errors.append(f'{location}: "{name}" is not a workspace')
+
+            continue
+
+        version = versions[canonical_name]
+        rendered = render_version(match.groupdict(), canonical_name, versions)
+
+        if rendered and not parse_constraint(rendered).allows(Version.parse(version)):
+            errors.append(
+                f'{location}: "{spec}" does not match the version of workspace "{name}"'
+                f' ({version})'
+            )
+
+    return errors
+
+
+def check_workspace(path: str, versions: dict[str, str]) -> CheckResult:
+    """Validate a workspace pyproject with its references rendered, as Poetry will see it."""
+    pyproject = PyProjectTOML(Path(path))
+
+    try:
+        data = pyproject.render(versions)
+    except Exception as e:
+        return CheckResult(errors=[f'invalid pyproject.toml: {e}'])
+
+    counters.count(counters.VALIDATE)
+
+    result = BaseFactory.validate(data)
+
+    return CheckResult(
+        errors=[*check_references(pyproject.data_raw, versions), *result['errors']],
+        warnings=list(result['warnings']),
+    )
+
+
+def check_merged(context: Context) -> CheckResult:
+    """Validate the document merged for each lock group and look for conflicting constraints."""
+    from poetry_workspaces_plugin.conflicts import find_conflicts, format_conflict
+    from poetry_workspaces_plugin.merge import merge_data
+
+    errors = []
+    warnings = []
+
+    for group_context in context.with_target(context.root_pyproject).split_lock_groups():
+        merged = merge_data(group_context)
+
+        counters.count(counters.VALIDATE)
+
+        result = BaseFactory.validate(merged)
+
+        errors.extend(result['errors'])
+        errors.extend(format_conflict(conflict) for conflict in find_conflicts(group_context))
+        warnings.extend(result['warnings'])
+
+    return CheckResult(errors=errors, warnings=warnings)
+
+
+def get_check_key(content: bytes, versions: dict[str, str]) -> str:
+    digest = hashlib.sha256(content)
+    digest.update(json.dumps(versions, sort_keys=True).encode())
+    digest.update(f'{CHECK_VERSION}:{package_version("poetry-core")}'.encode())
+
+    return digest.hexdigest()
+
+
+class CheckCache:
+    """Results of previous checks by the hash of everything they depend on."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+        try:
+            self._entries: dict[str, dict[str, list[str]]] = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self._entries = {}
+
+        self._used: dict[str, dict[str, list[str]]] = {}
+
+    def get(self, key: str) -> CheckResult | None:
+        if (entry := self._entries.get(key)) is None:
+            return None
+
+        self._used[key] = entry
+
+        return CheckResult(**entry)
+
+    def put(self, key: str, result: CheckResult):
+        self._used[key] = asdict(result)
+
+    def save(self):
+        # Only keep the results of the current contents
+        if self._used == self._entries:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self._used))
@@ -1,19 +1,46 @@
+from __future__ import annotations
+
 from abc import abstractmethod
-from typing import cast
+from typing import TYPE_CHECKING, cast
 
 from poetry.console.commands.command import Command
 
 from poetry_workspaces_plugin.context import Context
 
 
-class BaseCommand(Command):
-    name: str  # type: ignore[reportIncompatibleVariableOverride]
+if TYPE_CHECKING:
+    from poetry_workspaces_plugin.plugin import WorkspacesPlugin
+
+
+class PluginCommand:
+    """Command created by the plugin, which runs in the context the plugin binds to it.
+
+    That is the context of the current project, unless `poetry workspace` runs the
+    command for one of its workspaces.
+    """
+
+    # Whether the command builds the Poetry instance it runs with, rather than the plugin
+    builds_poetry = False
 
-    def __init__(self, context: Context | None) -> None:
-        self.context = cast(Context, context)
+    def __init__(self, plugin: WorkspacesPlugin) -> None:
+        self._plugin = plugin
 
         super().__init__()
 
+    @property
+    def context(self) -> Context | None:
+        return self._plugin.get_command_context(self)  # type: ignore[arg-type]
+
+
+class BaseCommand(PluginCommand, Command):
+    name: str  # type: ignore[reportIncompatibleVariableOverride]
+
+    builds_poetry = True
+
+    @property
+    def context(self) -> Context:
+        return cast(Context, super().context)
+
     @abstractmethod
     def _handle(self) -> int: ...
 
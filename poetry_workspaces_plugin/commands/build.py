@@ -1,25 +1,128 @@
+import shutil
+from pathlib import Path
+
 from poetry.console.commands.build import BuildCommand as BaseBuildCommand
+from poetry.utils.helpers import remove_directory
 
-from poetry_workspaces_plugin.context import Context
+from poetry_workspaces_plugin.cache import WheelCache, get_build_cache_key
+from poetry_workspaces_plugin.commands.base import PluginCommand
+from poetry_workspaces_plugin.constants import LOG_PREFIX
 from poetry_workspaces_plugin.factory import Factory
 
 
-class BuildCommand(BaseBuildCommand):
+ARTIFACT_SUFFIXES = {'sdist': '.tar.gz', 'wheel': '.whl'}
 
-    def __init__(self, context: Context | None) -> None:
-        super().__init__()
 
-        self.context = context
+def get_formats(fmt: str | None) -> list[str]:
+    """Get the formats to build for the `--format` option, as Poetry does."""
+    if not fmt or fmt == 'all':
+        return list(ARTIFACT_SUFFIXES)
 
-    def handle(self) -> int:
-        if self.context and self.context.should_manage:
-            workspaces = {wp.name: wp.version for wp in self.context.workspaces_pyprojects}
+    return [fmt]
+
+
+def get_config_settings(local_version: str | None, config_settings: list[str]) -> dict[str, str]:
+    """Get the config settings passed to the build backend, as Poetry parses them."""
+    result = {}
+
+    if local_version:
+        result['local-version'] = local_version
+
+    for config_setting in config_settings or []:
+        key, separator, value = config_setting.partition('=')
+
+        if not separator:
+            raise ValueError(
+                f'Invalid config setting format: {config_setting}. '
+                "Config settings must be in the format 'key=value'"
+            )
+
+        result[key] = value
 
-            self.context.target_pyproject.set_workspaces(workspaces)
+    return result
 
-            poetry = Factory().create_poetry(self.context)
+
+class BuildCommand(PluginCommand, BaseBuildCommand):
+
+    # The Poetry instance with pinned workspaces is built in `handle`
+    builds_poetry = True
+
+    def handle(self) -> int:
+        if self.context and self.context.should_manage:
+            # Built packages require the workspaces they reference at their current versions
+            poetry = Factory().create_poetry(self.context.with_pinned_workspaces())
 
             self.set_poetry(poetry)
 
+            if self.context.target_is_managed and poetry.is_package_mode:
+                return self._handle_cached()
+
         return super().handle()
 
+    def _handle_cached(self) -> int:
+        """Restore artifacts from the wheel cache, or build and store them."""
+        assert self.context
+
+        cache = WheelCache.from_context(self.context)
+
+        config_settings = get_config_settings(
+            self.option('local-version'), self.option('config-settings')
+        )
+
+        keys = {
+            fmt: get_build_cache_key(
+                self.context.target_pyproject,
+                self.context.workspace_versions,
+                fmt,
+                config_settings,
+            )
+            for fmt in get_formats(self.option('format'))
+        }
+
+        dist_dir = Path(self.option('output'))
+
+        if not dist_dir.is_absolute():
+            dist_dir = self.poetry.pyproject_path.parent / dist_dir
+
+        cached = {fmt: cache.get(key) for fmt, key in keys.items()}
+
+        if all(cached.values()):
+            package = self.poetry.package
+
+            self.line(f'Building <c1>{package.pretty_name}</c1> (<c2>{package.version}</c2>)')
+
+            if self.option('clean'):
+                remove_directory(path=dist_dir, force=True)
+
+            dist_dir.mkdir(parents=True, exist_ok=True)
+
+            for fmt, artifacts in cached.items():
+                self.line(f'{LOG_PREFIX} Using cached <info>{fmt}</info>')
+
+                # Copied, as the next build writes its artifacts over these in place
+                for artifact in artifacts or []:
+                    shutil.copy2(artifact, dist_dir / artifact.name)
+
+            return 0
+
+        before = self._snapshot(dist_dir)
+
+        if (res := super().handle()) != 0:
+            return res
+
+        built = [p for p, mtime in self._snapshot(dist_dir).items() if before.get(p) != mtime]
+
+        for fmt, key in keys.items():
+            artifacts = [p for p in built if p.name.endswith(ARTIFACT_SUFFIXES[fmt])]
+
+            if artifacts:
+                cache.put(key, artifacts)
+
+        return 0
+
+    @staticmethod
+    def _snapshot(directory: Path) -> dict[Path, int]:
+        if not directory.is_dir():
+            return {}
+
+        return {p: p.stat().st_mtime_ns for p in directory.iterdir() if p.is_file()}
@@ -1,22 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from poetry.console.application import Application
 from poetry.console.commands.install import InstallCommand as BaseInstallCommand
+from poetry.masonry.builders.editable import EditableBuilder
+from poetry.utils.env import Env
 
+from poetry_workspaces_plugin.cache import CachingChef, WheelCache
+from poetry_workspaces_plugin.commands.base import PluginCommand
 from poetry_workspaces_plugin.constants import LOG_PREFIX
 from poetry_workspaces_plugin.context import Context
+from poetry_workspaces_plugin.environments import (
+    WheelStore,
+    create_isolated_installer,
+    get_isolated_context,
+    get_workspace_env,
+)
 from poetry_workspaces_plugin.factory import Factory
+from poetry_workspaces_plugin.lock_groups import get_lock_group_env
 
 
-class InstallCommand(BaseInstallCommand):
-
-    def __init__(self, context: Context | None) -> None:
-        super().__init__()
-
-        self.context = context
+class InstallCommand(PluginCommand, BaseInstallCommand):
 
     def handle(self) -> int:
         if not self.context or not self.context.should_manage:
             return super().handle()
 
-        self.line(f'{LOG_PREFIX} Installing dependencies for all workspaces')
+        if self.context.config.isolated_environments:
+            return self._install_isolated(self.context)
+
+        # Installing the root installs every lock group, otherwise only the group of the target
+        if self.context.target_is_root:
+            contexts = self.context.split_lock_groups()
+        else:
+            contexts = [self.context.for_target_lock_group()]
+
+        options = {
+            name: self.option(name)
+            for name in ('with', 'only', 'without', 'all-groups', 'no-root', 'only-root')
+        }
+
+        root_env = self.env
+
+        for i, context in enumerate(contexts):
+            if i > 0:
+                self._switch_lock_group(context, options, root_env)
+
+            if (res := self._install_context(context)) != 0:
+                return res
+
+        return 0
+
+    def _switch_lock_group(self, context: Context, options: dict, root_env: Env):
+        """Point the command at the Poetry, environment and installer of another group."""
+        for name, value in options.items():
+            self.io.input.set_option(name, value)
+
+        poetry = Factory().get_poetry(context)
+
+        self.set_poetry(poetry)
+        self.set_env(get_lock_group_env(context, poetry.config, self.io) or root_env)
+
+        Application.configure_installer_for_command(self, self.io)
+
+    def _install_context(self, context: Context) -> int:
+        if context.lock_group is None:
+            self.line(f'{LOG_PREFIX} Installing dependencies for all workspaces')
+        else:
+            self.line('')
+            self.line(
+                f'{LOG_PREFIX} Installing dependencies for lock group <c1>{context.lock_group}</c1>'
+            )
+
+        # Reuse wheels of workspaces installed non-editably from the wheel cache
+        executor = self.installer.executor
+        executor._chef = CachingChef(
+            executor._chef,
+            context,
+            WheelCache.from_context(context),
+        )
 
         # opt_with = self.option('with')
         opt_only = self.option('only')
@@ -28,6 +89,30 @@ class InstallCommand(BaseInstallCommand):
 
         self.io.input.set_option('no-root', True)
 
+        # Building is CPU-bound, so a single thread overlaps it with the install, which
+        # waits on downloads and installer processes, and more threads only contend for
+        # the GIL (see benchmarks/bench_workspaces_poetry.py)
+        build_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='poetry-workspaces')
+
+        try:
+            return self._install(context, build_pool, opt_only, opt_no_root, opt_only_root)
+        finally:
+            build_pool.shutdown(cancel_futures=True)
+
+    def _install(
+        self,
+        context: Context,
+        build_pool: ThreadPoolExecutor,
+        opt_only,
+        opt_no_root,
+        opt_only_root,
+    ) -> int:
+        workspaces_poetry = {}
+
+        # Build the Poetry instances of the workspace root installs while dependencies install
+        if opt_only_root or not (opt_only or opt_no_root):
+            workspaces_poetry = Factory().create_workspaces_poetry(context, build_pool)
+
         # Run initial install
         if not opt_only_root:
             self.line('')
@@ -53,32 +138,80 @@ class InstallCommand(BaseInstallCommand):
         self.io.input.set_option('no-root', False)
         self.io.input.set_option('only-root', True)
 
-        self.line('')
-        self.line(f'{LOG_PREFIX} Running root install for project root')
-        self.line('')
+        # The root project belongs to the default group
+        if context.lock_group is None:
+            self.line('')
+            self.line(f'{LOG_PREFIX} Running root install for project root')
+            self.line('')
 
-        self.set_poetry(
-            Factory().create_poetry(
-                Context(self.context.root_pyproject, self.context.root_pyproject, [])
-            )
-        )
+            self.set_poetry(Factory().get_poetry(context.root_only()))
 
-        if (res := super().handle()) != 0:
-            return res
+            if (res := super().handle()) != 0:
+                return res
 
-        for wp in self.context.workspaces_pyprojects:
+        for wp in context.workspaces_pyprojects:
             self.line('')
             self.line(f'{LOG_PREFIX} Running root install for workspace <c1>{wp.path.parent.name}</c1>')
             self.line('')
 
-            self.set_poetry(
-                Factory().create_poetry(
-                    Context(self.context.root_pyproject, wp, [])
-                )
-            )
+            self.set_poetry(workspaces_poetry[wp.path].result())
 
             if (res := super().handle()) != 0:
                 return res
 
         return 0
 
+    def _install_isolated(self, context: Context) -> int:
+        """Install each workspace into its own environment, the root project into none."""
+        if context.target_is_root:
+            workspaces = context.workspaces
+        else:
+            workspaces = [context.workspaces_by_path[context.target_pyproject.path]]
+
+        store = WheelStore.from_context(context)
+        build_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='poetry-workspaces')
+
+        try:
+            for workspace in workspaces:
+                self.line('')
+                self.line(
+                    f'{LOG_PREFIX} Installing workspace <c1>{workspace.name}</c1>'
+                    ' into its own environment'
+                )
+                self.line('')
+
+                env = get_workspace_env(workspace, self.poetry.config, self.io)
+                isolated = get_isolated_context(context, workspace)
+
+                installer = create_isolated_installer(context, isolated, env, self.io, store)
+                installer.only_groups(self.activated_groups)
+                installer.dry_run(self.option('dry-run'))
+                installer.requires_synchronization(self._with_synchronization)
+                installer.executor.enable_bytecode_compilation(self.option('compile'))
+                installer.verbose(self.io.is_verbose())
+
+                if (res := installer.run()) != 0:
+                    return res
+
+                if self.option('no-root') or self.option('dry-run'):
+                    continue
+
+                # The workspace and those it references are installed editable
+                members = Factory().create_workspaces_poetry(isolated, build_pool)
+
+                for future in members.values():
+                    poetry = future.result()
+
+                    if not poetry.is_package_mode:
+                        continue
+
+                    self.line(
+                        f'<b>Installing</> <c1>{poetry.package.pretty_name}</c1>'
+                        f' (<c2>{poetry.package.pretty_version}</>) in editable mode'
+                    )
+
+                    EditableBuilder(poetry, env, self.io).build()
+        finally:
+            build_pool.shutdown(cancel_futures=True)
+
+        return 0
@@ -0,0 +1,185 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from cleo.helpers import option
+from cleo.io.buffered_io import BufferedIO
+from cleo.io.io import IO
+from poetry.console.commands.lock import LockCommand as BaseLockCommand
+from poetry.installation.installer import Installer
+from poetry.poetry import Poetry
+from poetry.puzzle.exceptions import SolverProblemError
+from poetry.repositories.repository_pool import RepositoryPool
+from poetry.utils.env import Env
+
+from poetry_workspaces_plugin.commands.base import PluginCommand
+from poetry_workspaces_plugin.conflicts import find_conflicts, format_conflict
+from poetry_workspaces_plugin.constants import LOG_PREFIX
+from poetry_workspaces_plugin.context import Context
+from poetry_workspaces_plugin.factory import Factory
+from poetry_workspaces_plugin.lock_groups import get_lock_filename, get_lock_group_env
+from poetry_workspaces_plugin.locking import (
+    PinnedRepositoryPool,
+    get_pinned_packages,
+    get_unpinned_packages,
+)
+from poetry_workspaces_plugin.merge import Provenance, merge_data
+
+
+class LockCommand(PluginCommand, BaseLockCommand):
+
+    options = [
+        *BaseLockCommand.options,
+        option(
+            'partial',
+            None,
+            'Only re-solve packages affected by constraints that changed since the lock'
+            ' file was written, holding every other package at its locked version.',
+        ),
+    ]
+
+    def handle(self) -> int:
+        if not self.context or not self.context.should_manage:
+            return super().handle()
+
+        # Locking the root locks every group, otherwise only the group of the target
+        if self.context.target_is_root:
+            contexts = self.context.split_lock_groups()
+        else:
+            contexts = [self.context.for_target_lock_group()]
+
+        if self.context.config.check_conflicts:
+            conflicts = [conflict for context in contexts for conflict in find_conflicts(context)]
+
+            if conflicts:
+                for conflict in conflicts:
+                    self.line_error(f' {format_conflict(conflict)}')
+
+                self.line_error(
+                    f'{LOG_PREFIX} Found <c1>{len(conflicts)}</c1> conflicting constraints,'
+                    ' not locking',
+                    'error',
+                )
+
+                return 1
+
+        if len(contexts) > 1:
+            return self._lock_groups(contexts)
+
+        return self._lock(self.context, self.poetry, self.env, self.io)
+
+    def _lock(self, context: Context, poetry: Poetry, env: Env, io: IO) -> int:
+        partial = self.option('partial') or self.context.config.partial_lock
+
+        if partial and not self.option('regenerate') and poetry.locker.is_locked():
+            locked_packages = poetry.locker.locked_repository().packages
+
+            unpinned = get_unpinned_packages(poetry.package, locked_packages)
+            pinned = get_pinned_packages(locked_packages, unpinned)
+
+            io.write_line(
+                f'{LOG_PREFIX} Re-solving <c1>{len(unpinned)}</c1> changed packages and holding'
+                f' <c1>{len(pinned)}</c1> at their locked versions'
+            )
+
+            pool = PinnedRepositoryPool(poetry.pool, pinned, config=poetry.config)
+            installer = create_installer(poetry, env, io, pool)
+
+            try:
+                installer.lock(update=False)
+
+                return installer.run()
+
+            except SolverProblemError as e:
+                io.write_line('')
+                io.write_line(f'{LOG_PREFIX} Partial solve failed, falling back to a full solve')
+
+                if io.is_verbose():
+                    io.write_line(str(e))
+
+        installer = create_installer(poetry, env, io, poetry.pool)
+        installer.lock(update=self.option('regenerate'))
+
+        try:
+            return installer.run()
+        except SolverProblemError:
+            explain_combined_constraints(context, io)
+
+            raise
+
+    def _lock_groups(self, contexts: list[Context]) -> int:
+        """Lock every group on its own thread.
+
+        Solving holds the GIL, so threads only overlap the time that groups wait on package
+        indexes, which benchmarks/bench_lock_groups.py measures.
+        """
+        # Copied before any thread starts, so that groups share no documents or repositories,
+        # as nothing guarantees that they are thread-safe
+        detached = [context.detached() for context in contexts]
+
+        with ThreadPoolExecutor(thread_name_prefix='poetry-workspaces-lock') as executor:
+            futures = [executor.submit(self._lock_group, context) for context in detached]
+
+            res = 0
+
+            for context, future in zip(contexts, futures):
+                group_res, io = future.result()
+
+                self.line('')
+                self.line(
+                    f'{LOG_PREFIX} Locked <c1>{len(context.workspaces)}</c1> workspaces to'
+                    f' <c1>{get_lock_filename(context.lock_group)}</c1>'
+                )
+                self.line('')
+
+                self.io.write(io.fetch_output())
+                self.io.write_error(io.fetch_error())
+
+                res = res or group_res
+
+        return res
+
+    def _lock_group(self, context: Context) -> tuple[int, BufferedIO]:
+        io = BufferedIO(decorated=self.io.output.is_decorated())
+        io.set_verbosity(self.io.output.verbosity)
+
+        poetry = Factory().create_poetry(context)
+        env = get_lock_group_env(context, poetry.config, io) or self.env
+
+        try:
+            return self._lock(context, poetry, env, io), io
+        except Exception as e:
+            io.write_error_line(f'<error>{e}</error>')
+
+            return 1, io
+
+
+def explain_combined_constraints(context: Context, io: IO):
+    """Show which declarations the constraints that the solver was given combine."""
+    if context.config.merge_mode != 'intersect':
+        return
+
+    provenance: Provenance = {}
+
+    merge_data(context.for_target_lock_group(), provenance)
+
+    for section, packages in provenance.items():
+        for name, declarations in packages.items():
+            sources = ', '.join(
+                f'<c1>{source}</c1> requires <b>{constraint}</b>'
+                for source, constraint in declarations
+            )
+
+            io.write_error_line(f'{LOG_PREFIX} Combined <c1>{name}</c1> in {section}: {sources}')
+
+
+def create_installer(poetry: Poetry, env: Env, io: IO, pool: RepositoryPool) -> Installer:
+    """Create an installer like the one Poetry creates for its commands, with another pool."""
+    return Installer(
+        io,
+        env,
+        poetry.package,
+        poetry.locker,
+        pool,
+        poetry.config,
+        disable_cache=poetry.disable_cache,
+        build_constraints=poetry.build_constraints,
+    )
@@ -0,0 +1,106 @@
+import tarfile
+
+import pytest
+
+from poetry_workspaces_plugin.cache import get_build_cache_key
+from poetry_workspaces_plugin.pyproject import PyProjectTOML
+from testing.utils import run
+
+
+def test_reuses_cached_wheel(test_package):
+    root_file, workspace_files = test_package
+
+    root = root_file.path.parent
+    dist_dir = workspace_files[0].path.parent / 'dist'
+
+    args = ['poetry', 'workspace', 'project-a', '--', 'build', '--format', 'wheel']
+
+    result = run(root, args)
+
+    assert 'Using cached' not in result.output
+
+    wheels = list(dist_dir.glob('*.whl'))
+
+    assert len(wheels) == 1
+
+    wheels[0].unlink()
+
+    result = run(root, args)
+
+    assert 'Using cached wheel' in result.output
+    assert [p.name for p in dist_dir.glob('*.whl')] == [wheels[0].name]
+
+
+def test_rebuilds_when_sources_change(test_package):
+    root_file, workspace_files = test_package
+
+    root = root_file.path.parent
+    workspace_dir = workspace_files[0].path.parent
+
+    args = ['poetry', 'workspace', 'project-a', '--', 'build', '--format', 'wheel']
+
+    run(root, args)
+
+    (workspace_dir / 'project_a' / '__init__.py').write_text('VALUE = 1\n')
+
+    result = run(root, args)
+
+    assert 'Using cached' not in result.output
+
+
+def test_rebuilds_leave_cached_artifacts_unchanged(test_package):
+    root_file, workspace_files = test_package
+
+    root = root_file.path.parent
+    workspace_dir = workspace_files[0].path.parent
+    source = workspace_dir / 'project_a' / '__init__.py'
+
+    args = ['poetry', 'workspace', 'project-a', '--', 'build', '--format', 'sdist']
+
+    source.write_text('VALUE = 0\n')
+    run(root, args)
+
+    # The builder writes the sdist of the changed source over the one in dist/
+    source.write_text('VALUE = 1\n')
+    run(root, args)
+
+    source.write_text('VALUE = 0\n')
+    result = run(root, args)
+
+    assert 'Using cached sdist' in result.output
+
+    (sdist,) = (workspace_dir / 'dist').glob('*.tar.gz')
+
+    with tarfile.open(sdist) as archive:
+        member = next(m for m in archive.getnames() if m.endswith('project_a/__init__.py'))
+
+        assert archive.extractfile(member).read() == b'VALUE = 0\n'
+
+
+@pytest.mark.parametrize(
+    ('requires', 'in_process'),
+    [
+        ('"poetry-core>=1.0"', True),
+        ('"poetry-core<1.0"', False),
+        ('"setuptools>=61"', False),
+    ],
+)
+def test_cache_key_covers_installed_poetry_core_for_builds_in_process(
+    tmp_path, mocker, requires, in_process
+):
+    path = tmp_path / 'pyproject.toml'
+    path.write_text(
+        '[project]\nname = "demo"\nversion = "0.1.0"\n\n'
+        f'[build-system]\nrequires = [{requires}]\nbuild-backend = "backend"\n'
+    )
+    pyproject = PyProjectTOML(path)
+
+    key = get_build_cache_key(pyproject, {}, 'wheel')
+    isolated_key = get_build_cache_key(pyproject, {}, 'wheel', isolated=True)
+
+    mocker.patch('poetry_workspaces_plugin.cache.metadata.version', return_value='1.9.0')
+
+    assert (get_build_cache_key(pyproject, {}, 'wheel') != key) == in_process
+
+    # Isolated builds install the backend from its requirement instead
+    assert get_build_cache_key(pyproject, {}, 'wheel', isolated=True) == isolated_key
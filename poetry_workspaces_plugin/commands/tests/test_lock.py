@@ -0,0 +1,159 @@
+from pathlib import Path
+
+import tomlkit
+from poetry.core.packages.dependency import Dependency
+from poetry.core.packages.package import Package
+from poetry.repositories import Repository, RepositoryPool
+
+from poetry_workspaces_plugin.factory import Factory
+from testing.utils import create_synthetic_repo, run
+
+
+def create_package(name, version, requires=()):
+    package = Package(name, version)
+
+    for dependency_name, constraint in requires:
+        package.add_dependency(Dependency(dependency_name, constraint))
+
+    return package
+
+
+def create_repository_pool(*packages):
+    return RepositoryPool([Repository('local', [create_package(*p) for p in packages])])
+
+
+def get_locked_versions(root_dir: Path, filename: str = 'poetry.lock') -> dict[str, str]:
+    lock = tomlkit.parse((root_dir / filename).read_text())
+
+    return {p['name']: p['version'] for p in lock['package']}
+
+
+def add_dependency(root_dir: Path, workspace: str, requirement: str):
+    path = root_dir / 'packages' / workspace / 'pyproject.toml'
+    content = tomlkit.parse(path.read_text())
+    content['project']['dependencies'].append(requirement)
+    path.write_text(tomlkit.dumps(content))
+
+
+def test_locks_groups_to_their_own_files(tmp_path: Path, mocker):
+    root_dir = tmp_path / 'repo'
+
+    create_synthetic_repo(root_dir, 2)
+    add_dependency(root_dir, 'package-1', 'dep>=1.0')
+
+    workspace_dir = root_dir / 'packages' / 'data-0'
+    (workspace_dir / 'data_0').mkdir(parents=True)
+    (workspace_dir / 'data_0' / '__init__.py').write_text('')
+    (workspace_dir / 'pyproject.toml').write_text(
+        '[project]\n'
+        'name = "data-0"\n'
+        'version = "0.1.0"\n'
+        'requires-python = ">=3.11,<4.0"\n'
+        'dependencies = ["data-dep>=1.0"]\n'
+    )
+
+    root_path = root_dir / 'pyproject.toml'
+    root_path.write_text(
+        root_path.read_text()
+        + '\n[tool.poetry-workspaces-plugin.lock-groups]\ndata = ["packages/data-*"]\n'
+    )
+
+    # Every group builds a pool of its own
+    create_pool = mocker.patch.object(Factory, 'create_pool')
+    create_pool.side_effect = lambda *args, **kwargs: create_repository_pool(
+        ('dep', '1.0.0'), ('data-dep', '1.0.0')
+    )
+
+    result = run(root_dir, ['poetry', 'lock'])
+
+    assert 'Locked 2 workspaces to poetry.lock' in result.output
+    assert 'Locked 1 workspaces to poetry.data.lock' in result.output
+
+    # Each lock file only holds the dependencies of its own group
+    assert get_locked_versions(root_dir) == {'dep': '1.0.0'}
+    assert get_locked_versions(root_dir, 'poetry.data.lock') == {'data-dep': '1.0.0'}
+
+    # Both lock files are fresh, so locking again writes neither
+    result = run(root_dir, ['poetry', 'lock'])
+
+    assert 'Writing lock file' not in result.output
+
+
+def test_partial_lock_holds_unchanged_packages(tmp_path: Path, mocker):
+    root_dir = tmp_path / 'repo'
+
+    create_synthetic_repo(root_dir, 2)
+    add_dependency(root_dir, 'package-0', 'dep>=1.0')
+
+    create_pool = mocker.patch.object(Factory, 'create_pool')
+    create_pool.return_value = create_repository_pool(('dep', '1.0.0'), ('other', '1.0.0'))
+
+    run(root_dir, ['poetry', 'lock'])
+
+    assert get_locked_versions(root_dir)['dep'] == '1.0.0'
+
+    create_pool.return_value = create_repository_pool(
+        ('dep', '1.0.0'), ('dep', '2.0.0'), ('other', '1.0.0')
+    )
+    add_dependency(root_dir, 'package-1', 'other>=1.0')
+
+    result = run(root_dir, ['poetry', 'lock', '--partial'])
+
+    assert 'Re-solving 1 changed packages and holding 1 at their locked versions' in result.output
+    assert 'falling back' not in result.output
+
+    versions = get_locked_versions(root_dir)
+
+    assert versions['dep'] == '1.0.0'
+    assert versions['other'] == '1.0.0'
+
+
+def test_partial_lock_falls_back_to_full_solve(tmp_path: Path, mocker):
+    root_dir = tmp_path / 'repo'
+
+    create_synthetic_repo(root_dir, 2)
+    add_dependency(root_dir, 'package-0', 'dep>=1.0')
+
+    create_pool = mocker.patch.object(Factory, 'create_pool')
+    create_pool.return_value = create_repository_pool(('dep', '1.0.0'))
+
+    run(root_dir, ['poetry', 'lock'])
+
+    # The new package needs a newer version of a package that is held
+    create_pool.return_value = create_repository_pool(
+        ('dep', '1.0.0'), ('dep', '2.0.0'), ('other', '1.0.0', [('dep', '>=2.0')])
+    )
+    add_dependency(root_dir, 'package-1', 'other>=1.0')
+
+    result = run(root_dir, ['poetry', 'lock', '--partial'])
+
+    assert 'Partial solve failed, falling back to a full solve' in result.output
+
+    versions = get_locked_versions(root_dir)
+
+    assert versions['dep'] == '2.0.0'
+    assert versions['other'] == '1.0.0'
+
+
+def test_shows_combined_constraints_when_solving_fails(tmp_path: Path, mocker):
+    root_dir = tmp_path / 'repo'
+
+    create_synthetic_repo(root_dir, 2)
+    add_dependency(root_dir, 'package-0', 'dep>=1.0')
+    add_dependency(root_dir, 'package-1', 'dep<=2.0')
+
+    root_path = root_dir / 'pyproject.toml'
+    root_path.write_text(
+        root_path.read_text().replace('workspaces = ', 'merge-mode = "intersect"\nworkspaces = ')
+    )
+
+    create_pool = mocker.patch.object(Factory, 'create_pool')
+    create_pool.return_value = create_repository_pool(('dep', '3.0.0'))
+
+    result = run(root_dir, ['poetry', 'lock'])
+
+    assert (
+        'Combined dep in project.dependencies: package-0 requires dep>=1.0,'
+        ' package-1 requires dep<=2.0'
+    ) in result.error_output
+    assert not (root_dir / 'poetry.lock').exists()
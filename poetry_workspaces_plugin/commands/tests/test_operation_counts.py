@@ -0,0 +1,89 @@
+"""Bounds on the expensive operations of commands, as linear functions of the number of
+workspaces, so that an extra parse or render per workspace fails these tests."""
+from pathlib import Path
+
+import pytest
+
+from testing.utils import create_synthetic_repo, run
+
+
+N = 6
+
+
+@pytest.fixture
+def synthetic_repo(tmp_path: Path) -> Path:
+    root_dir = tmp_path / 'repo'
+
+    create_synthetic_repo(root_dir, N)
+
+    return root_dir
+
+
+def test_workspaces_list(synthetic_repo, operation_budget):
+    with operation_budget(
+        toml_parse=N + 2,
+        pyproject_render=4,
+        deepcopy=4,
+        validate=2,
+        merge_data=0,
+        create_poetry=0,
+        create_pool=0,
+    ):
+        result = run(synthetic_repo, ['poetry', 'workspaces', 'list'])
+
+    assert result.error_output == ''
+
+
+def test_install(synthetic_repo, operation_budget):
+    run(synthetic_repo, ['poetry', 'lock'])
+
+    with operation_budget(
+        toml_parse=2 * N + 2,
+        pyproject_render=3 * N + 8,
+        deepcopy=5 * N + 12,
+        validate=2 * N + 6,
+        merge_data=N + 2,
+        create_poetry=N + 2,
+        create_pool=1,
+    ):
+        result = run(synthetic_repo, ['poetry', 'install'])
+
+    assert 'Installing the current project' in result.output
+
+
+def test_build(synthetic_repo, operation_budget):
+    run(synthetic_repo, ['poetry', 'lock'])
+
+    with operation_budget(
+        toml_parse=2 * N + 2,
+        pyproject_render=N + 6,
+        deepcopy=2 * N + 8,
+        validate=6,
+        # One for the root environment and one with the workspaces of the target pinned
+        merge_data=2,
+        create_poetry=2,
+        create_pool=1,
+    ):
+        run(synthetic_repo, ['poetry', 'workspace', 'package-1', 'build'])
+
+    assert list((synthetic_repo / 'packages' / 'package-1' / 'dist').glob('*.whl'))
+
+
+def test_add(synthetic_repo, operation_budget):
+    run(synthetic_repo, ['poetry', 'lock'])
+
+    with operation_budget(
+        toml_parse=2 * N + 2,
+        pyproject_render=N + 8,
+        deepcopy=2 * N + 12,
+        validate=6,
+        merge_data=2,
+        create_poetry=2,
+        create_pool=1,
+    ):
+        run(
+            synthetic_repo,
+            ['poetry', 'workspace', 'package-0', '--', 'add', '--lock', '../../vendor/lib'],
+        )
+
+    assert 'lib' in (synthetic_repo / 'packages' / 'package-0' / 'pyproject.toml').read_text()
@@ -0,0 +1,42 @@
+import pytest
+
+from poetry_workspaces_plugin.factory import Factory
+from testing.utils import run
+
+
+@pytest.mark.parametrize(
+    ('workspace'),
+    ('project-a', 'packages/project-a'),
+    ids=('name', 'path'),
+)
+def test_runs_command_in_workspace(test_package, workspace):
+    root_file, _ = test_package
+
+    result = run(root_file.path.parent, ['poetry', 'workspace', workspace, 'version'])
+
+    assert result.error_output == ''
+    assert result.output.strip().endswith('project-a 0.1.0')
+
+    # Poetry's own commands are run in the target context without being changed
+    assert not hasattr(result.app.get('version'), 'context')
+
+
+def test_builds_each_poetry_once(test_package, mocker):
+    root_file, _ = test_package
+
+    create_poetry = mocker.spy(Factory, 'create_poetry')
+
+    result = run(root_file.path.parent, ['poetry', 'workspace', 'project-b', 'version'])
+
+    assert result.output.strip().endswith('project-b 0.1.0')
+
+    # One for the root environment and one for the target workspace
+    assert create_poetry.call_count == 2
+
+
+def test_raises_for_unknown_workspace(test_package):
+    root_file, _ = test_package
+
+    result = run(root_file.path.parent, ['poetry', 'workspace', 'project-c', 'version'])
+
+    assert 'Could not find a project with the name: project-c' in result.error_output
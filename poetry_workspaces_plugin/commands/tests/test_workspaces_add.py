@@ -0,0 +1,55 @@
+from poetry_workspaces_plugin.constants import SECTION_KEY
+from poetry_workspaces_plugin.utils import get_dependency_from_pyproject
+from testing.utils import run
+
+
+def test_dry_run_leaves_files_unchanged(test_package):
+    root_file, workspace_files = test_package
+
+    before = [wf.path.read_text() for wf in workspace_files]
+
+    result = run(
+        root_file.path.parent,
+        ['poetry', 'workspaces', 'add', '--to', 'project-a,project-b', '--dry-run', 'attrs>=23.0'],
+    )
+
+    assert result.error_output == ''
+    assert 'Adding attrs (>=23.0) to project-a' in result.output
+    assert 'Adding attrs (>=23.0) to project-b' in result.output
+    assert [wf.path.read_text() for wf in workspace_files] == before
+
+
+def test_skips_workspaces_with_the_package(test_package):
+    root_file, _ = test_package
+
+    result = run(
+        root_file.path.parent,
+        ['poetry', 'workspaces', 'add', '--to', 'project-a', '--dry-run', 'pydantic>=2.5'],
+    )
+
+    assert 'already depends on pydantic' in result.output
+    assert 'Lock file and environment unchanged.' in result.output
+
+
+def test_restores_all_files_when_resolution_fails(test_package):
+    root_file, workspace_files = test_package
+
+    # Make lock stop on the conflict introduced below rather than resolving
+    content = root_file.read()
+    content['tool'][SECTION_KEY]['check-conflicts'] = True
+    root_file.write(content)
+
+    lock_path = root_file.path.parent / 'poetry.lock'
+    lock_path.write_text('# previous lock\n')
+
+    before = [wf.path.read_text() for wf in workspace_files]
+
+    result = run(
+        root_file.path.parent,
+        ['poetry', 'workspaces', 'add', '-t', 'project-b', '-t', 'project-a', 'pydantic<2.0'],
+    )
+
+    assert 'restoring all changed files' in result.error_output
+    assert [wf.path.read_text() for wf in workspace_files] == before
+    assert lock_path.read_text() == '# previous lock\n'
+    assert get_dependency_from_pyproject(workspace_files[1].path, 'pydantic') is None
@@ -0,0 +1,60 @@
+from testing.utils import run
+
+
+def add_workspace_reference(file, name, version=''):
+    content = file.read()
+
+    if 'project' in content:
+        content['project']['dependencies'].append(f'{name} @ workspace:{version}')
+    else:
+        content['tool']['poetry']['dependencies'][name] = f'workspace:{version}'
+
+    file.write(content)
+
+
+def test_passes_and_caches_results(test_package):
+    root_file, workspace_files = test_package
+
+    root_dir = root_file.path.parent
+
+    add_workspace_reference(workspace_files[1], 'project-a', '^')
+
+    result = run(root_dir, ['poetry', 'workspaces', 'check'])
+
+    assert result.error_output == ''
+    assert 'Checked 2 workspaces, 0 unchanged' in result.output
+    assert (root_dir / '.poetry-workspaces' / 'check.json').exists()
+
+    result = run(root_dir, ['poetry', 'workspaces', 'check'])
+
+    assert 'Checked 2 workspaces, 2 unchanged' in result.output
+
+    add_workspace_reference(workspace_files[0], 'numpy', '')
+
+    result = run(root_dir, ['poetry', 'workspaces', 'check'])
+
+    assert 'Checked 2 workspaces, 1 unchanged' in result.output
+
+
+def test_collects_all_errors(test_package, mocker):
+    from poetry_workspaces_plugin.commands import workspaces_check
+
+    # Check workspaces on worker processes even for this small project
+    mocker.patch.object(workspaces_check, 'PARALLEL_THRESHOLD', 1)
+
+    root_file, workspace_files = test_package
+
+    add_workspace_reference(workspace_files[0], 'project-z', '^')
+    add_workspace_reference(workspace_files[1], 'project-a', '^2.0')
+
+    result = run(root_file.path.parent, ['poetry', 'workspaces', 'check'])
+
+    assert '"project-z" is not a workspace' in result.error_output
+    assert 'does not match the version of workspace "project-a" (0.1.0)' in result.error_output
+    assert 'Found 2 errors' in result.error_output
+
+    # Failures are cached as well
+    result = run(root_file.path.parent, ['poetry', 'workspaces', 'check'])
+
+    assert 'Checked 2 workspaces, 2 unchanged' in result.output
+    assert 'Found 2 errors' in result.error_output
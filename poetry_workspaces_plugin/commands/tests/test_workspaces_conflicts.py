@@ -0,0 +1,67 @@
+from poetry_workspaces_plugin.constants import SECTION_KEY
+from testing.utils import run
+
+
+def add_dependency(file, name, constraint):
+    content = file.read()
+
+    if 'project' in content:
+        content['project'].setdefault('dependencies', []).append(f'{name}{constraint}')
+    else:
+        content['tool']['poetry']['dependencies'][name] = constraint
+
+    file.write(content)
+
+
+def test_reports_no_conflicts(test_package):
+    root_file, _ = test_package
+
+    result = run(root_file.path.parent, ['poetry', 'workspaces', 'conflicts'])
+
+    assert result.error_output == ''
+    assert 'No conflicting constraints' in result.output
+
+
+def test_reports_conflicting_workspaces(test_package):
+    root_file, workspace_files = test_package
+
+    add_dependency(workspace_files[1], 'pydantic', '<2.0')
+
+    result = run(root_file.path.parent, ['poetry', 'workspaces', 'conflicts'])
+
+    assert 'pydantic' in result.error_output
+    assert 'project-a' in result.error_output
+    assert 'project-b' in result.error_output
+    assert 'Found 1 conflicting' in result.error_output
+
+
+def test_lock_stops_on_conflicts_when_configured(test_package):
+    root_file, workspace_files = test_package
+
+    content = root_file.read()
+    content['tool'][SECTION_KEY]['check-conflicts'] = True
+    root_file.write(content)
+
+    add_dependency(workspace_files[1], 'pydantic', '<2.0')
+
+    result = run(root_file.path.parent, ['poetry', 'lock'])
+
+    assert 'not locking' in result.error_output
+    assert not (root_file.path.parent / 'poetry.lock').exists()
+
+
+def test_reports_constraints_that_only_conflict_together(test_package):
+    root_file, workspace_files = test_package
+
+    # Every two of these constraints allow some version, but all three allow none
+    add_dependency(root_file, 'attrs', '>=1,<3')
+    add_dependency(workspace_files[0], 'attrs', '>=2,<4')
+    add_dependency(workspace_files[1], 'attrs', '!=2.*')
+
+    result = run(root_file.path.parent, ['poetry', 'workspaces', 'conflicts'])
+
+    assert 'Found 1 conflicting' in result.error_output
+
+    line = next(line for line in result.error_output.splitlines() if 'attrs' in line)
+
+    assert all(name in line for name in ('project-root', 'project-a', 'project-b'))
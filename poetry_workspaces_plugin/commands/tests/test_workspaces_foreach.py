@@ -0,0 +1,57 @@
+import json
+
+from testing.utils import run
+
+
+def test_runs_command_in_every_workspace(test_package):
+    root_file, _ = test_package
+
+    root_dir = root_file.path.parent
+
+    result = run(root_dir, ['poetry', 'workspaces', 'foreach', 'version'])
+
+    assert result.error_output == ''
+    assert 'project-a 0.1.0' in result.output
+    assert 'project-b 0.1.0' in result.output
+
+    timings = json.loads((root_dir / '.poetry-workspaces' / 'timings.json').read_text())
+
+    assert set(timings) == {'project-a', 'project-b'}
+
+
+def test_runs_command_in_shard(test_package):
+    root_file, _ = test_package
+
+    root_dir = root_file.path.parent
+
+    result = run(root_dir, ['poetry', 'workspaces', 'foreach', '--shard', '2/2', 'version'])
+
+    assert result.error_output == ''
+    assert 'project-a' not in result.output
+    assert 'project-b 0.1.0' in result.output
+
+
+def test_replays_cached_results(test_package):
+    root_file, workspace_files = test_package
+
+    root_dir = root_file.path.parent
+
+    args = ['poetry', 'workspaces', 'foreach', '--cache', 'version']
+
+    result = run(root_dir, args)
+
+    assert result.error_output == ''
+    assert 'project-a 0.1.0' in result.output
+    assert 'Replaying' not in result.output
+
+    result = run(root_dir, args)
+
+    assert result.output.count('Replaying cached result') == 2
+    assert 'project-a 0.1.0' in result.output
+
+    # Changing a workspace invalidates its results only
+    (workspace_files[0].path.parent / 'module.py').write_text('')
+
+    result = run(root_dir, args)
+
+    assert result.output.count('Replaying cached result') == 1
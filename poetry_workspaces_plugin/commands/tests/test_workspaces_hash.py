@@ -0,0 +1,26 @@
+import json
+
+from testing.utils import run
+
+
+def test_hashes_workspaces(test_package):
+    root_file, workspace_files = test_package
+
+    root_dir = root_file.path.parent
+
+    result = run(root_dir, ['poetry', 'workspaces', 'hash', '--json'])
+
+    assert result.error_output == ''
+
+    before = json.loads(result.output)
+
+    assert set(before) == {'project-a', 'project-b'}
+
+    (workspace_files[0].path.parent / 'module.py').write_text('')
+
+    result = run(root_dir, ['poetry', 'workspaces', 'hash', 'project-a', '--json'])
+
+    after = json.loads(result.output)
+
+    assert list(after) == ['project-a']
+    assert after['project-a'] != before['project-a']
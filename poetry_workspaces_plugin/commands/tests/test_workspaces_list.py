@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import pytest
@@ -50,3 +51,53 @@ def test_raises_in_non_workspaces_project(test_package):
 
     assert result.output == ''
     assert result.error_output.startswith('Could not find')
+
+
+def test_outputs_json_records(test_package):
+    root_file, workspace_files = test_package
+
+    result = run(root_file.path.parent, ['poetry', 'workspaces', 'list', '--json'])
+
+    records = json.loads(result.output)
+
+    assert sorted(r['name'] for r in records) == ['project-a', 'project-b']
+
+    project_a = next(r for r in records if r['name'] == 'project-a')
+
+    assert project_a['path'] == 'packages/project-a'
+    assert project_a['version'] == '0.1.0'
+    assert 'pydantic' in project_a['dependencies']
+
+
+def test_outputs_json_without_formatting(test_package):
+    root_file, workspace_files = test_package
+
+    workspace_dir = workspace_files[0].path.parent
+    workspace_dir.rename(workspace_dir.with_name('<info>tagged'))
+
+    result = run(root_file.path.parent, ['poetry', 'workspaces', 'list', '--json'])
+
+    paths = {r['path'] for r in json.loads(result.output)}
+
+    assert 'packages/<info>tagged' in paths
+
+
+def test_lists_shards_balanced_by_timings(test_package):
+    root_file, _ = test_package
+
+    root_dir = root_file.path.parent
+
+    # Without timings, shards are sliced by count
+    result = run(root_dir, ['poetry', 'workspaces', 'list', '--shard', '1/2'])
+
+    assert 'project-a' in result.output
+    assert 'project-b' not in result.output
+
+    timings_path = root_dir / '.poetry-workspaces' / 'timings.json'
+    timings_path.parent.mkdir()
+    timings_path.write_text(json.dumps({'project-a': 1.0, 'project-b': 20.0}))
+
+    result = run(root_dir, ['poetry', 'workspaces', 'list', '--shard', '1/2'])
+
+    assert 'project-a' not in result.output
+    assert 'project-b' in result.output
@@ -0,0 +1,96 @@
+import tomllib
+
+from poetry_workspaces_plugin.config import Config
+from poetry_workspaces_plugin.context import Context
+from poetry_workspaces_plugin.discovery import get_workspaces
+from poetry_workspaces_plugin.factory import Factory
+from poetry_workspaces_plugin.pyproject import PyProjectTOML
+from testing.utils import LOCK, add_workspace_pin, run
+
+
+NUMPY = '''
+[[package]]
+name = "numpy"
+version = "2.0.0"
+description = ""
+optional = false
+python-versions = ">=3.9"
+groups = ["dev"]
+files = []
+'''
+
+
+def find_workspace_file(workspace_files, name):
+    return next(wf for wf in workspace_files if wf.path.parent.name == name)
+
+
+def test_prunes_workspace_without_dependencies(test_package, tmp_path):
+    root_file, workspace_files = test_package
+
+    root_dir = root_file.path.parent
+
+    lock = LOCK.replace('[metadata]', f'{NUMPY}\n[metadata]')
+    (root_dir / 'poetry.lock').write_text(lock)
+
+    source = root_dir / 'packages' / 'project-a' / 'module.py'
+    source.write_text('')
+
+    out_dir = tmp_path / 'out'
+
+    result = run(root_dir, ['poetry', 'workspaces', 'prune', 'project-a', '--out', str(out_dir)])
+
+    assert result.error_output == ''
+
+    manifests_dir = out_dir / 'manifests'
+    sources_dir = out_dir / 'sources'
+
+    root_data = tomllib.loads((manifests_dir / 'pyproject.toml').read_text())
+
+    assert root_data['tool']['poetry-workspaces-plugin']['workspaces'] == ['packages/project-a']
+    assert (manifests_dir / 'packages' / 'project-a' / 'pyproject.toml').exists()
+    assert not (manifests_dir / 'packages' / 'project-b').exists()
+    assert not (sources_dir / 'packages' / 'project-a' / 'pyproject.toml').exists()
+
+    # Sources are linked rather than copied
+    pruned_source = sources_dir / 'packages' / 'project-a' / 'module.py'
+
+    assert pruned_source.stat().st_ino == source.stat().st_ino
+
+    lock_data = tomllib.loads((manifests_dir / 'poetry.lock').read_text())
+
+    assert 'numpy' not in {package['name'] for package in lock_data['package']}
+    assert 'Pydantic' in {package['name'] for package in lock_data['package']}
+
+    # The lock subset matches the pruned pyproject files
+    config = Config(workspaces=['packages/project-a'])
+    root_pyproject = PyProjectTOML(manifests_dir / 'pyproject.toml')
+    context = Context(
+        root_pyproject,
+        root_pyproject,
+        get_workspaces(config, root_pyproject.path),
+        config=config,
+    )
+
+    assert Factory().create_poetry(context).locker.is_fresh()
+
+
+def test_prunes_workspace_dependencies(test_package, tmp_path):
+    root_file, workspace_files = test_package
+
+    root_dir = root_file.path.parent
+
+    add_workspace_pin(find_workspace_file(workspace_files, 'project-b'), 'project-a', '0.1.0')
+
+    out_dir = tmp_path / 'out'
+
+    result = run(root_dir, ['poetry', 'workspaces', 'prune', 'project-b', '--out', str(out_dir)])
+
+    assert result.error_output == ''
+
+    root_data = tomllib.loads((out_dir / 'manifests' / 'pyproject.toml').read_text())
+
+    assert sorted(root_data['tool']['poetry-workspaces-plugin']['workspaces']) == [
+        'packages/project-a',
+        'packages/project-b',
+    ]
+    assert not (out_dir / 'manifests' / 'poetry.lock').exists()
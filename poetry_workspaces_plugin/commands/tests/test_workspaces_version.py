@@ -0,0 +1,108 @@
+from poetry_workspaces_plugin.constants import SECTION_KEY
+from poetry_workspaces_plugin.utils import get_path
+from testing.utils import add_workspace_pin, run
+
+
+def get_version(file):
+    content = file.read()
+
+    return get_path(content, 'project.version') or get_path(content, 'tool.poetry.version')
+
+
+def test_bumps_all_workspaces(test_package):
+    root_file, workspace_files = test_package
+
+    result = run(root_file.path.parent, ['poetry', 'workspaces', 'version', 'patch'])
+
+    assert result.error_output == ''
+
+    for workspace_file in workspace_files:
+        assert get_version(workspace_file) == '0.1.1'
+
+
+def test_bumps_selected_workspaces(test_package):
+    root_file, workspace_files = test_package
+
+    file_a, file_b = workspace_files
+
+    result = run(
+        root_file.path.parent,
+        ['poetry', 'workspaces', 'version', 'minor', '--workspace', 'project-b'],
+    )
+
+    assert result.error_output == ''
+
+    assert get_version(file_a) == '0.1.0'
+    assert get_version(file_b) == '0.2.0'
+
+
+def test_updates_workspace_pins(test_package):
+    root_file, workspace_files = test_package
+
+    file_a, file_b = workspace_files
+
+    add_workspace_pin(file_b, 'project-a', '0.1.0')
+
+    result = run(
+        root_file.path.parent,
+        ['poetry', 'workspaces', 'version', 'major', '--workspace', 'project-a'],
+    )
+
+    assert result.error_output == ''
+
+    assert get_version(file_a) == '1.0.0'
+    assert 'workspace:^1.0.0' in file_b.path.read_text()
+
+
+def test_dry_run_changes_nothing(test_package):
+    root_file, workspace_files = test_package
+
+    file_a, file_b = workspace_files
+
+    add_workspace_pin(file_b, 'project-a', '0.1.0')
+
+    contents = [file.path.read_text() for file in workspace_files]
+
+    result = run(
+        root_file.path.parent,
+        ['poetry', 'workspaces', 'version', 'major', '--dry-run'],
+    )
+
+    assert result.error_output == ''
+    assert 'Updating workspace pins in project-b' in result.output
+
+    assert [file.path.read_text() for file in workspace_files] == contents
+
+    context = result.app.get('workspaces version').context
+
+    assert context.workspace_versions == {'project-a': '0.1.0', 'project-b': '0.1.0'}
+    assert [p.version for p in context.workspaces_pyprojects] == ['0.1.0', '0.1.0']
+    assert 'workspace:^0.1.0' in context.workspaces_pyprojects[1].data_raw.as_string()
+
+
+def test_unified_version(test_package):
+    root_file, workspace_files = test_package
+
+    content = root_file.read()
+    content['tool'][SECTION_KEY]['unified-version'] = True
+    root_file.write(content)
+
+    file_a, file_b = workspace_files
+
+    content = file_b.read()
+    content.get('project', content.get('tool', {}).get('poetry'))['version'] = '0.3.0'
+    file_b.write(content)
+
+    result = run(root_file.path.parent, ['poetry', 'workspaces', 'version', 'patch'])
+
+    assert result.error_output == ''
+
+    assert get_version(file_a) == '0.3.1'
+    assert get_version(file_b) == '0.3.1'
+
+    result = run(
+        root_file.path.parent,
+        ['poetry', 'workspaces', 'version', 'patch', '--workspace', 'project-a'],
+    )
+
+    assert 'unified-version' in result.error_output
@@ -0,0 +1,31 @@
+from testing.utils import LOCK, run
+
+
+def test_shows_path_from_workspaces(test_package):
+    root_file, _ = test_package
+
+    root_dir = root_file.path.parent
+
+    (root_dir / 'poetry.lock').write_text(LOCK)
+
+    result = run(root_dir, ['poetry', 'workspaces', 'why', 'typing-extensions'])
+
+    assert result.error_output == ''
+
+    lines = [line.strip() for line in result.output.strip().split('\n')]
+
+    assert lines[0] == 'typing-extensions 4.12.2'
+    assert 'project-a -> pydantic -> typing-extensions' in lines
+    assert (root_dir / '.poetry-workspaces' / 'lock-index').is_dir()
+
+
+def test_raises_for_unlocked_package(test_package):
+    root_file, _ = test_package
+
+    root_dir = root_file.path.parent
+
+    (root_dir / 'poetry.lock').write_text(LOCK)
+
+    result = run(root_dir, ['poetry', 'workspaces', 'why', 'requests'])
+
+    assert 'is not locked' in result.error_output
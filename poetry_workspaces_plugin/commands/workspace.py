@@ -1,12 +1,11 @@
-import os
-from typing import cast
+from contextlib import chdir, nullcontext
 
 from cleo.helpers import argument
+from poetry.console.commands.run import RunCommand
 
 from poetry_workspaces_plugin.commands.base import BaseCommand
 from poetry_workspaces_plugin.constants import LOG_PREFIX
 from poetry_workspaces_plugin.utils import seq_to_cmdline
-from poetry_workspaces_plugin.pyproject import PyProjectTOML
 
 
 class WorkspaceCommand(BaseCommand):
@@ -29,19 +28,11 @@ class WorkspaceCommand(BaseCommand):
         workspace_name = self.argument('workspace_name')
         command_name = self.argument('command_name')
 
-        workspaces_pyprojects = self.context.workspaces_pyprojects
+        workspace = self.context.find_workspace(workspace_name)
 
-        workspace_pyproject = next(
-            filter(lambda wp: wp.name == workspace_name, workspaces_pyprojects),
-            None,
-        )
-        workspace_pyproject = cast(PyProjectTOML | None, workspace_pyproject)
-
-        if not workspace_pyproject:
+        if not workspace:
             raise ValueError(f'Could not find a project with the name: {workspace_name}')
 
-        self.context.target_pyproject = workspace_pyproject
-
         name = command_name[0]
         args = seq_to_cmdline(command_name)
 
@@ -49,12 +40,17 @@ class WorkspaceCommand(BaseCommand):
             f'{LOG_PREFIX} Running <info>{args}</info> in workspace <c1>{workspace_name}</c1>'
         )
 
-        cwd = os.getcwd()
-
-        os.chdir(workspace_pyproject.path.parent)
+        command = self.application.get(name)
 
-        self.call(name, args)
+        # The target is passed to the command explicitly rather than through the working
+        # directory, so the plugin binds the Poetry already built for it on dispatch
+        context = self.context.with_target(workspace.pyproject)
 
-        os.chdir(cwd)
+        # Processes started by `run` are still expected to start in the workspace
+        if isinstance(command, RunCommand):
+            cwd = chdir(workspace.path.parent)
+        else:
+            cwd = nullcontext()
 
-        return 0
+        with self._plugin.bind_context(command, context), cwd:
+            return self.call(name, args)
@@ -0,0 +1,179 @@
+from cleo.helpers import argument, option
+from poetry.core.factory import Factory as CoreFactory
+from poetry.core.packages.dependency_group import MAIN_GROUP
+from poetry.utils.dependency_specification import RequirementsParser
+from poetry.version.version_selector import VersionSelector
+
+from poetry_workspaces_plugin.commands.base import BaseCommand
+from poetry_workspaces_plugin.constants import LOG_PREFIX
+from poetry_workspaces_plugin.factory import Factory
+from poetry_workspaces_plugin.transaction import FileTransaction
+from poetry_workspaces_plugin.utils import (
+    ResolvedDependency,
+    add_package,
+    get_dependency_from_content,
+)
+
+
+class WorkspacesAddCommand(BaseCommand):
+    name: str = 'workspaces add'
+    description = 'Add packages to several workspaces and lock them with a single resolution.'
+
+    arguments = [
+        argument('name', 'The packages to add.', multiple=True),
+    ]
+    options = [
+        option(
+            'to',
+            't',
+            'The workspaces to add the packages to, separated by commas (multiple values allowed).',
+            flag=False,
+            multiple=True,
+        ),
+        option(
+            'group',
+            'G',
+            'The group to add the dependencies to.',
+            flag=False,
+            default=MAIN_GROUP,
+        ),
+        option('allow-prereleases', None, 'Accept prereleases.'),
+        option('dry-run', None, 'Output the changes without writing any file.'),
+    ]
+
+    def _handle(self):
+        group = self.option('group')
+
+        names = [name.strip() for value in self.option('to') for name in value.split(',')]
+        names = [name for name in names if name]
+
+        if not names:
+            self.line_error('Select workspaces to add the packages to with <c1>--to</c1>.', 'error')
+
+            return 1
+
+        workspaces = []
+
+        for name in names:
+            workspace = self.context.find_workspace(name)
+
+            if not workspace:
+                raise ValueError(f'Could not find a project with the name: {name}')
+
+            workspaces.append(workspace)
+
+        dependencies = self._get_dependencies(self.argument('name'), group)
+
+        transaction = FileTransaction()
+
+        for workspace in workspaces:
+            content = workspace.pyproject.data_raw
+            changed = False
+
+            # Look up existing dependencies before any is added to the document
+            existing = {
+                dependency.name
+                for dependency in dependencies
+                if get_dependency_from_content(content, dependency.name, group)
+            }
+
+            for dependency in dependencies:
+                if dependency.name in existing:
+                    self.line(
+                        f'{LOG_PREFIX} Workspace <c1>{workspace.name}</c1> already depends on'
+                        f' <c1>{dependency.name}</c1>, skipping'
+                    )
+
+                    continue
+
+                self.line(
+                    f'{LOG_PREFIX} Adding <c1>{dependency.pretty_name}</c1>'
+                    f' (<b>{dependency.pretty_constraint}</>) to <c1>{workspace.name}</c1>'
+                )
+
+                add_package(content, ResolvedDependency(dependency, ''), group)
+
+                changed = True
+
+            if changed:
+                transaction.stage(workspace.path, content.as_string())
+
+        if not transaction.paths:
+            self.line('Lock file and environment unchanged.')
+
+            return 0
+
+        if self.option('dry-run'):
+            for workspace in workspaces:
+                workspace.pyproject.reload()
+
+            return 0
+
+        # Restore the lock files too if resolution fails after they have been written, and
+        # remove those that did not exist before
+        for group in (None, *self.context.config.lock_groups):
+            transaction.track(self.context.get_lock_path(group))
+
+        transaction.commit()
+
+        # Poetry instances built before the edits no longer match the documents
+        self.context.poetry_cache.clear()
+
+        try:
+            res = self.call('lock')
+        except BaseException:
+            self._rollback(transaction, workspaces)
+
+            raise
+
+        if res != 0:
+            self._rollback(transaction, workspaces)
+
+        return res
+
+    def _get_dependencies(self, requirements: list[str], group: str):
+        root_dir = self.context.root_pyproject.path.parent
+        pool = Factory().get_poetry(self.context.root_only()).pool
+
+        parser = RequirementsParser(artifact_cache=pool.artifact_cache, cwd=root_dir)
+
+        dependencies = []
+
+        for requirement in requirements:
+            spec = parser.parse(requirement)
+            name = spec.pop('name')
+
+            if any(key in spec for key in ('git', 'url', 'path', 'file')):
+                raise ValueError(
+                    f'Package {name} is not from a package index, add it to each workspace'
+                    ' with `poetry workspace <name> add` instead'
+                )
+
+            # Find the latest version once for all workspaces, as `poetry add` does
+            if 'version' not in spec:
+                package = VersionSelector(pool).find_best_candidate(
+                    name,
+                    allow_prereleases=self.option('allow-prereleases'),
+                )
+
+                if not package:
+                    raise ValueError(f'Could not find a matching version of package {name}')
+
+                name = package.pretty_name
+                spec['version'] = f'^{package.version.without_local().to_string()}'
+
+            dependencies.append(
+                CoreFactory.create_dependency(name, spec, groups=[group], root_dir=root_dir)
+            )
+
+        return dependencies
+
+    def _rollback(self, transaction: FileTransaction, workspaces):
+        self.line_error(f'{LOG_PREFIX} Resolution failed, restoring all changed files')
+
+        transaction.rollback()
+
+        for workspace in workspaces:
+            workspace.pyproject.reload()
+
+        self.context.poetry_cache.clear()
@@ -0,0 +1,100 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from poetry_workspaces_plugin.check import (
+    CheckCache,
+    CheckResult,
+    check_merged,
+    check_workspace,
+    get_check_key,
+)
+from poetry_workspaces_plugin.commands.base import BaseCommand
+from poetry_workspaces_plugin.constants import LOG_PREFIX
+
+
+# Below this many workspaces to check, starting worker processes costs more than it saves
+PARALLEL_THRESHOLD = 8
+
+
+class WorkspacesCheckCommand(BaseCommand):
+    name: str = 'workspaces check'
+    description = 'Validate every workspace, its workspace references and the merged configuration.'
+
+    def _handle(self):
+        workspaces = self.context.workspaces
+        versions = self.context.workspace_versions
+
+        cache = CheckCache(self.context.cache_dir / 'check.json')
+
+        keys = {
+            workspace.name: get_check_key(workspace.path.read_bytes(), versions)
+            for workspace in workspaces
+        }
+        merged_key = get_check_key(
+            b''.join(
+                [self.context.root_pyproject.path.read_bytes(), *(k.encode() for k in keys.values())]
+            ),
+            versions,
+        )
+
+        results: dict[str, CheckResult] = {}
+        pending = []
+
+        for workspace in workspaces:
+            if cached := cache.get(keys[workspace.name]):
+                results[workspace.name] = cached
+            else:
+                pending.append(workspace)
+
+        executor = None
+        futures: dict[str, Future[CheckResult]] = {}
+
+        if len(pending) >= PARALLEL_THRESHOLD:
+            executor = ProcessPoolExecutor()
+
+            for workspace in pending:
+                futures[workspace.name] = executor.submit(
+                    check_workspace, str(workspace.path), versions
+                )
+        else:
+            for workspace in pending:
+                results[workspace.name] = check_workspace(str(workspace.path), versions)
+
+        try:
+            # The merged document is checked here while the workers check workspaces
+            if (merged := cache.get(merged_key)) is None:
+                merged = check_merged(self.context)
+
+            for name, future in futures.items():
+                results[name] = future.result()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        for name, result in results.items():
+            cache.put(keys[name], result)
+
+        cache.put(merged_key, merged)
+        cache.save()
+
+        n_errors = 0
+
+        for name, result in [*sorted(results.items()), ('merged configuration', merged)]:
+            for warning in result.warnings:
+                self.line(f' <c1>{name}</c1>: <warning>{warning}</warning>')
+
+            for error in result.errors:
+                self.line_error(f' <c1>{name}</c1>: <error>{error}</error>')
+
+            n_errors += len(result.errors)
+
+        self.line(
+            f'{LOG_PREFIX} Checked <c1>{len(workspaces)}</c1> workspaces,'
+            f' <c1>{len(workspaces) - len(pending)}</c1> unchanged since the last check'
+        )
+
+        if n_errors:
+            self.line_error(f'{LOG_PREFIX} Found <c1>{n_errors}</c1> errors', 'error')
+
+            return 1
+
+        return 0
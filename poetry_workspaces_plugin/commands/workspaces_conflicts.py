@@ -0,0 +1,31 @@
+from poetry_workspaces_plugin.commands.base import BaseCommand
+from poetry_workspaces_plugin.conflicts import find_conflicts, format_conflict
+from poetry_workspaces_plugin.constants import LOG_PREFIX
+
+
+class WorkspacesConflictsCommand(BaseCommand):
+    name: str = 'workspaces conflicts'
+    description = 'Find dependency constraints of workspaces that cannot be satisfied together.'
+
+    def _handle(self):
+        # Constraints of different lock groups are never resolved together
+        conflicts = [
+            conflict
+            for context in self.context.split_lock_groups()
+            for conflict in find_conflicts(context)
+        ]
+
+        if not conflicts:
+            self.line(f'{LOG_PREFIX} No conflicting constraints found')
+
+            return 0
+
+        for conflict in conflicts:
+            self.line_error(f' {format_conflict(conflict)}')
+
+        self.line_error(
+            f'{LOG_PREFIX} Found <c1>{len(conflicts)}</c1> conflicting constraints',
+            'error',
+        )
+
+        return 1
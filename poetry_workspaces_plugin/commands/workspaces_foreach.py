@@ -0,0 +1,168 @@
+import time
+
+from cleo.helpers import argument, option
+from cleo.io.inputs.string_input import StringInput
+from cleo.io.io import IO
+from cleo.io.outputs.output import Type
+from cleo.io.outputs.stream_output import StreamOutput
+from packaging.utils import canonicalize_name
+
+from poetry_workspaces_plugin.commands.base import BaseCommand
+from poetry_workspaces_plugin.constants import LOG_PREFIX
+from poetry_workspaces_plugin.discovery import WorkspaceInfo
+from poetry_workspaces_plugin.lock_groups import load_lock_indexes
+from poetry_workspaces_plugin.sharding import Timings, parse_shard, select_shard
+from poetry_workspaces_plugin.tasks import (
+    TaskCache,
+    capture_output,
+    get_input_hashes,
+    get_task_key,
+    read_entry,
+    restore_outputs,
+)
+from poetry_workspaces_plugin.utils import seq_to_cmdline
+
+
+class WorkspacesForeachCommand(BaseCommand):
+    name: str = 'workspaces foreach'
+    description = 'Run a Poetry command in every workspace, recording how long each run takes.'
+
+    arguments = [
+        argument(
+            'command_name',
+            'The Poetry command to run along with any arguments.',
+            multiple=True,
+        ),
+    ]
+    options = [
+        option(
+            'shard',
+            None,
+            'Only run in the workspaces of a shard such as 1/4, balanced by recorded durations.',
+            flag=False,
+        ),
+        option(
+            'cache',
+            None,
+            'Replay the results of previous successful runs with the same inputs.',
+        ),
+        option(
+            'output',
+            None,
+            'Glob patterns of files the command writes in the workspace, cached along with'
+            ' its output (multiple values allowed).',
+            flag=False,
+            multiple=True,
+        ),
+    ]
+
+    def _handle(self):
+        command_name = self.argument('command_name')
+        args = seq_to_cmdline(command_name)
+
+        timings = Timings.from_context(self.context)
+
+        workspaces = self.context.workspaces
+
+        if shard := self.option('shard'):
+            workspaces = select_shard(workspaces, timings, *parse_shard(shard))
+
+        task_cache = None
+        input_hashes = {}
+
+        if self.option('cache'):
+            task_cache = TaskCache.from_context(self.context)
+            input_hashes = get_input_hashes(self.context, load_lock_indexes(self.context))
+
+        failed = []
+
+        try:
+            for workspace in workspaces:
+                if task_cache is not None:
+                    key = get_task_key(input_hashes[canonicalize_name(workspace.name)], args)
+                    res = self._run_cached(workspace, command_name, timings, task_cache, key)
+                else:
+                    start = time.perf_counter()
+
+                    res = self.call(
+                        'workspace',
+                        seq_to_cmdline(['workspace', workspace.name, *command_name]),
+                    )
+
+                    timings.record(workspace.name, time.perf_counter() - start)
+
+                if res != 0:
+                    failed.append(workspace.name)
+        finally:
+            timings.save()
+
+        if failed:
+            self.line_error(
+                f'{LOG_PREFIX} <info>{args}</info> failed in'
+                f' {", ".join(f"<c1>{name}</c1>" for name in failed)}',
+                'error',
+            )
+
+            return 1
+
+        return 0
+
+    def _run_cached(
+        self,
+        workspace: WorkspaceInfo,
+        command_name: list[str],
+        timings: Timings,
+        task_cache: TaskCache,
+        key: str,
+    ) -> int:
+        workspace_dir = workspace.path.parent
+
+        if entry := task_cache.get(key):
+            self.line(
+                f'{LOG_PREFIX} Replaying cached result in workspace <c1>{workspace.name}</c1>'
+            )
+
+            metadata = read_entry(entry)
+
+            self.io.write(metadata['stdout'], type=Type.RAW)
+            self.io.write_error(metadata['stderr'], type=Type.RAW)
+
+            restore_outputs(entry, workspace_dir)
+
+            return 0
+
+        start = time.perf_counter()
+
+        output = self.io.output
+
+        with capture_output() as captured:
+            io = IO(
+                StringInput(seq_to_cmdline(['workspace', workspace.name, *command_name])),
+                StreamOutput(
+                    captured.stdout, output.verbosity, output.is_decorated(), output.formatter
+                ),
+                StreamOutput(
+                    captured.stderr, output.verbosity, output.is_decorated(), output.formatter
+                ),
+            )
+
+            res = self.application._run_command(self.application.get('workspace'), io)
+
+        timings.record(workspace.name, time.perf_counter() - start)
+
+        stdout, stderr = captured.read()
+
+        self.io.write(stdout, type=Type.RAW)
+        self.io.write_error(stderr, type=Type.RAW)
+
+        if res == 0:
+            outputs = sorted({
+                path
+                for pattern in self.option('output')
+                for path in workspace_dir.glob(pattern)
+                if path.is_file()
+            })
+
+            task_cache.put(key, stdout, stderr, workspace_dir, outputs)
+
+        return res
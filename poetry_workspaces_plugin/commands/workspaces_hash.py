@@ -0,0 +1,37 @@
+import json
+
+from cleo.helpers import argument, option
+from cleo.io.outputs.output import Type
+
+from poetry_workspaces_plugin.commands.base import BaseCommand
+from poetry_workspaces_plugin.hashing import hash_workspaces
+
+
+class WorkspacesHashCommand(BaseCommand):
+    name: str = 'workspaces hash'
+    description = 'Show a hash of the source files of workspaces.'
+
+    arguments = [
+        argument(
+            'workspace',
+            'The workspaces to hash, all of them by default.',
+            optional=True,
+            multiple=True,
+        ),
+    ]
+    options = [
+        option('json', None, 'Output the hashes as a JSON object.'),
+    ]
+
+    def _handle(self):
+        hashes = hash_workspaces(self.context, self.argument('workspace') or None)
+
+        if self.option('json'):
+            self.io.write_line(json.dumps(hashes, indent=2), type=Type.RAW)
+
+            return 0
+
+        for name, digest in hashes.items():
+            self.line(f' <c1>{name}</c1> {digest}')
+
+        return 0
@@ -1,12 +1,46 @@
+import json
+
+from cleo.helpers import option
+from cleo.io.outputs.output import Type
+
+from poetry_workspaces_plugin.api import Workspace
 from poetry_workspaces_plugin.commands.base import BaseCommand
+from poetry_workspaces_plugin.sharding import Timings, parse_shard, select_shard
 
 
 class WorkspacesListCommand(BaseCommand):
     name: str = 'workspaces list'
     description = 'List all available workspaces.'
 
+    options = [
+        option('json', None, 'Output the workspaces as JSON records.'),
+        option(
+            'shard',
+            None,
+            'Only list the workspaces of a shard such as 1/4, balanced by recorded durations.',
+            flag=False,
+        ),
+    ]
+
     def _handle(self):
-        for pyproject in self.context.workspaces_pyprojects:
-            self.line(f' <c1>{pyproject.name}</c1> {pyproject.path.parent.as_posix()}')
+        workspaces = self.context.workspaces
+
+        if shard := self.option('shard'):
+            workspaces = select_shard(workspaces, Timings.from_context(self.context), *parse_shard(shard))
+
+        if self.option('json'):
+            root_dir = self.context.root_pyproject.path.parent
+
+            records = [
+                Workspace.from_info(workspace, root_dir).to_dict()
+                for workspace in workspaces
+            ]
+
+            self.io.write_line(json.dumps(records, indent=2), type=Type.RAW)
+
+            return 0
+
+        for workspace in workspaces:
+            self.line(f' <c1>{workspace.name}</c1> {workspace.path.parent.as_posix()}')
 
         return 0
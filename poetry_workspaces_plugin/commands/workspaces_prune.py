@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from cleo.helpers import argument, option
+
+from poetry_workspaces_plugin.commands.base import BaseCommand
+from poetry_workspaces_plugin.constants import LOG_PREFIX
+from poetry_workspaces_plugin.prune import MANIFESTS_DIR, SOURCES_DIR, prune
+
+
+class WorkspacesPruneCommand(BaseCommand):
+    name: str = 'workspaces prune'
+    description = 'Write a minimal tree with a workspace and its workspace dependencies for image builds.'
+
+    arguments = [argument('workspace', 'The name or path of the workspace.')]
+    options = [
+        option('out', 'o', 'The directory to write the pruned tree to.', flag=False),
+    ]
+
+    def _handle(self):
+        if not self.option('out'):
+            self.line_error('Select a directory to write to with <c1>--out</c1>.', 'error')
+
+            return 1
+
+        out_dir = Path(self.option('out')).resolve()
+
+        workspaces = prune(self.context, self.argument('workspace'), out_dir)
+
+        for workspace in workspaces:
+            self.line(f'{LOG_PREFIX} Keeping <c1>{workspace.name}</c1>')
+
+        self.line(
+            f'{LOG_PREFIX} Wrote dependency files to <c1>{out_dir / MANIFESTS_DIR}</c1>'
+            f' and sources to <c1>{out_dir / SOURCES_DIR}</c1>'
+        )
+
+        return 0
@@ -0,0 +1,132 @@
+from copy import deepcopy
+
+from cleo.helpers import argument, option
+from poetry.console.commands.version import VersionCommand
+from poetry.core.constraints.version import Version
+
+from poetry_workspaces_plugin import counters
+from poetry_workspaces_plugin.commands.base import BaseCommand
+from poetry_workspaces_plugin.constants import LOG_PREFIX
+from poetry_workspaces_plugin.pyproject import update_workspace_pins
+from poetry_workspaces_plugin.transaction import FileTransaction
+
+
+class WorkspacesVersionCommand(BaseCommand):
+    name: str = 'workspaces version'
+    description = 'Bump the version of all or selected workspaces in one step.'
+
+    arguments = [
+        argument(
+            'version',
+            'The version number or the rule to update the version.',
+        ),
+    ]
+    options = [
+        option(
+            'workspace',
+            'w',
+            'Only bump the given workspace (multiple values allowed).',
+            flag=False,
+            multiple=True,
+        ),
+        option('next-phase', None, 'Increment the phase of the current version.'),
+        option('dry-run', None, 'Do not update any pyproject.toml file.'),
+    ]
+
+    def _handle(self):
+        rule = self.argument('version')
+        selected = self.option('workspace')
+        next_phase = self.option('next-phase')
+        dry_run = self.option('dry-run')
+
+        workspaces = self.context.workspaces
+        versions = dict(self.context.workspace_versions)
+
+        version_command = VersionCommand()
+
+        if self.context.config.unified_version:
+            if selected:
+                self.line_error(
+                    'Workspaces cannot be selected when <c1>unified-version</c1> is enabled.',
+                    'error',
+                )
+
+                return 1
+
+            current = max(versions.values(), key=Version.parse, default='0.0.0')
+            version = version_command.increment_version(current, rule, next_phase).text
+
+            bumped = {name: version for name in versions}
+        else:
+            targets = workspaces
+
+            if selected:
+                targets = []
+
+                for workspace_name in selected:
+                    workspace = self.context.find_workspace(workspace_name)
+
+                    if not workspace:
+                        raise ValueError(
+                            f'Could not find a project with the name: {workspace_name}'
+                        )
+
+                    targets.append(workspace)
+
+            bumped = {
+                workspace.name: version_command.increment_version(
+                    workspace.version, rule, next_phase
+                ).text
+                for workspace in targets
+            }
+
+        for name, version in bumped.items():
+            self.line(
+                f'{LOG_PREFIX} Bumping <c1>{name}</c1> from <b>{versions[name]}</>'
+                f' to <fg=green>{version}</>'
+            )
+
+        versions.update(bumped)
+
+        transaction = FileTransaction()
+
+        for pyproject in [self.context.root_pyproject, *self.context.workspaces_pyprojects]:
+            content = pyproject.data_raw
+
+            # A dry run leaves the documents loaded for the rest of the process as they are
+            if dry_run:
+                counters.count(counters.DEEPCOPY)
+
+                content = deepcopy(content)
+            changed = False
+
+            name = pyproject.name
+
+            if name in bumped and pyproject != self.context.root_pyproject:
+                if 'version' in content.get('project', {}):
+                    content['project']['version'] = bumped[name]
+
+                poetry_content = content.get('tool', {}).get('poetry', {})
+
+                if 'version' in poetry_content:
+                    poetry_content['version'] = bumped[name]
+
+                changed = True
+
+            if update_workspace_pins(content, bumped):
+                self.line(f'{LOG_PREFIX} Updating workspace pins in <c1>{name}</c1>')
+
+                changed = True
+
+            if changed:
+                transaction.stage(pyproject.path, content.as_string())
+
+        if dry_run:
+            return 0
+
+        transaction.commit()
+
+        # Keep rendering of workspace references consistent with the new versions
+        self.context.workspace_versions.update(bumped)
+
+        return 0
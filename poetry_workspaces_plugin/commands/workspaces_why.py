@@ -0,0 +1,63 @@
+from cleo.helpers import argument
+
+from poetry_workspaces_plugin.commands.base import BaseCommand
+from poetry_workspaces_plugin.constants import LOG_PREFIX
+from poetry_workspaces_plugin.lock_groups import load_lock_indexes
+
+
+class WorkspacesWhyCommand(BaseCommand):
+    name: str = 'workspaces why'
+    description = 'Show which workspaces depend on a locked package and through what.'
+
+    arguments = [argument('package', 'The package to look up.')]
+
+    def _handle(self):
+        package = self.argument('package')
+
+        indexes = load_lock_indexes(self.context)
+
+        if not indexes:
+            self.line_error(
+                f'{LOG_PREFIX} Could not find <c1>poetry.lock</c1>, run lock first.',
+                'error',
+            )
+
+            return 1
+
+        workspace_names = {workspace.name for workspace in self.context.workspaces}
+
+        locked = any(package in index for index in indexes.values())
+
+        if not locked and package not in workspace_names:
+            self.line_error(
+                f'{LOG_PREFIX} Package <c1>{package}</c1> is not locked.',
+                'error',
+            )
+
+            return 1
+
+        # Lock groups may each lock another version
+        versions = ', '.join(dict.fromkeys(
+            version for index in indexes.values() for version in index.versions(package)
+        ))
+
+        if versions:
+            self.line(f'<c1>{package}</c1> {versions}')
+
+        found = False
+
+        for workspace in self.context.workspaces:
+            index = indexes.get(self.context.get_lock_group(workspace))
+            path = index.path_to(workspace.dependencies, package) if index else None
+
+            if path is None:
+                continue
+
+            found = True
+
+            self.line(f' <c1>{workspace.name}</c1> -> {" -> ".join(path)}')
+
+        if not found:
+            self.line(f'{LOG_PREFIX} No workspace depends on <c1>{package}</c1>.')
+
+        return 0
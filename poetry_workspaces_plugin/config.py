@@ -3,12 +3,58 @@ from dataclasses import dataclass, field
 from tomlkit import array
 from tomlkit.items import Table
 
+from poetry_workspaces_plugin.constants import CACHE_DIR
+
+
+MERGE_MODES = ('additive', 'intersect')
+
+
+@dataclass
+class LockGroup:
+    """Workspaces resolved and locked together, apart from every other group."""
+    workspaces: list[str] = field(default_factory=list)
+    virtualenv: bool = False
+
 
 @dataclass
 class Config:
     workspaces: list[str] = field(default_factory=list)
     unified_version: bool = False
+    partial_lock: bool = False
+    check_conflicts: bool = False
+    merge_mode: str = 'additive'
+    nested_workspaces: bool = True
+    cache_dir: str = CACHE_DIR
+    wheel_cache_size: int = 1024
+    task_cache_remote: str | None = None
+    lock_groups: dict[str, LockGroup] = field(default_factory=dict)
+    isolated_environments: bool = False
+    lock_timeout: float = 300
 
     def load(self, plugin_section: Table):
         self.workspaces = plugin_section.get('workspaces', array())
         self.unified_version = plugin_section.get('unified-version', False)
+        self.partial_lock = plugin_section.get('partial-lock', False)
+        self.check_conflicts = plugin_section.get('check-conflicts', False)
+        self.merge_mode = plugin_section.get('merge-mode', 'additive')
+        self.nested_workspaces = plugin_section.get('nested-workspaces', True)
+        self.cache_dir = plugin_section.get('cache-dir', CACHE_DIR)
+        self.wheel_cache_size = plugin_section.get('wheel-cache-size', 1024)
+        self.task_cache_remote = plugin_section.get('task-cache-remote')
+        self.isolated_environments = plugin_section.get('isolated-environments', False)
+        self.lock_timeout = plugin_section.get('lock-timeout', 300)
+
+        # Each group is a list of workspace patterns, or a table that can ask for a venv
+        self.lock_groups = {
+            name: (
+                LockGroup(list(group))
+                if isinstance(group, list)
+                else LockGroup(list(group.get('workspaces', [])), group.get('virtualenv', False))
+            )
+            for name, group in plugin_section.get('lock-groups', {}).items()
+        }
+
+        if self.merge_mode not in MERGE_MODES:
+            raise ValueError(
+                f'Invalid merge-mode "{self.merge_mode}", expected one of: {", ".join(MERGE_MODES)}'
+            )
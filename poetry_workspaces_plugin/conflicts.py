@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import tomllib
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import reduce
+from itertools import combinations
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+from poetry.core.factory import Factory
+from poetry.core.packages.dependency import Dependency
+
+from poetry_workspaces_plugin import counters
+from poetry_workspaces_plugin.utils import get_path
+
+
+if TYPE_CHECKING:
+    from poetry_workspaces_plugin.context import Context
+
+
+@dataclass(frozen=True)
+class DeclaredDependency:
+    workspace: str
+    group: str
+    dependency: Dependency
+
+    def __str__(self) -> str:
+        marker = '' if self.dependency.marker.is_any() else f'; {self.dependency.marker}'
+
+        return f'{self.dependency.pretty_constraint}{marker}'
+
+
+@dataclass(frozen=True)
+class Conflict:
+    """Declarations that no single version can satisfy, none of which can be left out."""
+    name: str
+    declarations: tuple[DeclaredDependency, ...]
+
+
+def iter_declared_dependencies(
+    workspace: str,
+    data: dict[str, Any],
+    root_dir: Path,
+) -> Iterator[DeclaredDependency]:
+    """Yield every version constrained dependency declared in pyproject data."""
+    requirements = [('main', r) for r in get_path(data, 'project.dependencies') or []]
+
+    for extra, group in (get_path(data, 'project.optional-dependencies') or {}).items():
+        requirements.extend((extra, r) for r in group)
+
+    for group_name, group in (data.get('dependency-groups') or {}).items():
+        requirements.extend((group_name, r) for r in group)
+
+    for group_name, requirement in requirements:
+        # Skip include-group tables and references to other workspaces
+        if not isinstance(requirement, str) or 'workspace:' in requirement:
+            continue
+
+        dependency = Dependency.create_from_pep_508(requirement, relative_to=root_dir)
+
+        if dependency.source_type is None:
+            yield DeclaredDependency(workspace, group_name, dependency)
+
+    tables = [('main', get_path(data, 'tool.poetry.dependencies') or {})]
+    tables.extend(
+        (group_name, group.get('dependencies') or {})
+        for group_name, group in (get_path(data, 'tool.poetry.group') or {}).items()
+    )
+
+    for group_name, table in tables:
+        for name, specs in table.items():
+            if name == 'python':
+                continue
+
+            # Multiple constraints dependencies are declared as a list of specs
+            if not isinstance(specs, list):
+                specs = [specs]
+
+            for spec in specs:
+                version = spec.get('version', '') if isinstance(spec, dict) else spec
+
+                if isinstance(version, str) and 'workspace:' in version:
+                    continue
+
+                dependency = Factory.create_dependency(
+                    name, spec, groups=[group_name], root_dir=root_dir
+                )
+
+                if dependency.source_type is None:
+                    yield DeclaredDependency(workspace, group_name, dependency)
+
+
+def overlaps(*dependencies: Dependency) -> bool:
+    """Check whether constraints can all be satisfied by one version in one environment."""
+    marker = reduce(lambda a, b: a.intersect(b), (d.marker for d in dependencies))
+
+    if marker.is_empty():
+        return True
+
+    constraint = reduce(lambda a, b: a.intersect(b), (d.constraint for d in dependencies))
+
+    return not constraint.is_empty()
+
+
+def group_by_environment(
+    declarations: list[DeclaredDependency],
+) -> list[list[DeclaredDependency]]:
+    """Group declarations whose markers can all hold together in one environment.
+
+    Each declaration starts a group, which takes in every other declaration that keeps the
+    markers of the group satisfiable, so that a declaration is part of one group at least.
+    """
+    if all(d.dependency.marker.is_any() for d in declarations):
+        return [declarations]
+
+    groups: dict[tuple[int, ...], list[DeclaredDependency]] = {}
+
+    for seed in declarations:
+        marker = seed.dependency.marker
+        group = []
+
+        for declaration in declarations:
+            intersection = marker.intersect(declaration.dependency.marker)
+
+            if declaration is seed or not intersection.is_empty():
+                marker = intersection
+                group.append(declaration)
+
+        groups.setdefault(tuple(id(d) for d in group), group)
+
+    return list(groups.values())
+
+
+def shrink_conflict(declarations: list[DeclaredDependency]) -> list[DeclaredDependency]:
+    """Leave out every declaration that the others conflict without."""
+    conflict = list(declarations)
+
+    for declaration in declarations:
+        remaining = [d for d in conflict if d is not declaration]
+
+        if not overlaps(*(d.dependency for d in remaining)):
+            conflict = remaining
+
+    return conflict
+
+
+def find_conflicts(context: Context) -> list[Conflict]:
+    """Find declared dependencies that no single locked version can satisfy together.
+
+    Declarations are read straight from each pyproject.toml on disk, grouped by
+    canonical name and intersected pairwise, so this is cheap enough to run before
+    every lock. Declarations whose markers never hold together are not compared.
+
+    Constraints can also conflict only as a whole, such as `==1 || ==2`, `==1 || ==3`
+    and `==2 || ==3`, so the declarations of each environment are then intersected
+    all together, and those that conflict are reduced to a minimal conflicting subset.
+    """
+    declared: dict[str, list[DeclaredDependency]] = defaultdict(list)
+
+    projects = [context.root_pyproject.path]
+    projects.extend(
+        workspace.path
+        for workspace in context.workspaces
+        if workspace.path != context.root_pyproject.path
+    )
+
+    for path in projects:
+        counters.count(counters.TOML_PARSE)
+
+        with path.open('rb') as f:
+            data = tomllib.load(f)
+
+        name = get_path(data, 'project.name') or get_path(data, 'tool.poetry.name') or path.parent.name
+
+        for item in iter_declared_dependencies(name, data, path.parent):
+            declared[item.dependency.name].append(item)
+
+    conflicts = []
+
+    for name in sorted(declared):
+        found = []
+
+        for left, right in combinations(declared[name], 2):
+            if not overlaps(left.dependency, right.dependency):
+                found.append((left, right))
+
+        for group in group_by_environment(declared[name]):
+            if len(group) < 3 or overlaps(*(d.dependency for d in group)):
+                continue
+
+            conflict = tuple(shrink_conflict(group))
+
+            # Conflicting pairs are all reported already
+            if len(conflict) > 2 and conflict not in found:
+                found.append(conflict)
+
+        conflicts.extend(Conflict(name, declarations) for declarations in found)
+
+    return conflicts
+
+
+def format_conflict(conflict: Conflict) -> str:
+    declarations = ', '.join(
+        f'<c1>{d.workspace}</c1> ({d.group}) requires <b>{d}</b>' for d in conflict.declarations
+    )
+
+    return f'<c1>{conflict.name}</c1>: {declarations}'
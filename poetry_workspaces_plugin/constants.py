@@ -2,4 +2,51 @@ SECTION_KEY = 'poetry-workspaces-plugin'
 
 LOG_PREFIX = '<fg=magenta>Workspaces:</fg=magenta>'
 
+CACHE_DIR = '.poetry-workspaces'
+
+# Directories that never hold workspace sources
+PRUNED_DIRECTORIES = frozenset({
+    '.git',
+    '.hg',
+    '.svn',
+    '.venv',
+    'venv',
+    '.tox',
+    '.nox',
+    '.mypy_cache',
+    '.pytest_cache',
+    '.ruff_cache',
+    '__pycache__',
+    'node_modules',
+    'build',
+    'dist',
+    CACHE_DIR,
+})
+
+# Resources each command reads ('shared') or changes ('exclusive'), where 'pyproject' is
+# the target's and 'pyprojects' those of every workspace
+COMMAND_LOCKS = {
+    'add': {'pyproject': 'exclusive', 'lock': 'exclusive', 'env': 'exclusive'},
+    'remove': {'pyproject': 'exclusive', 'lock': 'exclusive', 'env': 'exclusive'},
+    'update': {'lock': 'exclusive', 'env': 'exclusive'},
+    'lock': {'lock': 'exclusive'},
+    'install': {'lock': 'shared', 'env': 'exclusive'},
+    'sync': {'lock': 'shared', 'env': 'exclusive'},
+    'check': {'lock': 'shared'},
+    'show': {'lock': 'shared'},
+    'version': {'pyproject': 'exclusive'},
+    'workspaces add': {'pyprojects': 'exclusive', 'lock': 'exclusive'},
+    'workspaces check': {'lock': 'shared'},
+    'workspaces conflicts': {'lock': 'shared'},
+    'workspaces version': {'pyprojects': 'exclusive'},
+    'workspaces why': {'lock': 'shared'},
+}
+
+# Commands that only read what they lock when called without the argument that changes it,
+# or with --dry-run, by the name of that argument
+READ_ONLY_UNLESS_ARGUMENT = {
+    'version': 'version',
+    'workspaces version': 'version',
+}
+
 PYTHON_VERSION_RE = r'(([1-9][0-9]*!)?(0|[1-9][0-9]*)(\.(0|[1-9][0-9]*))*((a|b|rc)(0|[1-9][0-9]*))?(\.post(0|[1-9][0-9]*))?(\.dev(0|[1-9][0-9]*))?)'
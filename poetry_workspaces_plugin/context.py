@@ -1,13 +1,99 @@
-from dataclasses import dataclass, field
+from __future__ import annotations
 
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from packaging.utils import canonicalize_name
+
+from poetry_workspaces_plugin.config import Config
+from poetry_workspaces_plugin.discovery import WorkspaceInfo
+from poetry_workspaces_plugin.lock_groups import assign_lock_groups, get_lock_filename
 from poetry_workspaces_plugin.pyproject import PyProjectTOML
 
 
+if TYPE_CHECKING:
+    from poetry.poetry import Poetry
+    from poetry.repositories.repository_pool import RepositoryPool
+    from tomlkit import TOMLDocument
+
+
 @dataclass
 class Context:
     root_pyproject: PyProjectTOML
     target_pyproject: PyProjectTOML
-    workspaces_pyprojects: list[PyProjectTOML] = field(default_factory=list)
+    workspaces: list[WorkspaceInfo] = field(default_factory=list)
+    config: Config = field(default_factory=Config)
+
+    # Versions of the workspaces by name, which `workspace:` references render with
+    workspace_versions: dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+    # Keep the target's references to workspaces in merged data, as built packages require
+    # them while lock and install resolve workspaces from their directories
+    pin_workspaces: bool = False
+
+    # Lock group whose workspaces are merged, None being the default group
+    lock_group: str | None = None
+
+    # Poetry instances built for this context and any context derived from it
+    poetry_cache: dict[Any, Poetry] = field(default_factory=dict, repr=False, compare=False)
+
+    # Repository pools by sources, so that connections and metadata are shared by every
+    # Poetry instance built for this context and any context derived from it
+    pool_cache: dict[Any, RepositoryPool] = field(default_factory=dict, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Taken from the discovery records, so no document is loaded or rendered for it
+        if not self.workspace_versions:
+            self.workspace_versions = {
+                workspace.name: workspace.version for workspace in self.workspaces
+            }
+
+        # Share the target document with its workspace record rather than loading it twice
+        if workspace := self.workspaces_by_path.get(self.target_pyproject.path):
+            if not workspace.is_loaded:
+                workspace.pyproject = self.target_pyproject
+
+    @property
+    def workspaces_pyprojects(self) -> list[PyProjectTOML]:
+        """Full documents of all workspaces, loaded on first access."""
+        return [workspace.pyproject for workspace in self.workspaces]
+
+    def render(self, pyproject: PyProjectTOML) -> TOMLDocument:
+        """Render the references of a document with the workspace versions of the context.
+
+        Documents are shared by every context, so the versions are always passed explicitly
+        rather than set on the documents.
+        """
+        return pyproject.render(self.workspace_versions)
+
+    @cached_property
+    def workspaces_by_name(self) -> dict[str, WorkspaceInfo]:
+        return {canonicalize_name(workspace.name): workspace for workspace in self.workspaces}
+
+    @cached_property
+    def workspaces_by_path(self) -> dict[Path, WorkspaceInfo]:
+        return {workspace.path: workspace for workspace in self.workspaces}
+
+    @cached_property
+    def workspace_lock_groups(self) -> dict[str, str | None]:
+        """Lock groups of the workspaces by canonical name."""
+        return assign_lock_groups(self.config, self.root_pyproject.path.parent, self.workspaces)
+
+    @property
+    def lock_path(self) -> Path:
+        return self.get_lock_path(self.lock_group)
+
+    def get_lock_path(self, group: str | None) -> Path:
+        return self.root_pyproject.path.parent / get_lock_filename(group)
+
+    def get_lock_group(self, workspace: WorkspaceInfo) -> str | None:
+        return self.workspace_lock_groups[canonicalize_name(workspace.name)]
+
+    @property
+    def cache_dir(self) -> Path:
+        return self.root_pyproject.path.parent / self.config.cache_dir
 
     @property
     def target_is_root(self):
@@ -15,8 +101,102 @@ class Context:
 
     @property
     def target_is_managed(self):
-        return self.target_pyproject in self.workspaces_pyprojects
+        return self.target_pyproject.path in self.workspaces_by_path
 
     @property
     def should_manage(self):
         return bool(self.target_is_root or self.target_is_managed)
+
+    def with_pinned_workspaces(self) -> Context:
+        """Create a context whose merged data keeps the target's references to workspaces."""
+        return replace(self, pin_workspaces=True)
+
+    def with_lock_group(self, group: str | None) -> Context:
+        """Create a context that only merges the workspaces of a lock group."""
+        return replace(
+            self,
+            workspaces=[w for w in self.workspaces if self.get_lock_group(w) == group],
+            lock_group=group,
+        )
+
+    def for_target_lock_group(self) -> Context:
+        """Narrow the context to the lock group of its target, if lock groups are configured."""
+        if not self.config.lock_groups:
+            return self
+
+        workspace = self.workspaces_by_path.get(self.target_pyproject.path)
+
+        return self.with_lock_group(self.get_lock_group(workspace) if workspace else self.lock_group)
+
+    def split_lock_groups(self) -> list[Context]:
+        """Create a context for each lock group, starting with the default group."""
+        if not self.config.lock_groups:
+            return [self]
+
+        return [self.with_lock_group(group) for group in (None, *self.config.lock_groups)]
+
+    def detached(self) -> Context:
+        """Copy the context with documents, workspace records and caches of its own.
+
+        Documents and records load lazily and contexts derived from another one share them,
+        so a context used on another thread must not share them with any other.
+        """
+        root_pyproject = PyProjectTOML(self.root_pyproject.path)
+
+        if self.target_is_root:
+            target_pyproject = root_pyproject
+        else:
+            target_pyproject = PyProjectTOML(self.target_pyproject.path)
+
+        workspaces = [
+            WorkspaceInfo(w.name, w.version, w.path, w.dependencies, w.workspace_dependencies)
+            for w in self.workspaces
+        ]
+
+        return replace(
+            self,
+            root_pyproject=root_pyproject,
+            target_pyproject=target_pyproject,
+            workspaces=workspaces,
+            workspace_versions=dict(self.workspace_versions),
+            poetry_cache={},
+            pool_cache={},
+        )
+
+    def find_workspace(self, name_or_path: str) -> WorkspaceInfo | None:
+        """Find a workspace by its name or by the path of its directory."""
+        if workspace := self.workspaces_by_name.get(canonicalize_name(name_or_path)):
+            return workspace
+
+        for base in (Path.cwd(), self.root_pyproject.path.parent):
+            path = (base / name_or_path / 'pyproject.toml').resolve()
+
+            if workspace := self.workspaces_by_path.get(path):
+                return workspace
+
+    def with_target(self, target_pyproject: PyProjectTOML) -> Context:
+        """Create a context for another target that shares workspaces and built Poetry objects."""
+        return Context(
+            self.root_pyproject,
+            target_pyproject,
+            self.workspaces,
+            config=self.config,
+            workspace_versions=self.workspace_versions,
+            pin_workspaces=self.pin_workspaces,
+            lock_group=self.lock_group,
+            poetry_cache=self.poetry_cache,
+            pool_cache=self.pool_cache,
+        )
+
+    def root_only(self) -> Context:
+        """Create a context for the root project without any workspaces merged in."""
+        return Context(
+            self.root_pyproject,
+            self.root_pyproject,
+            [],
+            config=self.config,
+            workspace_versions=self.workspace_versions,
+            lock_group=self.lock_group,
+            poetry_cache=self.poetry_cache,
+            pool_cache=self.pool_cache,
+        )
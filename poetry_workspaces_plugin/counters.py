@@ -0,0 +1,31 @@
+"""Counters of expensive operations on hot paths.
+
+Counts are kept per process and are cheap enough to be always on. They show up with
+`--workspaces-debug`, and tests bound them to catch performance regressions.
+"""
+from collections import Counter
+
+
+TOML_PARSE = 'toml_parse'
+RENDER = 'pyproject_render'
+DEEPCOPY = 'deepcopy'
+VALIDATE = 'validate'
+MERGE = 'merge_data'
+CREATE_POETRY = 'create_poetry'
+CREATE_POOL = 'create_pool'
+
+OPERATIONS = (TOML_PARSE, RENDER, DEEPCOPY, VALIDATE, MERGE, CREATE_POETRY, CREATE_POOL)
+
+COUNTERS: Counter[str] = Counter()
+
+
+def count(operation: str, n: int = 1):
+    COUNTERS[operation] += n
+
+
+def reset():
+    COUNTERS.clear()
+
+
+def snapshot() -> dict[str, int]:
+    return {operation: COUNTERS[operation] for operation in OPERATIONS}
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import os
+import re
+import tomllib
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+from packaging.utils import canonicalize_name
+from poetry.core.pyproject.exceptions import PyProjectError
+
+from poetry_workspaces_plugin import counters
+from poetry_workspaces_plugin.config import Config
+from poetry_workspaces_plugin.constants import PRUNED_DIRECTORIES
+from poetry_workspaces_plugin.utils import get_path
+
+
+if TYPE_CHECKING:
+    from poetry_workspaces_plugin.pyproject import PyProjectTOML
+
+
+REQUIREMENT_NAME_RE = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)')
+
+
+class WorkspaceInfo:
+    """Compact record of a workspace, with its full document loaded on first use."""
+
+    __slots__ = ('name', 'version', 'path', 'dependencies', 'workspace_dependencies', '_pyproject')
+
+    def __init__(
+        self,
+        name: str,
+        version: str,
+        path: Path,
+        dependencies: tuple[str, ...] = (),
+        workspace_dependencies: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.version = version
+        self.path = path
+        self.dependencies = dependencies
+        self.workspace_dependencies = workspace_dependencies
+        self._pyproject: PyProjectTOML | None = None
+
+    def __repr__(self) -> str:
+        return f'WorkspaceInfo(name={self.name!r}, version={self.version!r}, path={self.path!r})'
+
+    @property
+    def pyproject(self) -> PyProjectTOML:
+        if self._pyproject is None:
+            from poetry_workspaces_plugin.pyproject import PyProjectTOML
+
+            self._pyproject = PyProjectTOML(self.path)
+
+        return self._pyproject
+
+    @pyproject.setter
+    def pyproject(self, pyproject: PyProjectTOML):
+        self._pyproject = pyproject
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._pyproject is not None
+
+
+def is_poetry_project(data: dict[str, Any]) -> bool:
+    """Check whether pyproject data describes a Poetry project, as Poetry itself does."""
+    if 'poetry' in data.get('tool', {}):
+        return True
+
+    project = data.get('project', {})
+
+    return bool(project.get('name') and project.get('version') and not project.get('dynamic'))
+
+
+def summarize_dependencies(data: dict[str, Any]) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Get the canonical names of all dependencies and of workspace protocol dependencies."""
+    dependencies: dict[str, None] = {}
+    workspace_dependencies: dict[str, None] = {}
+
+    requirements = list(get_path(data, 'project.dependencies') or [])
+
+    for group in (data.get('dependency-groups') or {}).values():
+        requirements.extend(group)
+
+    for requirement in requirements:
+        # Skip include-group tables of dependency groups
+        if not isinstance(requirement, str):
+            continue
+
+        if match := REQUIREMENT_NAME_RE.match(requirement):
+            name = canonicalize_name(match.group(1))
+
+            dependencies[name] = None
+
+            if 'workspace:' in requirement:
+                workspace_dependencies[name] = None
+
+    tables = [get_path(data, 'tool.poetry.dependencies') or {}]
+    tables.extend(
+        group.get('dependencies') or {}
+        for group in (get_path(data, 'tool.poetry.group') or {}).values()
+    )
+
+    for table in tables:
+        for name, spec in table.items():
+            if name == 'python':
+                continue
+
+            name = canonicalize_name(name)
+
+            dependencies[name] = None
+
+            if isinstance(spec, dict):
+                spec = spec.get('version', '')
+
+            if isinstance(spec, str) and 'workspace:' in spec:
+                workspace_dependencies[name] = None
+
+    return tuple(dependencies), tuple(workspace_dependencies)
+
+
+def load_workspace_info(dir: Path) -> WorkspaceInfo | None:
+    """Read the record of the Poetry project in a directory, if there is one."""
+    path = dir / 'pyproject.toml'
+
+    try:
+        with path.open('rb') as f:
+            counters.count(counters.TOML_PARSE)
+
+            data = tomllib.load(f)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    except Exception as e:
+        raise PyProjectError(f'Workspace "{dir.name}" pyproject.toml is invalid.\n\n{e}')
+
+    if not is_poetry_project(data):
+        return
+
+    name = get_path(data, 'project.name') or get_path(data, 'tool.poetry.name') or ''
+    version = (
+        get_path(data, 'project.version') or
+        get_path(data, 'tool.poetry.version') or
+        '0.0.0'
+    )
+
+    dependencies, workspace_dependencies = summarize_dependencies(data)
+
+    return WorkspaceInfo(name, version, path, dependencies, workspace_dependencies)
+
+
+def split_pattern(pattern: str) -> tuple[str, ...]:
+    return tuple(part for part in pattern.strip().split('/') if part not in ('', '.'))
+
+
+def match_pattern(
+    pattern: tuple[str, ...],
+    parts: tuple[str, ...],
+    partial=False,
+    pruned: frozenset[str] = frozenset(),
+) -> bool:
+    """Match the parts of a relative path against glob pattern segments.
+
+    With `partial`, check instead whether any path below the given one could match. Names
+    in `pruned` are only matched by literal segments, never by wildcards.
+    """
+    if not parts:
+        return bool(pattern) if partial else all(p == '**' for p in pattern)
+
+    if not pattern:
+        return False
+
+    if pattern[0] == '**':
+        return (
+            match_pattern(pattern[1:], parts, partial, pruned) or
+            (parts[0] not in pruned and match_pattern(pattern, parts[1:], partial, pruned))
+        )
+
+    if parts[0] in pruned and parts[0] != pattern[0]:
+        return False
+
+    return (
+        fnmatchcase(parts[0], pattern[0]) and
+        match_pattern(pattern[1:], parts[1:], partial, pruned)
+    )
+
+
+def iter_workspace_dirs(root_dir: Path, patterns: list[str], nested=False) -> Iterator[Path]:
+    """Yield directories matching workspace patterns that contain a pyproject.toml.
+
+    Patterns starting with `!` exclude the directories they match along with everything
+    below them. Heavy directories such as virtual environments and build outputs are only
+    entered when a pattern names them literally, and directories that no pattern could
+    match below are never entered. Unless nested
+    workspaces are allowed, workspaces other than the root are not searched for further
+    workspaces.
+    """
+    includes = [split_pattern(p) for p in patterns if not p.startswith('!')]
+    excludes = [split_pattern(p[1:]) for p in patterns if p.startswith('!')]
+
+    # Patterns such as `.` and `**` match the root directory itself, as they do with glob
+    if (
+        any(match_pattern(pattern, ()) for pattern in includes) and
+        not any(match_pattern(pattern, ()) for pattern in excludes) and
+        (root_dir / 'pyproject.toml').is_file()
+    ):
+        yield root_dir
+
+    stack: list[tuple[str, ...]] = [()]
+
+    while stack:
+        parts = stack.pop()
+
+        try:
+            with os.scandir(root_dir.joinpath(*parts)) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+        children = []
+
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+
+            child = (*parts, entry.name)
+
+            if any(match_pattern(pattern, child) for pattern in excludes):
+                continue
+
+            if any(
+                match_pattern(pattern, child, pruned=PRUNED_DIRECTORIES)
+                for pattern in includes
+            ):
+                if os.path.isfile(os.path.join(entry.path, 'pyproject.toml')):
+                    yield Path(entry.path)
+
+                    if not nested:
+                        continue
+
+            # Symlinked directories are matched but never walked, to avoid cycles
+            if entry.is_symlink():
+                continue
+
+            if any(
+                match_pattern(pattern, child, partial=True, pruned=PRUNED_DIRECTORIES)
+                for pattern in includes
+            ):
+                children.append(child)
+
+        stack.extend(reversed(children))
+
+
+def get_workspaces(config: Config, root_path: Path) -> list[WorkspaceInfo]:
+    """Get records of all managed workspaces."""
+    workspaces = []
+    seen = set()
+
+    for dir in iter_workspace_dirs(root_path.parent, config.workspaces, config.nested_workspaces):
+        resolved = dir.resolve()
+
+        # Overlapping patterns and symlinks can match the same workspace more than once
+        if resolved in seen:
+            continue
+
+        seen.add(resolved)
+
+        if workspace := load_workspace_info(dir):
+            workspaces.append(workspace)
+
+    return workspaces
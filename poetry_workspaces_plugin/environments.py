@@ -0,0 +1,311 @@
+"""Virtual environments of their own for each workspace.
+
+With `isolated-environments`, a workspace is installed into the `.venv` directory next to
+its pyproject.toml, along with the locked packages it needs and the workspaces it
+references. Wheels are unpacked once into a content-addressed store shared by every
+environment of the repository, and installed files are hardlinks into the store, so
+another environment neither unpacks nor copies any file of a wheel already stored.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import zipfile
+from dataclasses import replace
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterator
+
+from installer import install
+from installer.records import RecordEntry, parse_record_file
+from installer.sources import WheelContentElement, WheelSource
+from installer.utils import parse_wheel_filename
+from poetry.__version__ import __version__ as poetry_version
+from poetry.installation.wheel_installer import WheelDestination, WheelInstaller
+
+from poetry_workspaces_plugin.hashing import iter_tree
+
+
+if TYPE_CHECKING:
+    from cleo.io.io import IO
+    from installer.utils import Scheme
+    from poetry.config.config import Config as PoetryConfig
+    from poetry.installation.installer import Installer
+    from poetry.utils.env import Env, VirtualEnv
+
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.discovery import WorkspaceInfo
+
+
+# Bump whenever the layout of store entries changes
+STORE_FORMAT = 1
+
+STORE_DIR = 'store'
+ENV_DIR = '.venv'
+
+
+def create_env(path: Path, config: PoetryConfig, io: IO, prompt: str) -> VirtualEnv:
+    """Get the virtual environment in a directory, creating it with the preferred Python."""
+    from poetry.utils.env import EnvManager, VirtualEnv
+    from poetry.utils.env.python import Python
+
+    if not (path / 'pyvenv.cfg').exists():
+        python = Python.get_preferred_python(config=config, io=io)
+
+        EnvManager.build_venv(path, executable=python.executable, prompt=prompt)
+
+    return VirtualEnv(path)
+
+
+def get_workspace_env(workspace: WorkspaceInfo, config: PoetryConfig, io: IO) -> VirtualEnv:
+    return create_env(workspace.path.parent / ENV_DIR, config, io, workspace.name)
+
+
+def get_isolated_context(context: Context, workspace: WorkspaceInfo) -> Context:
+    """Create a context that merges a workspace with the workspaces it references only."""
+    from poetry_workspaces_plugin.prune import get_workspace_closure
+
+    target_context = context.with_target(workspace.pyproject).for_target_lock_group()
+    closure = get_workspace_closure(target_context, workspace.name)
+
+    return replace(target_context, workspaces=closure)
+
+
+def create_isolated_installer(
+    context: Context,
+    isolated: Context,
+    env: Env,
+    io: IO,
+    store: WheelStore,
+) -> Installer:
+    """Create an installer of the locked packages that the workspaces of a context need.
+
+    The lock file of the group is only fresh for the data merged from all its workspaces,
+    so the installer checks it against that, and resolves the packages to install again
+    from the locked ones alone.
+    """
+    from poetry.config.config import Config as PoetryConfig
+    from poetry.installation.executor import Executor
+    from poetry.installation.installer import Installer
+
+    from poetry_workspaces_plugin.factory import Factory
+
+    group_context = context.with_target(context.root_pyproject)
+    locker = Factory().get_poetry(group_context.with_lock_group(isolated.lock_group)).locker
+
+    # Built rather than reused, as cached instances of the target merge all workspaces
+    poetry = Factory().create_poetry(isolated)
+
+    # Poetry's configuration is shared by every instance, so change a copy of it
+    config = PoetryConfig()
+    config.merge(poetry.config.all())
+    config.merge({'installer': {'re-resolve': True}})
+
+    executor = Executor(
+        env,
+        poetry.pool,
+        config,
+        io,
+        disable_cache=poetry.disable_cache,
+        build_constraints=poetry.build_constraints,
+    )
+    executor._wheel_installer = LinkingWheelInstaller(
+        env,
+        store,
+        poetry.pool.artifact_cache._cache_dir,
+    )
+
+    return Installer(
+        io,
+        env,
+        poetry.package,
+        locker,
+        poetry.pool,
+        config,
+        executor=executor,
+        disable_cache=poetry.disable_cache,
+        build_constraints=poetry.build_constraints,
+    )
+
+
+class WheelStore:
+    """Unpacked wheels by the SHA-256 digest of the wheel file."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    @classmethod
+    def from_context(cls, context: Context) -> WheelStore:
+        return cls(context.cache_dir / STORE_DIR / f'v{STORE_FORMAT}')
+
+    def unpack(self, wheel: Path) -> Path:
+        """Get the unpacked files of a wheel, unpacking them on first use."""
+        with wheel.open('rb') as f:
+            digest = hashlib.file_digest(f, 'sha256').hexdigest()
+
+        entry = self.directory / digest[:2] / digest
+
+        if entry.is_dir():
+            return entry
+
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        staging = Path(tempfile.mkdtemp(prefix=f'.{digest}.', dir=entry.parent))
+
+        try:
+            with zipfile.ZipFile(wheel) as archive:
+                for item in archive.infolist():
+                    parts = item.filename.split('/')
+
+                    if item.is_dir() or item.filename.startswith('/') or '..' in parts:
+                        continue
+
+                    destination = staging.joinpath(*parts)
+                    destination.parent.mkdir(parents=True, exist_ok=True)
+
+                    with archive.open(item) as source, destination.open('wb') as target:
+                        shutil.copyfileobj(source, target)
+
+                    if (item.external_attr >> 16) & 0o111:
+                        destination.chmod(0o755)
+
+            try:
+                os.replace(staging, entry)
+            except OSError:
+                # Another process stored the same wheel in the meantime
+                if not entry.is_dir():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return entry
+
+
+class StoredWheel(WheelSource):
+    """Wheel source reading the files of a wheel unpacked in the store."""
+
+    def __init__(self, entry: Path, filename: str) -> None:
+        parsed = parse_wheel_filename(filename)
+
+        super().__init__(distribution=parsed.distribution, version=parsed.version)
+
+        self.entry = entry
+
+    @cached_property
+    def dist_info_dir(self) -> str:
+        # Distribution names in wheel filenames are normalized, unlike the directory
+        return next(p.name for p in self.entry.iterdir() if p.name.endswith('.dist-info'))
+
+    @property
+    def dist_info_filenames(self) -> list[str]:
+        return sorted(p.name for p in (self.entry / self.dist_info_dir).iterdir() if p.is_file())
+
+    def read_dist_info(self, filename: str) -> str:
+        return (self.entry / self.dist_info_dir / filename).read_text(encoding='utf-8')
+
+    @cached_property
+    def records(self) -> dict[str, tuple[str, str, str]]:
+        rows = self.read_dist_info('RECORD').splitlines()
+
+        return {record[0]: record for record in parse_record_file(rows)}
+
+    def stored_records(self) -> dict[str, RecordEntry]:
+        """Get the entries of the RECORD file by the path of each file in the store."""
+        stored = {}
+
+        for path, record in self.records.items():
+            entry = RecordEntry.from_elements(*record)
+
+            if entry.hash_ is not None and entry.size is not None:
+                stored[str(self.entry / path)] = entry
+
+        return stored
+
+    def get_contents(self) -> Iterator[WheelContentElement]:
+        for path in iter_tree(self.entry, frozenset()):
+            stored_path = self.entry / path
+
+            record = self.records.get(path, (path, '', ''))
+
+            with stored_path.open('rb') as stream:
+                yield record, stream, os.access(stored_path, os.X_OK)
+
+
+class LinkingWheelDestination(WheelDestination):
+    """Destination that hardlinks files read from the store rather than writing them.
+
+    Files rewritten on the way, such as scripts with a `#!python` shebang, are written as
+    usual, as are files without a hash in the RECORD of their wheel.
+    """
+
+    def __init__(self, *args, stored: dict[str, RecordEntry], **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self.stored = stored
+
+    def write_to_fs(
+        self,
+        scheme: Scheme,
+        path: str,
+        stream: BinaryIO,
+        is_executable: bool,
+    ) -> RecordEntry:
+        target_dir = self._abspath_scheme_dir(scheme)
+        target_path = os.path.abspath(os.path.join(target_dir, path))
+
+        if not target_path.startswith(target_dir + os.sep):
+            raise ValueError(f'Attempting to write {path} outside of the target directory')
+
+        # Replace files rather than write through them, as they may be links into the store
+        if os.path.lexists(target_path):
+            os.unlink(target_path)
+
+        record = self.stored.get(getattr(stream, 'name', None))  # type: ignore[arg-type]
+
+        if record is None:
+            return super().write_to_fs(scheme, path, stream, is_executable)
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+
+        try:
+            os.link(stream.name, target_path)
+        except OSError:
+            shutil.copy2(stream.name, target_path)
+
+        return RecordEntry(path, record.hash_, record.size)
+
+
+class LinkingWheelInstaller(WheelInstaller):
+    """Install wheels of the artifact cache by hardlinking from the store."""
+
+    def __init__(self, env: Env, store: WheelStore, artifacts_dir: Path) -> None:
+        super().__init__(env)
+
+        self._store = store
+        self._artifacts_dir = artifacts_dir
+
+    def install(self, wheel: Path) -> None:
+        # Wheels built from workspaces and other local sources change with every build
+        if not wheel.is_relative_to(self._artifacts_dir):
+            return super().install(wheel)
+
+        source = StoredWheel(self._store.unpack(wheel), wheel.name)
+
+        scheme_dict = self._env.scheme_dict.copy()
+        scheme_dict['headers'] = str(Path(scheme_dict['include']) / source.distribution)
+
+        destination = LinkingWheelDestination(
+            scheme_dict,
+            interpreter=str(self._env.python),
+            script_kind=self._script_kind,
+            bytecode_optimization_levels=self._bytecode_optimization_levels,
+            stored=source.stored_records(),
+        )
+
+        install(
+            source=source,
+            destination=destination,
+            additional_metadata={'INSTALLER': f'Poetry {poetry_version}'.encode()},
+        )
@@ -1,3 +1,11 @@
+from __future__ import annotations
+
+import json
+import threading
+from concurrent.futures import Executor, Future
+from pathlib import Path
+from typing import Any, Iterable
+
 from cleo.io.null_io import NullIO
 from poetry.__version__ import __version__ as poetry_version
 from poetry.config.config import Config
@@ -10,14 +18,96 @@ from poetry.config.config import Config
 from poetry.factory import Factory as BaseFactory
 from poetry.packages import Locker
 from poetry.poetry import Poetry
+from poetry.repositories.repository_pool import RepositoryPool
 
+from poetry_workspaces_plugin import counters
 from poetry_workspaces_plugin.context import Context
 from poetry_workspaces_plugin.merge import PyProjectMerged
-from poetry_workspaces_plugin.utils import set_path
+from poetry_workspaces_plugin.utils import get_path, set_path
+
+
+# Guards the pool cache against workspace Poetry instances being built concurrently
+_pool_lock = threading.Lock()
 
 
 class Factory(BaseFactory):
 
+    def get_poetry(self, context: Context) -> Poetry:
+        """Get the Poetry instance for a context, reusing one already built for its target."""
+        context = context.for_target_lock_group()
+
+        key = (
+            context.target_pyproject.path,
+            bool(context.workspaces),
+            context.pin_workspaces,
+            context.lock_group,
+        )
+
+        poetry = context.poetry_cache.get(key)
+
+        if poetry is None:
+            poetry = context.poetry_cache[key] = self.create_poetry(context)
+
+        return poetry
+
+    def create_workspaces_poetry(
+        self,
+        context: Context,
+        executor: Executor,
+    ) -> dict[Path, Future[Poetry]]:
+        """Start building a Poetry instance for each workspace on its own, without the others merged in."""
+        # Load all documents up front, so that the workers only ever read shared state
+        context.root_pyproject.data_raw
+
+        futures = {}
+
+        for workspace_pyproject in context.workspaces_pyprojects:
+            workspace_pyproject.data_raw
+
+            workspace_context = Context(
+                context.root_pyproject,
+                workspace_pyproject,
+                [],
+                config=context.config,
+                workspace_versions=context.workspace_versions,
+                lock_group=context.lock_group,
+                pool_cache=context.pool_cache,
+            )
+
+            futures[workspace_pyproject.path] = executor.submit(self.create_poetry, workspace_context)
+
+        return futures
+
+    def get_pool(
+        self,
+        context: Context,
+        config: Config,
+        sources: Iterable[dict[str, Any]],
+        disable_cache: bool = False,
+    ) -> RepositoryPool:
+        """Get the repository pool for a set of sources, reusing one already created for them.
+
+        Sharing repositories shares their HTTP sessions, which keep connections to each index
+        alive, and their in-memory caches, so each page is only requested once per process.
+        """
+        sources = [dict(source) for source in sources]
+        key = (json.dumps(sources, sort_keys=True, default=str), disable_cache)
+
+        with _pool_lock:
+            pool = context.pool_cache.get(key)
+
+            if pool is None:
+                counters.count(counters.CREATE_POOL)
+
+                pool = context.pool_cache[key] = self.create_pool(
+                    config,
+                    sources,
+                    NullIO(),
+                    disable_cache=disable_cache,
+                )
+
+        return pool
+
     def create_poetry(self, context: Context):  # type: ignore[reportIncompatibleMethodOverride]
         """Modified version of Factory().create_poetry()
 
@@ -28,9 +118,12 @@ class Factory(BaseFactory):
             workspace depends on it
         Build: No shared venv but need to substitute "workspace:" protocol dependencies
         """
+        counters.count(counters.CREATE_POETRY)
+
+        context = context.for_target_lock_group()
+
         with_groups = True
         disable_cache = False
-        io = NullIO()
 
         merged_pyproject = PyProjectMerged(context)
 
@@ -38,8 +131,10 @@ class Factory(BaseFactory):
         if context.target_is_root:
             set_path(merged_pyproject.data, 'tool.poetry.package-mode', False)
 
-        def validate(pyproject):
-            check_result = BaseFactory.validate(pyproject.data)
+        def validate(data):
+            counters.count(counters.VALIDATE)
+
+            check_result = BaseFactory.validate(data)
 
             if check_result["errors"]:
                 message = ""
@@ -48,8 +143,11 @@ class Factory(BaseFactory):
 
                 raise RuntimeError("The Poetry configuration is invalid:\n" + message)
 
-        validate(context.root_pyproject)
-        validate(merged_pyproject)
+        # Rendered once, as every read of the data renders the document again
+        root_data = context.render(context.root_pyproject)
+
+        validate(root_data)
+        validate(merged_pyproject.data)
 
         project = merged_pyproject.data.get('project', {})
         name = project.get('name') or merged_pyproject.poetry_config.get('name', 'non-package-mode')
@@ -64,7 +162,7 @@ class Factory(BaseFactory):
             with_groups=with_groups,
         )
 
-        if version_str := context.root_pyproject.poetry_config.get('requires-poetry'):
+        if version_str := get_path(root_data, 'tool.poetry.requires-poetry'):
             version_constraint = parse_constraint(version_str)
             version = Version.parse(poetry_version)
 
@@ -80,19 +178,19 @@ class Factory(BaseFactory):
         #     target_path,
         #     workspaces_paths,
         # )
-        locker = Locker(context.root_pyproject.path.parent / 'poetry.lock', merged_pyproject.data)
+        locker = Locker(context.lock_path, merged_pyproject.data)
 
         # Loading global configuration
         config = Config.create()
 
         # Loading local configuration
-        config.merge(context.root_pyproject.data)
+        config.merge(root_data)
 
         # Load local sources
         repositories = {}
         existing_repositories = config.get('repositories', {})
 
-        for source in context.root_pyproject.poetry_config.get('source', []):
+        for source in get_path(root_data, 'tool.poetry.source') or []:
             name = source.get('name')
             url = source.get('url')
             if name and url and name not in existing_repositories:
@@ -122,10 +220,10 @@ class Factory(BaseFactory):
         )
 
         poetry.set_pool(
-            Factory.create_pool(
+            self.get_pool(
+                context,
                 config,
                 poetry.local_config.get('source', []),
-                io,
                 disable_cache=disable_cache,
             )
         )
@@ -0,0 +1,271 @@
+"""Locks that keep concurrent invocations of the plugin from corrupting shared state.
+
+Each resource, whether a lock file, a pyproject.toml or a virtual environment, has a file
+of its own in the cache directory that is locked with flock. Commands that only read a
+resource share its lock, and commands that change it hold the lock alone. Processes that
+hold a lock alone record their PID and command line in its file, so that any process
+left waiting can tell what it waits for.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
+from poetry_workspaces_plugin.constants import (
+    COMMAND_LOCKS,
+    LOG_PREFIX,
+    READ_ONLY_UNLESS_ARGUMENT,
+)
+
+
+try:
+    import fcntl
+except ImportError:
+    # Platforms without flock run without inter-process locks
+    fcntl = None
+
+
+if TYPE_CHECKING:
+    from cleo.io.inputs.input import Input
+    from cleo.io.io import IO
+
+    from poetry_workspaces_plugin.context import Context
+
+
+LOCKS_DIR = 'locks'
+
+POLL_INTERVAL = 0.1
+
+
+class LockTimeoutError(RuntimeError):
+    pass
+
+
+class LockModeError(RuntimeError):
+    pass
+
+
+class FileLock:
+    """Lock on a file held by this process, shared with other readers or held alone."""
+
+    def __init__(
+        self,
+        path: Path,
+        description: str,
+        shared: bool = False,
+        timeout: float = 300,
+        io: IO | None = None,
+    ) -> None:
+        self.path = path
+        self.description = description
+        self.shared = shared
+        self.timeout = timeout
+        self.io = io
+
+        self._fd: int | None = None
+
+    def __enter__(self):
+        self.acquire()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def acquire(self):
+        if fcntl is None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        operation = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+        deadline = time.monotonic() + self.timeout
+        waiting = False
+
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, operation | fcntl.LOCK_NB)
+
+                    break
+                except BlockingIOError:
+                    pass
+
+                if time.monotonic() >= deadline:
+                    raise LockTimeoutError(
+                        f'Timed out after {self.timeout:g}s waiting for {self.description},'
+                        f' {self._describe_holder(fd)}'
+                    )
+
+                if not waiting and self.io is not None:
+                    self.io.write_error_line(
+                        f'{LOG_PREFIX} Waiting for {self.description},'
+                        f' {self._describe_holder(fd)}'
+                    )
+
+                waiting = True
+
+                time.sleep(POLL_INTERVAL)
+        except BaseException:
+            os.close(fd)
+
+            raise
+
+        if not self.shared:
+            os.ftruncate(fd, 0)
+            os.pwrite(fd, f'{os.getpid()} {" ".join(sys.argv)}'.encode(), 0)
+
+        self._fd = fd
+
+    def release(self):
+        if self._fd is None:
+            return
+
+        # Clear the holder first, so that nobody reports a process that is gone
+        if not self.shared:
+            os.ftruncate(self._fd, 0)
+
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+
+        self._fd = None
+
+    @staticmethod
+    def _describe_holder(fd: int) -> str:
+        holder = os.pread(fd, 4096, 0).decode(errors='replace').strip()
+
+        if not holder:
+            return 'held by another process'
+
+        pid, _, command = holder.partition(' ')
+
+        return f'held by process {pid} ({command})'
+
+
+@dataclass(frozen=True)
+class Resource:
+    """Something that concurrent commands read and change, by a key unique to it."""
+    key: str
+    description: str
+
+
+def get_lock(context: Context, resource: Resource, shared: bool, io: IO | None = None) -> FileLock:
+    path = context.cache_dir / LOCKS_DIR / f'{quote(resource.key, safe="")}.lock'
+
+    return FileLock(path, resource.description, shared, context.config.lock_timeout, io)
+
+
+def _relative(context: Context, path: Path) -> str:
+    return path.relative_to(context.root_pyproject.path.parent).as_posix()
+
+
+def lock_file_resources(context: Context) -> list[Resource]:
+    """Get the lock files that commands run in a context read and write."""
+    if context.target_is_root:
+        contexts = context.split_lock_groups()
+    else:
+        contexts = [context.for_target_lock_group()]
+
+    resources = []
+
+    for group_context in contexts:
+        path = _relative(context, group_context.lock_path)
+        resources.append(Resource(f'lock:{path}', f'lock file {path}'))
+
+    return resources
+
+
+def pyproject_resources(context: Context, all_workspaces: bool = False) -> list[Resource]:
+    """Get the pyproject.toml of the target, or of every workspace."""
+    if all_workspaces:
+        paths = [w.path for w in context.workspaces]
+    else:
+        paths = [context.target_pyproject.path]
+
+    resources = []
+
+    for path in paths:
+        relative = _relative(context, path)
+        resources.append(Resource(f'pyproject:{relative}', relative))
+
+    return resources
+
+
+def env_resources(context: Context) -> list[Resource]:
+    """Get the virtual environments that commands run in a context install into."""
+    from poetry_workspaces_plugin.environments import ENV_DIR
+
+    if context.config.isolated_environments:
+        if context.target_is_root:
+            workspaces = context.workspaces
+        else:
+            workspaces = [context.workspaces_by_path[context.target_pyproject.path]]
+
+        return [
+            Resource(f'env:{path}', f'environment {path}')
+            for path in (_relative(context, w.path.parent / ENV_DIR) for w in workspaces)
+        ]
+
+    if context.target_is_root:
+        groups = [c.lock_group for c in context.split_lock_groups()]
+    else:
+        groups = [context.for_target_lock_group().lock_group]
+
+    resources = []
+
+    for group in groups:
+        lock_group = context.config.lock_groups.get(group) if group is not None else None
+
+        # Groups without an environment of their own install into the root one
+        if lock_group is not None and lock_group.virtualenv:
+            resources.append(Resource(f'env:{group}', f'environment of lock group {group}'))
+        else:
+            resources.append(Resource('env', 'root environment'))
+
+    return resources
+
+
+def is_read_only(command_name: str, input: Input) -> bool:
+    """Check whether a command only reads the resources it locks, as called with an input."""
+    argument = READ_ONLY_UNLESS_ARGUMENT.get(command_name)
+
+    if argument is None or not input.has_argument(argument):
+        return False
+
+    if input.has_option('dry-run') and input.option('dry-run'):
+        return True
+
+    return not input.argument(argument)
+
+
+def get_command_locks(
+    context: Context,
+    command_name: str,
+    io: IO | None = None,
+    read_only: bool = False,
+) -> list[FileLock]:
+    """Get the locks a command needs, in the order in which every process takes them.
+
+    Commands that only read share every lock, whatever they would take to change things.
+    """
+    locks = {}
+
+    for kind, mode in COMMAND_LOCKS.get(command_name, {}).items():
+        if kind == 'lock':
+            resources = lock_file_resources(context)
+        elif kind == 'env':
+            resources = env_resources(context)
+        else:
+            resources = pyproject_resources(context, all_workspaces=kind == 'pyprojects')
+
+        for resource in resources:
+            locks[resource.key] = get_lock(context, resource, read_only or mode == 'shared', io)
+
+    # Taking locks in a single global order means that no two processes deadlock
+    return [locks[key] for key in sorted(locks)]
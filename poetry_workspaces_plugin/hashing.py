@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, NamedTuple
+
+from poetry_workspaces_plugin import counters
+from poetry_workspaces_plugin.constants import PRUNED_DIRECTORIES
+from poetry_workspaces_plugin.discovery import match_pattern, split_pattern
+from poetry_workspaces_plugin.utils import get_path
+
+
+if TYPE_CHECKING:
+    from poetry_workspaces_plugin.context import Context
+
+
+# Bump whenever the layout of the stat cache changes
+STAT_CACHE_FORMAT = 1
+
+STAT_CACHE_FILE = 'hash-stat.bin'
+
+# Files modified this recently may change again within the same mtime tick, so their
+# digests are not cached, as git does for racily clean index entries
+RACY_INTERVAL_NS = 2_000_000_000
+
+
+def iter_tree(
+    root: Path,
+    exclude: frozenset[str] = PRUNED_DIRECTORIES,
+    skip_dirs: frozenset[Path] = frozenset(),
+):
+    """Yield the relative POSIX paths of all files below a directory, in sorted order.
+
+    Directories named in `exclude`, and the directories at the paths in `skip_dirs`,
+    are not walked.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames if d not in exclude and Path(dirpath, d) not in skip_dirs
+        )
+
+        base = Path(dirpath).relative_to(root)
+
+        for filename in sorted(filenames):
+            yield (base / filename).as_posix()
+
+
+def hash_tree(root: Path, exclude: frozenset[str] = PRUNED_DIRECTORIES) -> str:
+    """Hash the paths and contents of every file below a directory."""
+    digest = hashlib.sha256()
+
+    for relative_path in iter_tree(root, exclude):
+        with open(root / relative_path, 'rb') as f:
+            file_digest = hashlib.file_digest(f, 'sha256').hexdigest()
+
+        digest.update(f'{relative_path}\0{file_digest}\n'.encode())
+
+    return digest.hexdigest()
+
+
+class IgnoreRule(NamedTuple):
+    pattern: tuple[str, ...]
+    negate: bool
+    directory_only: bool
+
+
+def parse_gitignore(content: str) -> list[IgnoreRule]:
+    """Parse the patterns of a .gitignore file."""
+    rules = []
+
+    for line in content.splitlines():
+        line = line.rstrip()
+
+        if not line or line.startswith('#'):
+            continue
+
+        negate = line.startswith('!')
+        line = line.removeprefix('!').removeprefix('\\')
+
+        directory_only = line.endswith('/')
+        line = line.rstrip('/')
+
+        # Patterns without an inner slash match at any depth
+        pattern = split_pattern(line)
+
+        if '/' not in line:
+            pattern = ('**', *pattern)
+
+        if pattern:
+            rules.append(IgnoreRule(pattern, negate, directory_only))
+
+    return rules
+
+
+class IgnoreRules:
+    """Rules of the .gitignore files of a tree by the directory that holds them."""
+
+    def __init__(self) -> None:
+        self._rules: list[tuple[tuple[str, ...], list[IgnoreRule]]] = []
+
+    def load(self, parts: tuple[str, ...], directory: Path):
+        try:
+            content = (directory / '.gitignore').read_text(errors='replace')
+        except OSError:
+            return
+
+        self._rules.append((parts, parse_gitignore(content)))
+
+    def is_ignored(self, parts: tuple[str, ...], is_dir: bool) -> bool:
+        ignored = False
+
+        for base, rules in self._rules:
+            if parts[:len(base)] != base:
+                continue
+
+            relative = parts[len(base):]
+
+            for rule in rules:
+                if rule.directory_only and not is_dir:
+                    continue
+
+                if match_pattern(rule.pattern, relative):
+                    ignored = not rule.negate
+
+        return ignored
+
+
+def iter_source_files(
+    workspace_dir: Path,
+    root_dir: Path | None = None,
+    skip: Iterable[Path] = (),
+) -> Iterator[Path]:
+    """Yield the files of a workspace that are not ignored by any .gitignore file.
+
+    The .gitignore files of the directories from the root down to the workspace apply
+    as well. Directories in `skip`, such as nested workspaces, are left out.
+    """
+    root_dir = root_dir if root_dir and workspace_dir.is_relative_to(root_dir) else workspace_dir
+    skip = {str(path) for path in skip}
+
+    rules = IgnoreRules()
+    prefix = workspace_dir.relative_to(root_dir).parts
+
+    for i in range(len(prefix)):
+        rules.load(prefix[:i], root_dir.joinpath(*prefix[:i]))
+
+    stack = [prefix]
+
+    while stack:
+        parts = stack.pop()
+        directory = root_dir.joinpath(*parts)
+
+        rules.load(parts, directory)
+
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name, reverse=True)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+        for entry in entries:
+            child = (*parts, entry.name)
+
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in PRUNED_DIRECTORIES or entry.path in skip:
+                    continue
+
+                if not rules.is_ignored(child, True):
+                    stack.append(child)
+
+            elif entry.is_file() and not rules.is_ignored(child, False):
+                yield Path(entry.path)
+
+
+def iter_workspace_files(
+    data: dict[str, Any],
+    workspace_dir: Path,
+    root_dir: Path | None = None,
+    skip: Iterable[Path] = (),
+) -> list[tuple[str, Path]]:
+    """Get the files of a workspace by their path relative to it, sorted by that path.
+
+    Files matching the `exclude` globs of the Poetry configuration are left out, and the
+    `packages` and `include` entries are added even where a .gitignore file ignores them
+    or they live outside of the workspace directory.
+    """
+    files = {}
+
+    for path in iter_source_files(workspace_dir, root_dir, skip):
+        files[path.relative_to(workspace_dir).as_posix()] = path
+
+    excludes = [split_pattern(p) for p in get_path(data, 'tool.poetry.exclude') or []]
+
+    if excludes:
+        files = {
+            name: path for name, path in files.items()
+            if not any(match_pattern(pattern, tuple(name.split('/'))) for pattern in excludes)
+        }
+
+    includes = []
+
+    for package in get_path(data, 'tool.poetry.packages') or []:
+        base = workspace_dir / package.get('from', '.')
+        includes.extend(base.glob(package['include']))
+
+    for include in get_path(data, 'tool.poetry.include') or []:
+        pattern = include['path'] if isinstance(include, dict) else include
+        includes.extend(workspace_dir.glob(pattern))
+
+    for path in includes:
+        if path.is_dir():
+            paths = [path / relative_path for relative_path in iter_tree(path)]
+        else:
+            paths = [path]
+
+        for path in paths:
+            files[os.path.relpath(path, workspace_dir).replace(os.sep, '/')] = path
+
+    return sorted(files.items())
+
+
+class StatCache:
+    """Digests of files, reused while their inode, size and modification time match."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._entries: dict[str, tuple[int, int, int, str]] = {}
+        self._used: set[str] = set()
+        self._changed = False
+
+        if path is None:
+            return
+
+        try:
+            with path.open('rb') as f:
+                version, entries = marshal.load(f)
+
+            if version == STAT_CACHE_FORMAT:
+                self._entries = entries
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    @classmethod
+    def from_context(cls, context: Context) -> StatCache:
+        return cls(context.cache_dir / STAT_CACHE_FILE)
+
+    def get(self, path: str, stat: os.stat_result) -> str | None:
+        entry = self._entries.get(path)
+
+        if entry and entry[:3] == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+            self._used.add(path)
+
+            return entry[3]
+
+    def put(self, path: str, stat: os.stat_result, digest: str):
+        if stat.st_mtime_ns > time.time_ns() - RACY_INTERVAL_NS:
+            return
+
+        self._entries[path] = (stat.st_ino, stat.st_size, stat.st_mtime_ns, digest)
+        self._used.add(path)
+        self._changed = True
+
+    def save(self, prune=False):
+        """Write the cache, with `prune` only keeping the entries of files seen since loading."""
+        if prune and len(self._used) < len(self._entries):
+            self._entries = {path: self._entries[path] for path in self._used}
+            self._changed = True
+
+        if self.path is None or not self._changed:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary_path = self.path.with_suffix('.tmp')
+
+        with temporary_path.open('wb') as f:
+            marshal.dump((STAT_CACHE_FORMAT, self._entries), f)
+
+        temporary_path.replace(self.path)
+
+        self._changed = False
+
+
+def hash_file(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def hash_files(
+    files: list[tuple[str, Path]],
+    stat_cache: StatCache,
+    executor: ThreadPoolExecutor | None = None,
+) -> str:
+    """Hash names and contents of files, reading only those the stat cache misses."""
+    stats = {}
+    digests: dict[str, str] = {}
+
+    for _, path in files:
+        key = str(path)
+        stats[key] = stat = os.stat(key)
+
+        if (digest := stat_cache.get(key, stat)) is not None:
+            digests[key] = digest
+
+    missing = [key for key in stats if key not in digests]
+
+    if missing:
+        if executor is None:
+            digests.update(zip(missing, map(hash_file, missing)))
+        else:
+            digests.update(zip(missing, executor.map(hash_file, missing)))
+
+    for key in missing:
+        stat_cache.put(key, stats[key], digests[key])
+
+    digest = hashlib.sha256()
+
+    for name, path in files:
+        digest.update(f'{name}\0{digests[str(path)]}\n'.encode())
+
+    return digest.hexdigest()
+
+
+def hash_directories(
+    root_dir: Path,
+    workspace_dirs: list[Path],
+    selected: list[Path] | None = None,
+    stat_cache: StatCache | None = None,
+) -> dict[Path, str]:
+    """Hash the source files of workspace directories, all of them by default."""
+    stat_cache = stat_cache or StatCache()
+    hashes = {}
+
+    with ThreadPoolExecutor(thread_name_prefix='poetry-workspaces-hash') as executor:
+        for workspace_dir in workspace_dirs if selected is None else selected:
+            counters.count(counters.TOML_PARSE)
+
+            with (workspace_dir / 'pyproject.toml').open('rb') as f:
+                data = tomllib.load(f)
+
+            # Nested workspaces are hashed on their own
+            skip = [
+                d for d in workspace_dirs
+                if d != workspace_dir and d.is_relative_to(workspace_dir)
+            ]
+            files = iter_workspace_files(data, workspace_dir, root_dir, skip)
+
+            hashes[workspace_dir] = hash_files(files, stat_cache, executor)
+
+    # Entries of files that were not seen are only stale once every workspace is hashed
+    stat_cache.save(prune=selected is None)
+
+    return hashes
+
+
+def hash_workspaces(context: Context, names: Iterable[str] | None = None) -> dict[str, str]:
+    """Hash the source files of workspaces, all of them by default, by workspace name."""
+    workspaces = context.workspaces
+
+    if names is not None:
+        workspaces = []
+
+        for name in names:
+            workspace = context.find_workspace(name)
+
+            if workspace is None:
+                raise ValueError(f'Could not find a project with the name: {name}')
+
+            workspaces.append(workspace)
+
+    hashes = hash_directories(
+        context.root_pyproject.path.parent,
+        [w.path.parent for w in context.workspaces],
+        None if names is None else [w.path.parent for w in workspaces],
+        StatCache.from_context(context),
+    )
+
+    return {workspace.name: hashes[workspace.path.parent] for workspace in workspaces}
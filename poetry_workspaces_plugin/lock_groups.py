@@ -0,0 +1,127 @@
+"""Clusters of workspaces that are resolved and locked apart from each other.
+
+Workspaces outside of every configured group make up the default group, which keeps the
+root poetry.lock and environment. Each named group is locked to its own file next to it,
+and can ask for a virtual environment of its own:
+
+    [tool.poetry-workspaces-plugin.lock-groups]
+    web = ["services/*"]
+    data = { workspaces = ["notebooks/*"], virtualenv = true }
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from packaging.utils import canonicalize_name
+
+from poetry_workspaces_plugin.discovery import match_pattern, split_pattern
+from poetry_workspaces_plugin.lock_index import LockIndex
+
+
+if TYPE_CHECKING:
+    from cleo.io.io import IO
+    from poetry.config.config import Config as PoetryConfig
+    from poetry.utils.env import Env
+
+    from poetry_workspaces_plugin.config import Config
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.discovery import WorkspaceInfo
+
+
+LOCK_FILE = 'poetry.lock'
+VENVS_DIR = 'venvs'
+
+
+def get_lock_filename(group: str | None) -> str:
+    """Get the name of the lock file of a group, None being the default group."""
+    return LOCK_FILE if group is None else f'poetry.{group}.lock'
+
+
+def load_lock_index(context: Context, group: str | None) -> LockIndex | None:
+    """Load the index of the lock file of a group, None when it is not locked yet."""
+    lock_path = context.get_lock_path(group)
+
+    if not lock_path.exists():
+        return None
+
+    # Each lock file has its own cache directory, holding the indexes of its most recent
+    # contents up to MAX_CACHED_INDEXES
+    index_dir = 'lock-index' if group is None else f'lock-index-{group}'
+
+    return LockIndex.load(lock_path, context.cache_dir / index_dir)
+
+
+def load_lock_indexes(context: Context) -> dict[str | None, LockIndex]:
+    """Load the indexes of the lock files of all groups that are locked."""
+    indexes = {}
+
+    for group in (None, *context.config.lock_groups):
+        if (index := load_lock_index(context, group)) is not None:
+            indexes[group] = index
+
+    return indexes
+
+
+def assign_lock_groups(
+    config: Config,
+    root_dir: Path,
+    workspaces: list[WorkspaceInfo],
+) -> dict[str, str | None]:
+    """Get the lock group of each workspace by canonical name, None for the default group.
+
+    Groups match the paths of workspace directories against their patterns, as the
+    `workspaces` setting does. A workspace may only be in one group, and may only reference
+    workspaces of its own group, as references are installed along with the group.
+    """
+    patterns = {
+        name: [split_pattern(pattern) for pattern in group.workspaces]
+        for name, group in config.lock_groups.items()
+    }
+    groups: dict[str, str | None] = {}
+
+    for workspace in workspaces:
+        parts = workspace.path.parent.relative_to(root_dir).parts
+        matched = [
+            name for name, group_patterns in patterns.items()
+            if any(match_pattern(pattern, parts) for pattern in group_patterns)
+        ]
+
+        if len(matched) > 1:
+            raise ValueError(
+                f'Workspace "{workspace.name}" is in more than one lock group: {", ".join(matched)}'
+            )
+
+        groups[canonicalize_name(workspace.name)] = matched[0] if matched else None
+
+    for workspace in workspaces:
+        group = groups[canonicalize_name(workspace.name)]
+
+        for dependency in workspace.workspace_dependencies:
+            if dependency in groups and groups[dependency] != group:
+                raise ValueError(
+                    f'Workspace "{workspace.name}" references "{dependency}" from another'
+                    ' lock group, referenced workspaces must be locked together'
+                )
+
+    return groups
+
+
+def get_lock_group_env(context: Context, config: PoetryConfig, io: IO) -> Env | None:
+    """Get the virtual environment of the context's lock group, creating it if missing.
+
+    None means that the group installs into the environment of the root project.
+    """
+    from poetry_workspaces_plugin.environments import create_env
+
+    if context.lock_group is None:
+        return None
+
+    group = context.config.lock_groups.get(context.lock_group)
+
+    if group is None or not group.virtualenv:
+        return None
+
+    path = context.cache_dir / VENVS_DIR / context.lock_group
+
+    return create_env(path, config, io, context.lock_group)
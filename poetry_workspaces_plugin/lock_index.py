@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import tempfile
+import tomllib
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+from packaging.utils import canonicalize_name
+
+from poetry_workspaces_plugin import counters
+
+
+# Bump whenever the layout of the serialized index changes
+INDEX_FORMAT = 1
+
+# Indexes of a few recent lock files are kept, as switching branches switches between them
+MAX_CACHED_INDEXES = 8
+
+
+class LockedDependency(NamedTuple):
+    name: str
+    constraint: str
+    markers: str | None
+
+
+class LockedEntry(NamedTuple):
+    name: str
+    version: str
+    markers: str | dict[str, str] | None
+    groups: tuple[str, ...]
+    dependencies: tuple[LockedDependency, ...]
+
+
+def parse_dependencies(dependencies: dict[str, Any]) -> tuple[LockedDependency, ...]:
+    parsed = []
+
+    for name, specs in dependencies.items():
+        name = canonicalize_name(name)
+
+        # A dependency is a constraint string, a table or a list of tables with markers
+        if not isinstance(specs, list):
+            specs = [specs]
+
+        for spec in specs:
+            if isinstance(spec, str):
+                parsed.append(LockedDependency(name, spec, None))
+            else:
+                parsed.append(
+                    LockedDependency(name, spec.get('version', '*'), spec.get('markers'))
+                )
+
+    return tuple(parsed)
+
+
+def evict_indexes(cache_dir: Path, keep: int):
+    """Remove all but the most recently used cached indexes."""
+    entries = []
+
+    for path in cache_dir.glob('*.bin'):
+        try:
+            entries.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            pass
+
+    entries.sort(reverse=True)
+
+    for _, path in entries[keep:]:
+        path.unlink(missing_ok=True)
+
+
+class LockIndex:
+    """Read-only index of a poetry.lock file.
+
+    Maps each canonical package name to its locked entries and the dependency edges
+    between them. A compact serialized form is cached by the hash of the lock file's
+    content, so only the first query after the lock changes parses the file.
+    """
+
+    def __init__(self, entries: Iterable[LockedEntry]) -> None:
+        self.packages: dict[str, list[LockedEntry]] = defaultdict(list)
+
+        for entry in entries:
+            self.packages[entry.name].append(entry)
+
+        self._dependents: dict[str, set[str]] | None = None
+
+    @classmethod
+    def from_lock_data(cls, data: dict[str, Any]) -> LockIndex:
+        entries = []
+
+        for package in data.get('package', []):
+            groups = package.get('groups', [])
+
+            entries.append(
+                LockedEntry(
+                    canonicalize_name(package['name']),
+                    package['version'],
+                    package.get('markers'),
+                    tuple(groups),
+                    parse_dependencies(package.get('dependencies', {})),
+                )
+            )
+
+        return cls(entries)
+
+    @classmethod
+    def load(cls, lock_path: Path, cache_dir: Path | None = None) -> LockIndex:
+        """Load the index of a lock file, using the cached form when it is up to date."""
+        content = lock_path.read_bytes()
+
+        if cache_dir is None:
+            counters.count(counters.TOML_PARSE)
+
+            return cls.from_lock_data(tomllib.loads(content.decode()))
+
+        digest = hashlib.sha256(content).hexdigest()
+        cache_path = cache_dir / f'{digest}.bin'
+
+        try:
+            with cache_path.open('rb') as f:
+                version, serialized = marshal.load(f)
+
+            if version == INDEX_FORMAT:
+                # Recently used indexes are the last to be evicted
+                os.utime(cache_path)
+
+                return cls.deserialize(serialized)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+        counters.count(counters.TOML_PARSE)
+
+        index = cls.from_lock_data(tomllib.loads(content.decode()))
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Each writer has a file of its own, so concurrent writes never interleave
+        fd, temporary_name = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump((INDEX_FORMAT, index.serialize()), f)
+
+            os.replace(temporary_name, cache_path)
+        except BaseException:
+            Path(temporary_name).unlink(missing_ok=True)
+
+            raise
+
+        evict_indexes(cache_dir, MAX_CACHED_INDEXES)
+
+        return index
+
+    def serialize(self) -> list:
+        return [
+            (e.name, e.version, e.markers, e.groups, tuple(tuple(d) for d in e.dependencies))
+            for entries in self.packages.values()
+            for e in entries
+        ]
+
+    @classmethod
+    def deserialize(cls, serialized: list) -> LockIndex:
+        return cls(
+            LockedEntry(
+                name,
+                version,
+                markers,
+                groups,
+                tuple(LockedDependency(*d) for d in dependencies),
+            )
+            for name, version, markers, groups, dependencies in serialized
+        )
+
+    def __contains__(self, name: str) -> bool:
+        return canonicalize_name(name) in self.packages
+
+    def versions(self, name: str) -> list[str]:
+        """Get the locked versions of a package."""
+        return [entry.version for entry in self.packages.get(canonicalize_name(name), [])]
+
+    def dependencies(self, name: str) -> set[str]:
+        """Get the names of the packages a package depends on."""
+        return {
+            dependency.name
+            for entry in self.packages.get(canonicalize_name(name), [])
+            for dependency in entry.dependencies
+        }
+
+    def dependents(self, name: str) -> set[str]:
+        """Get the names of the packages that depend on a package."""
+        if self._dependents is None:
+            self._dependents = defaultdict(set)
+
+            for entries in self.packages.values():
+                for entry in entries:
+                    for dependency in entry.dependencies:
+                        self._dependents[dependency.name].add(entry.name)
+
+        return self._dependents.get(canonicalize_name(name), set())
+
+    def closure(self, names: Iterable[str]) -> set[str]:
+        """Get the given packages and everything they depend on transitively."""
+        seen = {canonicalize_name(name) for name in names}
+        queue = deque(seen)
+
+        while queue:
+            for dependency in self.dependencies(queue.popleft()):
+                if dependency not in seen:
+                    seen.add(dependency)
+                    queue.append(dependency)
+
+        return seen
+
+    def path_to(self, roots: Iterable[str], name: str) -> list[str] | None:
+        """Get the shortest dependency chain from any of the roots to a package."""
+        target = canonicalize_name(name)
+        parents: dict[str, str | None] = {}
+        queue: deque[str] = deque()
+
+        for root in roots:
+            root = canonicalize_name(root)
+
+            if root not in parents:
+                parents[root] = None
+                queue.append(root)
+
+        while queue:
+            current = queue.popleft()
+
+            if current == target:
+                path = [current]
+
+                while (parent := parents[path[-1]]) is not None:
+                    path.append(parent)
+
+                return path[::-1]
+
+            for dependency in sorted(self.dependencies(current)):
+                if dependency not in parents:
+                    parents[dependency] = current
+                    queue.append(dependency)
+
+        return None
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from packaging.utils import NormalizedName, canonicalize_name
+from poetry.repositories.repository_pool import RepositoryPool
+
+
+if TYPE_CHECKING:
+    from poetry.config.config import Config
+    from poetry.core.constraints.version import Version
+    from poetry.core.packages.dependency import Dependency
+    from poetry.core.packages.package import Package
+    from poetry.core.packages.project_package import ProjectPackage
+
+
+# Packages from these sources are always re-resolved, as their metadata lives on disk
+UNPINNABLE_SOURCE_TYPES = ('directory', 'file', 'url', 'git', 'hg')
+
+
+def get_unpinned_packages(
+    package: ProjectPackage,
+    locked_packages: list[Package],
+) -> set[NormalizedName]:
+    """Get the packages that must be re-resolved for the current merged constraints.
+
+    These are the top-level dependencies that no locked package satisfies any more,
+    along with everything they depend on according to the lock file.
+    """
+    locked_by_name: dict[NormalizedName, list[Package]] = defaultdict(list)
+
+    for locked_package in locked_packages:
+        locked_by_name[locked_package.name].append(locked_package)
+
+    changed = {
+        dependency.name
+        for dependency in package.all_requires
+        if not any(
+            locked_package.satisfies(dependency, ignore_source_type=True)
+            for locked_package in locked_by_name[dependency.name]
+        )
+    }
+
+    unpinned = set(changed)
+    queue = list(changed)
+
+    while queue:
+        name = queue.pop()
+
+        for locked_package in locked_by_name[name]:
+            for requirement in locked_package.requires:
+                if requirement.name not in unpinned:
+                    unpinned.add(requirement.name)
+                    queue.append(requirement.name)
+
+    return unpinned
+
+
+def get_pinned_packages(
+    locked_packages: list[Package],
+    unpinned: set[NormalizedName],
+) -> dict[NormalizedName, list[Package]]:
+    """Group the locked packages that can be held at their locked version by name."""
+    pinned: dict[NormalizedName, list[Package]] = defaultdict(list)
+
+    for locked_package in locked_packages:
+        if locked_package.name in unpinned:
+            continue
+
+        if locked_package.source_type in UNPINNABLE_SOURCE_TYPES:
+            continue
+
+        pinned[locked_package.name].append(locked_package)
+
+    return dict(pinned)
+
+
+class PinnedRepositoryPool(RepositoryPool):
+    """Repository pool that serves pinned packages straight from the lock file.
+
+    Pinned packages only ever resolve to their locked versions, and their metadata is
+    taken from the lock file, so the solver neither lists their releases nor fetches
+    their metadata from any repository.
+    """
+
+    def __init__(
+        self,
+        pool: RepositoryPool,
+        pinned: dict[NormalizedName, list[Package]],
+        *,
+        config: Config | None = None,
+    ) -> None:
+        super().__init__(config=config)
+
+        for repository in pool.all_repositories:
+            self.add_repository(repository, priority=pool.get_priority(repository.name))
+
+        self._pinned = pinned
+
+    def package(
+        self, name: str, version: Version, repository_name: str | None = None
+    ) -> Package:
+        for locked_package in self._pinned.get(canonicalize_name(name), []):
+            if locked_package.version == version:
+                return locked_package.clone()
+
+        return super().package(name, version, repository_name)
+
+    def find_packages(self, dependency: Dependency) -> list[Package]:
+        locked_packages = self._pinned.get(dependency.name)
+
+        if locked_packages is None:
+            return super().find_packages(dependency)
+
+        return [
+            locked_package.clone()
+            for locked_package in locked_packages
+            if dependency.constraint.allows(locked_package.version)
+        ]
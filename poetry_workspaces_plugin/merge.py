@@ -1,17 +1,244 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Mapping, MutableMapping
 from copy import deepcopy
-from typing import cast
+from functools import reduce
+from typing import Any, cast
 
+from packaging.utils import canonicalize_name
+from poetry.core.constraints.version import parse_constraint
+from poetry.core.packages.dependency import Dependency
 from poetry.pyproject.toml import PyProjectTOML as BasePyProjectTOML
 from poetry.toml import TOMLFile
 from tomlkit import TOMLDocument
 
+from poetry_workspaces_plugin import counters
 from poetry_workspaces_plugin.context import Context
+from poetry_workspaces_plugin.pyproject import PyProjectTOML
 from poetry_workspaces_plugin.utils import dedupe, delete_path, get_path, set_path, update_from_diff
 
 
-def merge_data(context: Context) -> TOMLDocument:
+# Merged constraints by section path and package name, with the constraint each source declared
+Provenance = dict[str, dict[str, list[tuple[str, str]]]]
+
+
+def intersect_pep_508(
+    section: str,
+    sources: list[tuple[str, list]],
+    provenance: Provenance,
+) -> list | None:
+    """Combine the PEP 508 requirements of a section into one requirement per package.
+
+    Requirements are only combined when they share a marker. URL requirements, include-group
+    tables and requirements that cannot be satisfied together are kept as declared.
+    """
+    declared: dict[tuple[str, str], list[tuple[str, str, Dependency]]] = defaultdict(list)
+    order: list[Any] = []
+
+    for source, requirements in sources:
+        for requirement in requirements:
+            try:
+                dependency = Dependency.create_from_pep_508(requirement)
+            except (TypeError, ValueError):
+                dependency = None
+
+            if dependency is None or dependency.source_type is not None:
+                order.append(requirement)
+
+                continue
+
+            key = (dependency.name, str(dependency.marker))
+
+            if key not in declared:
+                order.append(key)
+
+            declared[key].append((source, requirement, dependency))
+
+    if not declared:
+        return None
+
+    merged = []
+
+    for item in order:
+        if not isinstance(item, tuple):
+            merged.append(item)
+
+            continue
+
+        declarations = declared[item]
+        dependencies = [dependency for _, _, dependency in declarations]
+
+        constraint = reduce(lambda a, b: a.intersect(b), (d.constraint for d in dependencies))
+
+        if len(declarations) == 1 or constraint.is_empty():
+            merged.extend(requirement for _, requirement, _ in declarations)
+
+            continue
+
+        dependency = Dependency(
+            dependencies[0].pretty_name,
+            constraint,
+            extras=sorted(set().union(*(d.extras for d in dependencies))),
+        )
+        dependency.marker = dependencies[0].marker
+
+        merged.append(dependency.to_pep_508())
+
+        provenance.setdefault(section, {})[item[0]] = [
+            (source, requirement) for source, requirement, _ in declarations
+        ]
+
+    return merged
+
+
+def intersect_poetry_dependencies(
+    section: str,
+    sources: list[tuple[str, dict]],
+    target: dict,
+    provenance: Provenance,
+) -> None:
+    """Replace each package of a merged Poetry dependency table by its combined constraint.
+
+    Only plain version constraints, optionally with extras, are combined. Anything with
+    markers, sources or multiple constraints keeps the additive result.
+    """
+    declared: dict[str, list[tuple[str, Any]]] = defaultdict(list)
+
+    for source, table in sources:
+        for name, spec in table.items():
+            if name != 'python':
+                declared[canonicalize_name(name)].append((source, spec))
+
+    for name, declarations in declared.items():
+        if len(declarations) < 2:
+            continue
+
+        versions = []
+        extras: set[str] = set()
+
+        for _, spec in declarations:
+            if isinstance(spec, str):
+                versions.append(spec)
+            elif isinstance(spec, dict) and set(spec) <= {'version', 'extras'}:
+                versions.append(spec.get('version', '*'))
+                extras.update(spec.get('extras', []))
+            else:
+                break
+        else:
+            constraint = reduce(lambda a, b: a.intersect(b), map(parse_constraint, versions))
+
+            if constraint.is_empty():
+                continue
+
+            keys = [key for key in target if canonicalize_name(key) == name]
+
+            for key in keys[1:]:
+                del target[key]
+
+            if extras:
+                target[keys[0]] = {'version': str(constraint), 'extras': sorted(extras)}
+            else:
+                target[keys[0]] = str(constraint)
+
+            provenance.setdefault(section, {})[name] = [
+                (source, spec if isinstance(spec, str) else spec.get('version', '*'))
+                for source, spec in declarations
+            ]
+
+
+def intersect_data(context: Context, merged_data: TOMLDocument, provenance: Provenance):
+    sources = [context.target_pyproject]
+    sources.extend(p for p in context.workspaces_pyprojects if p != context.target_pyproject)
+
+    rendered = [(source.name, get_merged_source(context, source)) for source in sources]
+
+    requirements = [
+        (name, get_path(data, 'project.dependencies'))
+        for name, data in rendered
+        if get_path(data, 'project.dependencies')
+    ]
+
+    if requirements:
+        merged = intersect_pep_508('project.dependencies', requirements, provenance)
+
+        if merged is not None:
+            set_path(merged_data, 'project.dependencies', merged)
+
+    for group in get_path(merged_data, 'project.dependency-groups') or {}:
+        section = f'project.dependency-groups.{group}'
+
+        requirements = [
+            (name, get_path(data, section))
+            for name, data in rendered
+            if get_path(data, section)
+        ]
+        merged = intersect_pep_508(section, requirements, provenance)
+
+        if merged is not None:
+            set_path(merged_data, section, merged)
+
+    sections = ['tool.poetry.dependencies']
+    sections.extend(
+        f'tool.poetry.group.{group}.dependencies'
+        for group in get_path(merged_data, 'tool.poetry.group') or {}
+    )
+
+    for section in sections:
+        target = get_path(merged_data, section)
+
+        if target:
+            intersect_poetry_dependencies(
+                section,
+                [(name, get_path(data, section)) for name, data in rendered if get_path(data, section)],
+                target,
+                provenance,
+            )
+
+
+def get_merged_source(context: Context, pyproject: PyProjectTOML) -> TOMLDocument:
+    """Render a document as it is merged for the context.
+
+    Workspaces are installed from their directories rather than resolved from package
+    indexes, so references to them are left out unless the context pins them.
+    """
+    if context.pin_workspaces and pyproject == context.target_pyproject:
+        return context.render(pyproject)
+
+    return pyproject.render({})
+
+
+def count_merge_copies(destination: Mapping, source: Mapping) -> int:
+    """Count the values mergedeep copies to merge a source into a destination.
+
+    Mappings in both are merged key by key, and every other value of the source is copied
+    once, unless the destination holds the very same object.
+    """
+    copies = 0
+
+    for key, value in source.items():
+        if key not in destination:
+            copies += 1
+        elif isinstance(destination[key], Mapping) and isinstance(value, Mapping):
+            copies += count_merge_copies(destination[key], value)
+        elif destination[key] is not value:
+            copies += 1
+
+    return copies
+
+
+def merge_additive(destination: MutableMapping, source: Mapping) -> MutableMapping:
+    """Merge a source into a destination, extending lists rather than replacing them."""
     from mergedeep import Strategy, merge
 
+    counters.count(counters.DEEPCOPY, count_merge_copies(destination, source))
+
+    return merge(destination, source, strategy=Strategy.ADDITIVE)
+
+
+def merge_data(context: Context, provenance: Provenance | None = None) -> TOMLDocument:
+    counters.count(counters.MERGE)
+
     # 'project.name' or 'tool.poetry.name' = target
     # 'project.version' or 'tool.poetry.version' = target
     # 'project.dependencies' = all
@@ -22,69 +249,77 @@ def merge_data(context: Context) -> TOMLDocument:
 
     merged_data = TOMLDocument()
 
-    project = get_path(context.target_pyproject.data, 'project')
+    target_data = get_merged_source(context, context.target_pyproject)
+
+    project = get_path(target_data, 'project')
 
     if project:
         set_path(merged_data, 'project', project)
 
-    poetry = get_path(context.target_pyproject.data, 'tool.poetry')
+    poetry = get_path(target_data, 'tool.poetry')
 
     if poetry:
         set_path(merged_data, 'tool.poetry', poetry)
 
     for workspace_pyproject in context.workspaces_pyprojects:
-        if workspace_pyproject.project_dependencies is not None:
+        workspace_data = get_merged_source(context, workspace_pyproject)
+
+        project_dependencies = get_path(workspace_data, 'project.dependencies')
+        poetry_dependencies = get_path(workspace_data, 'tool.poetry.dependencies')
+        project_dependency_groups = get_path(workspace_data, 'project.dependency-groups')
+        poetry_group = get_path(workspace_data, 'tool.poetry.group')
+
+        if project_dependencies is not None:
             set_path(
                 merged_data, 'project.dependencies',
-                merge(
+                merge_additive(
                     {'dependencies': get_path(merged_data, 'project.dependencies') or []},
-                    {'dependencies': workspace_pyproject.project_dependencies},
-                    strategy=Strategy.ADDITIVE,
+                    {'dependencies': project_dependencies},
                 )['dependencies'],
             )
 
-        if workspace_pyproject.poetry_dependencies is not None:
+        if poetry_dependencies is not None:
             set_path(
                 merged_data,
                 'tool.poetry.dependencies',
-                merge(
+                merge_additive(
                     get_path(merged_data, 'tool.poetry.dependencies') or {},
-                    workspace_pyproject.poetry_dependencies,
-                    strategy=Strategy.ADDITIVE,
+                    poetry_dependencies,
                 ),
             )
 
-        if workspace_pyproject.project_dependency_groups:
+        if project_dependency_groups:
             set_path(
                 merged_data,
                 'project.dependency-groups',
-                merge(
+                merge_additive(
                     {'dependency-groups': get_path(merged_data, 'project.dependency-groups') or []},
-                    {'dependency-groups': workspace_pyproject.project_dependency_groups},
-                    strategy=Strategy.ADDITIVE,
+                    {'dependency-groups': project_dependency_groups},
                 )['dependency-groups'],
             )
 
-        if workspace_pyproject.poetry_group:
+        if poetry_group:
             set_path(
                 merged_data,
                 'tool.poetry.group',
-                merge(
+                merge_additive(
                     get_path(merged_data, 'tool.poetry.group') or {},
-                    workspace_pyproject.poetry_group,
-                    strategy=Strategy.ADDITIVE,
+                    poetry_group,
                 ),
             )
 
     delete_path(merged_data, 'tool.poetry.source')
 
-    poetry_sources = get_path(context.root_pyproject.data, 'tool.poetry.source')
+    poetry_sources = get_path(context.root_pyproject.data_raw, 'tool.poetry.source')
 
     if poetry_sources:
         set_path(merged_data, 'tool.poetry.source', poetry_sources)
 
     merged_data = cast(TOMLDocument, dedupe(merged_data))
 
+    if context.config.merge_mode == 'intersect':
+        intersect_data(context, merged_data, provenance if provenance is not None else {})
+
     return merged_data
 
 
@@ -96,8 +331,14 @@ class TOMLFileMerged(TOMLFile):
         self._context = context
         self._last_read = None
 
+        self.provenance: Provenance = {}
+
     def read(self) -> TOMLDocument:
-        data = merge_data(self._context)
+        self.provenance.clear()
+
+        data = merge_data(self._context, self.provenance)
+
+        counters.count(counters.DEEPCOPY)
 
         self._last_read = deepcopy(data)
 
@@ -105,13 +346,13 @@ class TOMLFileMerged(TOMLFile):
 
     def write(self, data: TOMLDocument) -> None:
         if self._last_read:
-            # Use the diff of the last read to update the write target
-            target = deepcopy(self._context.target_pyproject.data)
+            # Use the diff of the last read to update the write target in place, so that
+            # only changed entries are touched when the document is serialized again
+            target = self._context.target_pyproject.data_raw
 
             update_from_diff(self._last_read.value, data.value, target)
 
-            data.clear()
-            data.update(target)
+            data = target
 
         self._path = self._context.target_pyproject.path
 
@@ -128,3 +369,8 @@ class PyProjectMerged(BasePyProjectTOML):
         self._toml_file = TOMLFileMerged(context)
         self._toml_document: TOMLDocument | None = None
         self._context = context
+
+    @property
+    def provenance(self) -> Provenance:
+        """Where each combined constraint of the last merge came from."""
+        return self._toml_file.provenance
@@ -1,33 +1,61 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
+from importlib import import_module
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, Iterator
 
 from cleo.events.console_command_event import ConsoleCommandEvent
-from cleo.events.console_events import COMMAND
-from poetry.console.application import Application
-from poetry.console.commands.command import Command
-from poetry.console.commands.self.self_command import SelfCommand
+from cleo.events.console_events import COMMAND, TERMINATE
+from cleo.events.console_terminate_event import ConsoleTerminateEvent
+from cleo.io.inputs.option import Option
 from poetry.plugins.application_plugin import ApplicationPlugin
 
-# from poetry_workspaces_plugin.commands.add import AddCommand
-from poetry_workspaces_plugin.commands.install import InstallCommand
-from poetry_workspaces_plugin.commands.build import BuildCommand
-# from poetry_workspaces_plugin.commands.remove import RemoveCommand
-from poetry_workspaces_plugin.commands.workspace import WorkspaceCommand
-from poetry_workspaces_plugin.commands.workspaces_list import WorkspacesListCommand
-from poetry_workspaces_plugin.config import Config
-from poetry_workspaces_plugin.context import Context
-from poetry_workspaces_plugin.factory import Factory
-from poetry_workspaces_plugin.pyproject import (
-    get_root_pyproject,
-    get_workspaces_pyprojects,
-    locate_poetry_pyproject,
-)
-
 
 if TYPE_CHECKING:
     from cleo.events.event import Event
+    from poetry.console.application import Application
+    from poetry.console.commands.command import Command
+
+    from poetry_workspaces_plugin.config import Config
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.file_locks import FileLock
+    from poetry_workspaces_plugin.pyproject import PyProjectTOML
+
+
+# Commands of the plugin, and Poetry commands it replaces for managed projects. Each command
+# lives in the module named after it, and is only imported when it is about to run.
+COMMANDS = [
+    'workspace',
+    'workspaces add',
+    'workspaces check',
+    'workspaces conflicts',
+    'workspaces foreach',
+    'workspaces hash',
+    'workspaces list',
+    'workspaces prune',
+    'workspaces version',
+    'workspaces why',
+]
+
+OVERRIDDEN_COMMANDS = [
+    'build',
+    'install',
+    'lock',
+]
+
+DEBUG_OPTION = 'workspaces-debug'
+
+
+def load_command(plugin: WorkspacesPlugin, name: str) -> Callable[[], Command]:
+    def _load() -> Command:
+        words = name.split(' ')
+        module = import_module('poetry_workspaces_plugin.commands.' + '_'.join(words))
+        command_class = getattr(module, ''.join(c.title() for c in words) + 'Command')
+
+        return command_class(plugin)
+
+    return _load
 
 
 class WorkspacesPlugin(ApplicationPlugin):
@@ -35,50 +63,246 @@ class WorkspacesPlugin(ApplicationPlugin):
     def __init__(self) -> None:
         super().__init__()
 
-        self.config = Config()
-        self.context: Context | None = None
+        self.config: Config | None = None
+        self.root_pyproject: PyProjectTOML | None = None
+        self._context: Context | None = None
 
-    def activate(self, application: Application):
-        root_pyproject = get_root_pyproject()
+        # Locks held by each running command, innermost last
+        self._command_locks: list[tuple[Command, list[FileLock]]] = []
 
-        if root_pyproject is not None:
-            assert root_pyproject.plugin_section
+        # Contexts of commands run for another target than the current project
+        self._command_contexts: dict[Command, Context] = {}
 
-            self.config.load(root_pyproject.plugin_section)
+    @property
+    def context(self) -> Context | None:
+        """Context of the current project, discovering workspaces on first access."""
+        if self._context is None and self.root_pyproject is not None:
+            from poetry_workspaces_plugin.context import Context
+            from poetry_workspaces_plugin.discovery import get_workspaces
+            from poetry_workspaces_plugin.pyproject import locate_poetry_pyproject
 
-            self.context = Context(
-                root_pyproject=root_pyproject,
-                target_pyproject=locate_poetry_pyproject(Path.cwd()) or root_pyproject,
-                workspaces_pyprojects=get_workspaces_pyprojects(self.config, root_pyproject.path),
-            )
+            assert self.config is not None
 
-            # Ensure that virtual environment is always relative to root directory
-            application._poetry = Factory().create_poetry(
-                Context(root_pyproject, root_pyproject, [])
+            self._context = Context(
+                root_pyproject=self.root_pyproject,
+                target_pyproject=locate_poetry_pyproject(Path.cwd()) or self.root_pyproject,
+                workspaces=get_workspaces(self.config, self.root_pyproject.path),
+                config=self.config,
             )
 
-        install_command = InstallCommand(self.context)
-        install_command.set_application(application)
+        return self._context
 
-        build_command = BuildCommand(self.context)
-        build_command.set_application(application)
+    def get_command_context(self, command: Command) -> Context | None:
+        """Get the context a command runs in, which is the current project's by default."""
+        return self._command_contexts.get(command) or self.context
 
-        application._commands['install'] = install_command
-        application._commands['build'] = build_command
+    @contextmanager
+    def bind_context(self, command: Command, context: Context) -> Iterator[None]:
+        """Run a command in another context while in the block."""
+        previous = self._command_contexts.get(command)
+        self._command_contexts[command] = context
 
-        application.command_loader.register_factory(
-            WorkspaceCommand.name,
-            lambda: WorkspaceCommand(self.context),
-        )
-        application.command_loader.register_factory(
-            WorkspacesListCommand.name,
-            lambda: WorkspacesListCommand(self.context),
+        try:
+            yield
+        finally:
+            if previous is None:
+                del self._command_contexts[command]
+            else:
+                self._command_contexts[command] = previous
+
+    def activate(self, application: Application):
+        from poetry_workspaces_plugin.config import Config
+        from poetry_workspaces_plugin.pyproject import get_root_pyproject
+
+        # Poetry creates its IO before activating plugins. Memory is traced from here on,
+        # so that the peak includes the discovery of workspaces when commands are loaded.
+        io = application._io
+
+        if io is not None and io.input.has_parameter_option(f'--{DEBUG_OPTION}'):
+            import tracemalloc
+
+            tracemalloc.start()
+
+        self.config = Config()
+        self.root_pyproject = get_root_pyproject()
+
+        for name in COMMANDS:
+            application.command_loader.register_factory(name, load_command(self, name))
+
+        application.definition.add_option(
+            Option(
+                DEBUG_OPTION,
+                description='Show counts of expensive plugin operations and peak memory.',
+            )
         )
 
         if application.event_dispatcher is not None:
+            application.event_dispatcher.add_listener(TERMINATE, self.report_debug)
+
+        if self.root_pyproject is None:
+            return
+
+        assert self.root_pyproject.plugin_section
+
+        self.config.load(self.root_pyproject.plugin_section)
+
+        # Poetry's loader refuses to register existing names, so replace their factories
+        for name in OVERRIDDEN_COMMANDS:
+            application.command_loader._factories[name] = load_command(self, name)
+
+        if application.event_dispatcher is not None:
+            # Runs before Poetry's own listeners, which configure the environment
+            application.event_dispatcher.add_listener(COMMAND, self.acquire_locks, priority=1)
+            application.event_dispatcher.add_listener(TERMINATE, self.release_locks)
+            application.event_dispatcher.add_listener(COMMAND, self.configure_root, priority=1)
+            application.event_dispatcher.add_listener(COMMAND, self.configure_env, priority=1)
             application.event_dispatcher.add_listener(COMMAND, self.prepare)
 
+    def report_debug(self, event: Event, *args):
+        if not isinstance(event, ConsoleTerminateEvent):
+            return
+
+        if not event.io.input.has_parameter_option(f'--{DEBUG_OPTION}'):
+            return
+
+        import tracemalloc
+
+        from poetry_workspaces_plugin import counters
+        from poetry_workspaces_plugin.constants import LOG_PREFIX
+
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        for operation, count in counters.snapshot().items():
+            event.io.write_error_line(f'{LOG_PREFIX} {operation}: {count}')
+
+        event.io.write_error_line(f'{LOG_PREFIX} peak memory: {peak / 2**20:.1f} MiB')
+
+    def acquire_locks(self, event: Event, *args):
+        if not isinstance(event, ConsoleCommandEvent):
+            return
+
+        from poetry_workspaces_plugin.constants import COMMAND_LOCKS
+
+        command = event.command
+
+        if command.name not in COMMAND_LOCKS:
+            return
+
+        from poetry_workspaces_plugin.file_locks import (
+            LockModeError,
+            get_command_locks,
+            is_read_only,
+        )
+
+        context = self.get_command_context(command)
+
+        if not context or not context.should_manage:
+            return
+
+        read_only = is_read_only(command.name, event.io.input)
+
+        # Commands called by other commands use what their caller holds, as a second lock
+        # on the same file would wait for the first, unless they need more than a share
+        held = {lock.path: lock.shared for _, locks in self._command_locks for lock in locks}
+        locks = []
+
+        for lock in get_command_locks(context, command.name, event.io, read_only):
+            if lock.path not in held:
+                locks.append(lock)
+            elif held[lock.path] and not lock.shared:
+                raise LockModeError(
+                    f'Command "{command.name}" changes {lock.description}, which the command'
+                    ' that called it only holds shared'
+                )
+
+        acquired: list[FileLock] = []
+
+        try:
+            for lock in locks:
+                lock.acquire()
+                acquired.append(lock)
+        except BaseException:
+            for lock in reversed(acquired):
+                lock.release()
+
+            raise
+
+        self._command_locks.append((command, acquired))
+
+    def release_locks(self, event: Event, *args):
+        if not isinstance(event, ConsoleTerminateEvent):
+            return
+
+        if not self._command_locks or self._command_locks[-1][0] is not event.command:
+            return
+
+        _, locks = self._command_locks.pop()
+
+        for lock in reversed(locks):
+            lock.release()
+
+    def configure_root(self, event: Event, *args):
+        from poetry.console.commands.command import Command
+
+        if not isinstance(event, ConsoleCommandEvent) or not isinstance(event.command, Command):
+            return
+
+        from poetry_workspaces_plugin.commands.base import BaseCommand
+        from poetry_workspaces_plugin.factory import Factory
+
+        # Plugin commands build the Poetry instances they need themselves
+        if isinstance(event.command, BaseCommand):
+            return
+
+        application = event.command.get_application()
+
+        if application._poetry is None and self.context is not None:
+            # Ensure that virtual environment is always relative to root directory
+            application._poetry = Factory().get_poetry(self.context.root_only())
+
+    def configure_env(self, event: Event, *args):
+        from poetry.console.commands.env_command import EnvCommand
+        from poetry.console.commands.self.self_command import SelfCommand
+
+        if not isinstance(event, ConsoleCommandEvent):
+            return
+
+        command = event.command
+
+        if not self.config or not (self.config.lock_groups or self.config.isolated_environments):
+            return
+
+        if not isinstance(command, EnvCommand) or isinstance(command, SelfCommand):
+            return
+
+        from poetry_workspaces_plugin.environments import get_workspace_env
+        from poetry_workspaces_plugin.factory import Factory
+        from poetry_workspaces_plugin.lock_groups import get_lock_group_env
+
+        context = self.get_command_context(command)
+
+        if not context or not context.should_manage:
+            return
+
+        context = context.for_target_lock_group()
+        config = Factory().get_poetry(context).config
+
+        # Poetry keeps an environment that is already set, rather than creating its own
+        if self.config.isolated_environments and context.target_is_managed:
+            workspace = context.workspaces_by_path[context.target_pyproject.path]
+            env = get_workspace_env(workspace, config, event.io)
+        else:
+            env = get_lock_group_env(context, config, event.io)
+
+        if env is not None:
+            command.set_env(env)
+
     def prepare(self, event: Event, *args):
+        from poetry.console.commands.command import Command
+        from poetry.console.commands.installer_command import InstallerCommand
+        from poetry.console.commands.self.self_command import SelfCommand
+
         if not isinstance(event, ConsoleCommandEvent):
             return
 
@@ -87,12 +311,27 @@ class WorkspacesPlugin(ApplicationPlugin):
         if not isinstance(command, Command):
             return
 
+        from poetry_workspaces_plugin.commands.base import PluginCommand
+        from poetry_workspaces_plugin.factory import Factory
+
         if isinstance(command, SelfCommand):
             return
 
-        if not self.context or not self.context.should_manage:
+        if isinstance(command, PluginCommand) and command.builds_poetry:
+            return
+
+        # Commands run through `poetry workspace` are bound to their own target context
+        context = self.get_command_context(command)
+
+        if not context or not context.should_manage:
             return
 
-        poetry = Factory().create_poetry(self.context)
+        poetry = Factory().get_poetry(context)
 
         command.set_poetry(poetry)
+
+        # The installer is configured before this listener runs, so point it at the
+        # merged package and lock data as well
+        if isinstance(command, InstallerCommand) and command._installer is not None:
+            command.installer.set_package(poetry.package)
+            command.installer.set_locker(poetry.locker)
@@ -0,0 +1,165 @@
+"""Minimal build contexts holding a workspace and the workspaces it depends on.
+
+A pruned tree is split in two directories, so that container images can install
+dependencies in a layer that only changes along with them:
+
+    <out>/manifests  root and workspace pyproject.toml files, and the lock subset
+    <out>/sources    every other file of the workspaces
+"""
+from __future__ import annotations
+
+from copy import deepcopy
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import tomlkit
+from packaging.utils import canonicalize_name
+from poetry.utils.helpers import remove_directory
+
+from poetry_workspaces_plugin.cache import link_or_copy
+from poetry_workspaces_plugin.constants import SECTION_KEY
+from poetry_workspaces_plugin.hashing import iter_tree
+from poetry_workspaces_plugin.utils import delete_path, set_path
+
+
+if TYPE_CHECKING:
+    from tomlkit import TOMLDocument
+
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.discovery import WorkspaceInfo
+
+
+MANIFESTS_DIR = 'manifests'
+SOURCES_DIR = 'sources'
+
+# Files of the root project kept next to its pyproject.toml
+ROOT_FILES = ('poetry.toml',)
+
+
+def get_workspace_closure(context: Context, name: str) -> list[WorkspaceInfo]:
+    """Get a workspace and the workspaces it references transitively, in discovery order."""
+    workspace = context.find_workspace(name)
+
+    if workspace is None:
+        raise ValueError(f'Could not find a project with the name: {name}')
+
+    selected = {canonicalize_name(workspace.name)}
+    queue = [workspace]
+
+    while queue:
+        for dependency in queue.pop().workspace_dependencies:
+            if dependency in selected or dependency not in context.workspaces_by_name:
+                continue
+
+            selected.add(dependency)
+            queue.append(context.workspaces_by_name[dependency])
+
+    return [w for w in context.workspaces if canonicalize_name(w.name) in selected]
+
+
+def prune_root_data(data: TOMLDocument, paths: list[str]) -> TOMLDocument:
+    """Copy root data with the workspace patterns replaced by the kept workspace paths.
+
+    Kept workspaces share a lock group, whose lock file becomes the only one of the tree.
+    """
+    pruned = deepcopy(data)
+
+    workspaces = tomlkit.array()
+    workspaces.extend(paths)
+
+    set_path(pruned, f'tool.{SECTION_KEY}.workspaces', workspaces)
+    delete_path(pruned, f'tool.{SECTION_KEY}.lock-groups')
+
+    return pruned
+
+
+def prune(context: Context, name: str, out_dir: Path) -> list[WorkspaceInfo]:
+    """Write the pruned tree of a workspace to a directory, replacing a previous one."""
+    from poetry.packages.locker import Locker
+
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.discovery import get_workspaces
+    from poetry_workspaces_plugin.factory import Factory
+    from poetry_workspaces_plugin.lock_index import LockIndex
+    from poetry_workspaces_plugin.pyproject import PyProjectTOML
+
+    root_dir = context.root_pyproject.path.parent
+    workspaces = get_workspace_closure(context, name)
+    paths = [w.path.parent.relative_to(root_dir).as_posix() for w in workspaces]
+
+    manifests_dir = out_dir / MANIFESTS_DIR
+    sources_dir = out_dir / SOURCES_DIR
+
+    for directory in (manifests_dir, sources_dir):
+        remove_directory(directory, force=True)
+        directory.mkdir(parents=True)
+
+    root_path = manifests_dir / 'pyproject.toml'
+    root_path.write_text(
+        tomlkit.dumps(prune_root_data(context.root_pyproject.data_raw, paths)),
+        encoding='utf-8',
+    )
+
+    for filename in ROOT_FILES:
+        if (root_dir / filename).exists():
+            link_or_copy(root_dir / filename, manifests_dir / filename)
+
+    # Workspaces nested in a kept workspace are sources of neither
+    kept_paths = {w.path for w in workspaces}
+    other_dirs = frozenset(w.path.parent for w in context.workspaces if w.path not in kept_paths)
+
+    for workspace, path in zip(workspaces, paths):
+        workspace_dir = workspace.path.parent
+
+        (manifests_dir / path).mkdir(parents=True, exist_ok=True)
+        link_or_copy(workspace.path, manifests_dir / path / 'pyproject.toml')
+
+        for relative_path in iter_tree(workspace_dir, skip_dirs=other_dirs):
+            if relative_path == 'pyproject.toml':
+                continue
+
+            destination = sources_dir / path / relative_path
+            destination.parent.mkdir(parents=True, exist_ok=True)
+
+            link_or_copy(workspace_dir / relative_path, destination)
+
+    lock_path = context.get_lock_path(context.get_lock_group(workspaces[0]))
+
+    if lock_path.exists():
+        config = replace(context.config, workspaces=paths, lock_groups={})
+
+        root_pyproject = PyProjectTOML(root_path)
+        pruned_context = Context(
+            root_pyproject,
+            root_pyproject,
+            get_workspaces(config, root_path),
+            config=config,
+            workspace_versions=context.workspace_versions,
+            pool_cache=context.pool_cache,
+        )
+
+        poetry = Factory().create_poetry(pruned_context)
+
+        locker = Locker(lock_path, {})
+
+        if not locker.is_locked_groups_and_markers():
+            raise ValueError(
+                f'Could not prune {lock_path.name}, as it was written by a version of Poetry'
+                ' older than 2.0. Run "poetry lock" to update it.'
+            )
+
+        index = LockIndex.from_lock_data(locker.lock_data)
+        names = index.closure(dependency.name for dependency in poetry.package.all_requires)
+
+        # Written by the locker of the pruned tree, which hashes the pruned pyproject content
+        poetry.locker.set_lock_data(
+            poetry.package,
+            {
+                package: info
+                for package, info in locker.locked_packages().items()
+                if package.name in names
+            },
+        )
+
+    return workspaces
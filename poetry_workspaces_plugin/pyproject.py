@@ -3,13 +3,13 @@ from copy import deepcopy
 from pathlib import Path
 from typing import Any, Callable
 
-from poetry.core.pyproject.exceptions import PyProjectError
+from packaging.utils import canonicalize_name
 from poetry.core.factory import Factory as BaseFactory
 from poetry.pyproject.toml import PyProjectTOML as BasePyProjectTOML
 from tomlkit import TOMLDocument
 from tomlkit.items import Table
 
-from poetry_workspaces_plugin.config import Config
+from poetry_workspaces_plugin import counters
 from poetry_workspaces_plugin.constants import PYTHON_VERSION_RE, SECTION_KEY
 from poetry_workspaces_plugin.utils import get_path, set_path
 
@@ -19,9 +19,6 @@ class PyProjectTOML(BasePyProjectTOML):
     def __init__(self, path: Path) -> None:
         super().__init__(path)
 
-        self._workspaces: dict[str, str] = {}
-        self._data_rendered: TOMLDocument | None = None
-
     def __eq__(self, value: object, /) -> bool:
         if not isinstance(value, PyProjectTOML):
             return False
@@ -31,8 +28,8 @@ class PyProjectTOML(BasePyProjectTOML):
     @property
     def name(self) -> str:
         name = (
-            get_path(self.data, 'project.name') or
-            get_path(self.data, 'tool.poetry.name') or
+            get_path(self.data_raw, 'project.name') or
+            get_path(self.data_raw, 'tool.poetry.name') or
             ''
         )
 
@@ -41,8 +38,8 @@ class PyProjectTOML(BasePyProjectTOML):
     @property
     def version(self) -> str:
         version = (
-            get_path(self.data, 'project.version') or
-            get_path(self.data, 'tool.poetry.version') or
+            get_path(self.data_raw, 'project.version') or
+            get_path(self.data_raw, 'tool.poetry.version') or
             '0.0.0'
         )
 
@@ -50,17 +47,30 @@ class PyProjectTOML(BasePyProjectTOML):
 
     @property
     def plugin_section(self) -> Table | None:
-        plugin_section = self.data.get('tool', {}).get(SECTION_KEY)
+        plugin_section = self.data_raw.get('tool', {}).get(SECTION_KEY)
 
         return plugin_section
 
     @property
     def data_raw(self):
+        if self._toml_document is None:
+            counters.count(counters.TOML_PARSE)
+
         return super().data
 
     @property
     def data(self) -> TOMLDocument:
-        """Regular data object with workspace protocol references removed."""
+        """Unrendered data object, use `Context.render` for rendered workspace references."""
+        return self.data_raw
+
+    def render(self, workspaces: dict[str, str]) -> TOMLDocument:
+        """Render workspace protocol references with the versions of the workspaces.
+
+        References to workspaces missing from the versions are removed.
+        """
+        counters.count(counters.RENDER)
+        counters.count(counters.DEEPCOPY)
+
         data_rendered = deepcopy(self.data_raw)
 
         project_dependencies = get_path(data_rendered, 'project.dependencies')
@@ -70,14 +80,14 @@ class PyProjectTOML(BasePyProjectTOML):
 
             for p in project_dependencies:
                 if 'workspace:' in p:
-                    rendered = render_workspace_pep_508(p, self._workspaces)
+                    rendered = render_workspace_pep_508(p, workspaces)
 
                     if rendered is not None:
                         rendered_dependencies.append(rendered)
                 else:
                     rendered_dependencies.append(p)
 
-            set_path(data_rendered, 'project.dependencies', project_dependencies)
+            set_path(data_rendered, 'project.dependencies', rendered_dependencies)
 
         dependency_groups = get_path(data_rendered, 'project.dependency-groups')
 
@@ -87,7 +97,7 @@ class PyProjectTOML(BasePyProjectTOML):
 
                 for p in dependencies:
                     if 'workspace:' in p:
-                        rendered = render_workspace_pep_508(p, self._workspaces)
+                        rendered = render_workspace_pep_508(p, workspaces)
 
                         if rendered is not None:
                             rendered_dependencies.append(rendered)
@@ -103,14 +113,14 @@ class PyProjectTOML(BasePyProjectTOML):
 
             for name, spec in poetry_dependencies.items():
                 if isinstance(spec, str) and 'workspace:' in spec:
-                    rendered_version = render_workspace_version(name, spec, self._workspaces)
+                    rendered_version = render_workspace_version(name, spec, workspaces)
 
                     if rendered_version is not None:
                         filtered_dependencies[name] = rendered_version
 
                 elif isinstance(spec, dict) and 'workspace:' in spec.get('version', ''):
                     version = spec['version']
-                    rendered_version = render_workspace_version(name, version, self._workspaces)
+                    rendered_version = render_workspace_version(name, version, workspaces)
 
                     if rendered_version is not None:
                         spec['version'] = rendered_version
@@ -133,14 +143,14 @@ class PyProjectTOML(BasePyProjectTOML):
 
                     for name, spec in dependencies.items():
                         if isinstance(spec, str) and 'workspace:' in spec:
-                            rendered_version = render_workspace_version(name, spec, self._workspaces)
+                            rendered_version = render_workspace_version(name, spec, workspaces)
 
                             if rendered_version is not None:
                                 filtered_dependencies[name] = rendered_version
 
                         elif isinstance(spec, dict) and 'workspace:' in spec.get('version', ''):
                             version = spec['version']
-                            rendered_version = render_workspace_version(name, version, self._workspaces)
+                            rendered_version = render_workspace_version(name, version, workspaces)
 
                             if rendered_version is not None:
                                 spec['version'] = rendered_version
@@ -178,12 +188,9 @@ class PyProjectTOML(BasePyProjectTOML):
 
         return group_section
 
-    def set_workspaces(self, workspaces: dict):
-        self._workspaces = workspaces
-
 
 def parse_workspace_pep_508(constraint: str):
-    name_re = r'(?P<name>[A-Za-z-]+)(?P<extras>\[[\w\s,]+\]?)'
+    name_re = r'(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)(?P<extras>\[[\w\s,.-]*\])?'
     match = re.search(
         rf'^{name_re}\s+@\s+workspace:(?P<token>[\^~*]?)(?P<version>{PYTHON_VERSION_RE}?)\s*',
         constraint,
@@ -204,13 +211,21 @@ def parse_workspace_version(version: str):
 def render_version(parsed_dict: dict, name: str, workspaces: dict):
     workspace_version = workspaces.get(name)
 
+    # References may spell the name of a workspace differently from its pyproject.toml
+    if workspace_version is None:
+        canonical_name = canonicalize_name(name)
+        workspace_version = next(
+            (v for n, v in workspaces.items() if canonicalize_name(n) == canonical_name),
+            None,
+        )
+
     if not workspace_version:
         return
 
     token = parsed_dict['token']
     version = parsed_dict['version']
 
-    if token == '*' or '':
+    if token in ('*', ''):
         rendered_version = f'=={version or workspace_version}'
     else:
         rendered_version = f'{token}{version or workspace_version}'
@@ -233,7 +248,7 @@ def render_workspace_pep_508(constraint: str, workspaces: dict):
     if rendered_version is None:
         return
 
-    extras = parsed_dict['extras']
+    extras = parsed_dict['extras'] or ''
 
     rendered = constraint.replace(parsed.group().strip(), f'{name}{extras} ({rendered_version})')
 
@@ -256,6 +271,101 @@ def render_workspace_version(name: str, version: str, workspaces: dict):
     return rendered_version
 
 
+def update_workspace_pep_508(constraint: str, workspaces: dict[str, str]):
+    """Rewrite the explicit version pinned by a workspace protocol requirement."""
+    parsed = parse_workspace_pep_508(constraint)
+
+    if parsed is None or not parsed.group('version'):
+        return
+
+    version = workspaces.get(canonicalize_name(parsed.group('name')))
+
+    if version is None:
+        return
+
+    start, end = parsed.span('version')
+
+    return f'{constraint[:start]}{version}{constraint[end:]}'
+
+
+def update_workspace_version(name: str, version: str, workspaces: dict[str, str]):
+    """Rewrite the explicit version pinned by a workspace protocol constraint."""
+    parsed = parse_workspace_version(version)
+
+    if parsed is None or not parsed.group('version'):
+        return
+
+    workspace_version = workspaces.get(canonicalize_name(name))
+
+    if workspace_version is None:
+        return
+
+    start, end = parsed.span('version')
+
+    return f'{version[:start]}{workspace_version}{version[end:]}'
+
+
+def update_workspace_pins(content: dict[str, Any], workspaces: dict[str, str]) -> bool:
+    """Update explicit workspace protocol pins in a raw pyproject document in place.
+
+    Only pins that spell out a version (e.g. `workspace:^1.2.0`) are rewritten, as pins
+    without one are rendered from the current workspace versions. Returns whether any
+    pin was changed.
+    """
+    workspaces = {canonicalize_name(name): version for name, version in workspaces.items()}
+
+    changed = False
+
+    requirement_lists = [get_path(content, 'project.dependencies')]
+    requirement_lists.extend((content.get('dependency-groups') or {}).values())
+
+    for requirements in requirement_lists:
+        if not isinstance(requirements, list):
+            continue
+
+        for i, requirement in enumerate(requirements):
+            if not isinstance(requirement, str) or 'workspace:' not in requirement:
+                continue
+
+            updated = update_workspace_pep_508(requirement, workspaces)
+
+            if updated is not None and updated != requirement:
+                requirements[i] = updated
+                changed = True
+
+    dependency_tables = [get_path(content, 'tool.poetry.dependencies')]
+    dependency_tables.extend(
+        group.get('dependencies')
+        for group in (get_path(content, 'tool.poetry.group') or {}).values()
+    )
+
+    for dependencies in dependency_tables:
+        if not isinstance(dependencies, dict):
+            continue
+
+        updated_specs = {}
+
+        for name, spec in dependencies.items():
+            if isinstance(spec, str) and 'workspace:' in spec:
+                updated = update_workspace_version(name, spec, workspaces)
+
+                if updated is not None and updated != spec:
+                    updated_specs[name] = updated
+
+            elif isinstance(spec, dict) and 'workspace:' in spec.get('version', ''):
+                updated = update_workspace_version(name, spec['version'], workspaces)
+
+                if updated is not None and updated != spec['version']:
+                    spec['version'] = updated
+                    changed = True
+
+        for name, updated in updated_specs.items():
+            dependencies[name] = updated
+            changed = True
+
+    return changed
+
+
 def create_pyproject(dir: Path):
     """Attempt to create a pyproject instance for directory."""
     path = dir / 'pyproject.toml'
@@ -263,6 +373,8 @@ def create_pyproject(dir: Path):
     if path.exists():
         pyproject = PyProjectTOML(path)
 
+        counters.count(counters.VALIDATE)
+
         BaseFactory.validate(pyproject.data)
 
         return pyproject
@@ -294,21 +406,3 @@ def get_root_pyproject(cwd: str | Path | None = None):
 
     return root_pyproject
 
-
-def get_workspaces_pyprojects(config: Config, root_path: Path) -> list[PyProjectTOML]:
-    """Get all managed workspace pyprojects."""
-    workspaces_pyprojects = []
-
-    for workspace_glob in config.workspaces:
-        for dir in root_path.parent.glob(workspace_glob):
-            try:
-                workspace_pyproject = create_pyproject(dir)
-            except Exception as e:
-                raise PyProjectError(
-                    f'Workspace "{dir.name}" pyproject.toml is invalid.\n\n{e}'
-                )
-
-            if workspace_pyproject and workspace_pyproject.is_poetry_project():
-                workspaces_pyprojects.append(workspace_pyproject)
-
-    return workspaces_pyprojects
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import heapq
+import json
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
+
+
+if TYPE_CHECKING:
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.discovery import WorkspaceInfo
+
+
+TIMINGS_FILE = 'timings.json'
+
+SHARD_RE = re.compile(r'^(?P<index>[1-9][0-9]*)/(?P<count>[1-9][0-9]*)$')
+
+# Weight of the latest run in the recorded duration of a workspace
+SMOOTHING = 0.5
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a 1-based `index/count` shard specification."""
+    match = SHARD_RE.match(value.strip())
+
+    if match is None or int(match.group('index')) > int(match.group('count')):
+        raise ValueError(f'Invalid shard "{value}", expected "<index>/<count>" such as "1/4"')
+
+    return int(match.group('index')), int(match.group('count'))
+
+
+class Timings:
+    """Durations of previous runs in each workspace, in seconds."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+        try:
+            self.durations: dict[str, float] = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self.durations = {}
+
+    @classmethod
+    def from_context(cls, context: Context) -> Timings:
+        return cls(context.cache_dir / TIMINGS_FILE)
+
+    def record(self, name: str, duration: float):
+        previous = self.durations.get(name)
+
+        if previous is None:
+            self.durations[name] = duration
+        else:
+            self.durations[name] = SMOOTHING * duration + (1 - SMOOTHING) * previous
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.durations, indent=2, sort_keys=True))
+
+
+def partition(names: Sequence[str], durations: dict[str, float], count: int) -> list[list[str]]:
+    """Split names into bins of about equal total duration.
+
+    Longest durations are placed first, each in the bin with the least total so far.
+    Names without a recorded duration count as the average one, and names are sliced
+    into bins of equal size when there are no durations at all. Names are sorted first,
+    so that every CI node computes the same bins whatever the discovery order.
+    """
+    names = sorted(names)
+    known = [durations[name] for name in names if name in durations]
+
+    if not known:
+        size, extra = divmod(len(names), count)
+        bins, start = [], 0
+
+        for i in range(count):
+            end = start + size + (i < extra)
+            bins.append(list(names[start:end]))
+            start = end
+
+        return bins
+
+    average = sum(known) / len(known)
+    heap = [(0.0, i) for i in range(count)]
+    bins = [[] for _ in range(count)]
+
+    for name in sorted(names, key=lambda name: (-durations.get(name, average), name)):
+        total, i = heapq.heappop(heap)
+
+        bins[i].append(name)
+
+        heapq.heappush(heap, (total + durations.get(name, average), i))
+
+    return [sorted(names_bin) for names_bin in bins]
+
+
+def select_shard(
+    workspaces: list[WorkspaceInfo],
+    timings: Timings,
+    index: int,
+    count: int,
+) -> list[WorkspaceInfo]:
+    """Get the workspaces of a 1-based shard."""
+    names = set(partition([w.name for w in workspaces], timings.durations, count)[index - 1])
+
+    return [workspace for workspace in workspaces if workspace.name in names]
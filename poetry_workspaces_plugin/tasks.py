@@ -0,0 +1,298 @@
+"""Results of workspace commands cached by the hash of their inputs.
+
+The key of a task covers the command line, the source tree and rendered pyproject of its
+workspace, the locked packages the workspace depends on and, transitively, the inputs of
+the workspaces it references. Every key also covers the rendered root pyproject and the
+locked packages of its dependency groups, which configure tools shared by all workspaces.
+Entries hold the captured output and the output files of successful runs, and are read
+from and written to every configured backend.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Callable, Iterable, Iterator
+
+import tomlkit
+from packaging.utils import canonicalize_name
+
+from poetry_workspaces_plugin.discovery import summarize_dependencies
+from poetry_workspaces_plugin.hashing import hash_workspaces
+
+
+if TYPE_CHECKING:
+    from poetry_workspaces_plugin.context import Context
+    from poetry_workspaces_plugin.discovery import WorkspaceInfo
+    from poetry_workspaces_plugin.lock_index import LockIndex
+
+
+# Bump whenever keys or entries change, so that stored results are not reused
+TASK_CACHE_VERSION = 2
+
+METADATA_FILE = 'task.json'
+OUTPUTS_DIR = 'outputs'
+
+
+class TaskCacheBackend(ABC):
+    """Storage of task entries, each a directory with a metadata file and output files."""
+
+    @abstractmethod
+    def get(self, key: str) -> Path | None:
+        """Get the directory of an entry, or None when it is not stored."""
+
+    @abstractmethod
+    def put(self, key: str, entry: Path):
+        """Store a copy of an entry directory."""
+
+
+class DirectoryBackend(TaskCacheBackend):
+    """Entries in a directory, which may be shared between machines."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def get(self, key: str) -> Path | None:
+        entry = self.directory / key
+
+        if (entry / METADATA_FILE).is_file():
+            return entry
+
+    def put(self, key: str, entry: Path):
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        staging = Path(tempfile.mkdtemp(prefix=f'.{key}.', dir=self.directory))
+
+        try:
+            for path in sorted(entry.rglob('*')):
+                if path.is_file():
+                    destination = staging / path.relative_to(entry)
+                    destination.parent.mkdir(parents=True, exist_ok=True)
+
+                    shutil.copy2(path, destination)
+
+            shutil.rmtree(self.directory / key, ignore_errors=True)
+            os.replace(staging, self.directory / key)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+# Backends by the scheme of their location, plain paths use a directory
+BACKENDS: dict[str, Callable[[str], TaskCacheBackend]] = {
+    'file': lambda location: DirectoryBackend(Path(location.removeprefix('file://'))),
+}
+
+
+def get_backend(location: str, root_dir: Path) -> TaskCacheBackend:
+    scheme, separator, _ = location.partition('://')
+
+    if not separator:
+        return DirectoryBackend(root_dir / location)
+
+    if scheme not in BACKENDS:
+        raise ValueError(f'Unknown task cache backend "{scheme}" in "{location}"')
+
+    return BACKENDS[scheme](location)
+
+
+class TaskCache:
+    """Task entries in the local cache directory, and in a remote backend if configured.
+
+    Hits of the remote backend are copied to the local one, and new entries are stored
+    in both.
+    """
+
+    def __init__(self, backends: list[TaskCacheBackend]) -> None:
+        self.backends = backends
+
+    @classmethod
+    def from_context(cls, context: Context) -> TaskCache:
+        backends: list[TaskCacheBackend] = [DirectoryBackend(context.cache_dir / 'tasks')]
+
+        if context.config.task_cache_remote:
+            root_dir = context.root_pyproject.path.parent
+            backends.append(get_backend(context.config.task_cache_remote, root_dir))
+
+        return cls(backends)
+
+    def get(self, key: str) -> Path | None:
+        for i, backend in enumerate(self.backends):
+            if (entry := backend.get(key)) is None:
+                continue
+
+            for other in self.backends[:i]:
+                other.put(key, entry)
+
+            return entry
+
+    def put(self, key: str, stdout: str, stderr: str, root: Path, outputs: list[Path]):
+        """Store the output of a task and its output files relative to a directory."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            entry = Path(temp_dir)
+
+            for path in outputs:
+                destination = entry / OUTPUTS_DIR / path.relative_to(root)
+                destination.parent.mkdir(parents=True, exist_ok=True)
+
+                # Copied, as a link would let a task that rewrites its outputs change the cache
+                shutil.copy2(path, destination)
+
+            metadata = {
+                'stdout': stdout,
+                'stderr': stderr,
+                'outputs': [path.relative_to(root).as_posix() for path in outputs],
+            }
+
+            (entry / METADATA_FILE).write_text(json.dumps(metadata))
+
+            for backend in self.backends:
+                backend.put(key, entry)
+
+
+def read_entry(entry: Path) -> dict:
+    return json.loads((entry / METADATA_FILE).read_text())
+
+
+def restore_outputs(entry: Path, root: Path) -> list[Path]:
+    """Restore the output files of an entry into a directory."""
+    restored = []
+
+    for relative_path in read_entry(entry)['outputs']:
+        destination = root / relative_path
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        # Copy, so that later changes to the outputs never reach the cache
+        destination.unlink(missing_ok=True)
+        shutil.copy2(entry / OUTPUTS_DIR / relative_path, destination)
+
+        restored.append(destination)
+
+    return restored
+
+
+def update_locked_packages(digest, lock_index: LockIndex, names: Iterable[str]):
+    """Hash the locked versions of packages and everything they depend on."""
+    for package in sorted(lock_index.closure(names)):
+        digest.update(f'{package}=={",".join(lock_index.versions(package))}\n'.encode())
+
+
+def get_root_hash(context: Context, lock_index: LockIndex | None) -> str:
+    """Hash the rendered root pyproject and the locked packages of its dependency groups."""
+    digest = hashlib.sha256()
+    digest.update(tomlkit.dumps(context.render(context.root_pyproject)).encode())
+
+    if lock_index is not None:
+        dependencies, _ = summarize_dependencies(context.root_pyproject.data_raw)
+
+        update_locked_packages(digest, lock_index, dependencies)
+
+    return digest.hexdigest()
+
+
+def get_input_hashes(
+    context: Context,
+    lock_indexes: dict[str | None, LockIndex],
+) -> dict[str, str]:
+    """Hash the inputs of every workspace along with those of the workspaces it references.
+
+    Locked packages are looked up in the index of the workspace's lock group, if any.
+    """
+    source_hashes = hash_workspaces(context)
+    root_hash = get_root_hash(context, lock_indexes.get(None))
+    hashes: dict[str, str] = {}
+
+    def visit(workspace: WorkspaceInfo, stack: tuple[str, ...]) -> str:
+        name = canonicalize_name(workspace.name)
+
+        if name in hashes:
+            return hashes[name]
+
+        digest = hashlib.sha256()
+        digest.update(root_hash.encode())
+        digest.update(source_hashes[workspace.name].encode())
+        digest.update(tomlkit.dumps(context.render(workspace.pyproject)).encode())
+
+        lock_index = lock_indexes.get(context.get_lock_group(workspace))
+
+        if lock_index is not None:
+            update_locked_packages(digest, lock_index, workspace.dependencies)
+
+        for dependency in sorted(workspace.workspace_dependencies):
+            if dependency in stack or dependency not in context.workspaces_by_name:
+                continue
+
+            other = context.workspaces_by_name[dependency]
+            digest.update(f'{dependency}:{visit(other, (*stack, name))}\n'.encode())
+
+        hashes[name] = digest.hexdigest()
+
+        return hashes[name]
+
+    for workspace in context.workspaces:
+        visit(workspace, ())
+
+    return hashes
+
+
+def get_task_key(input_hash: str, args: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(f'{TASK_CACHE_VERSION}\0{input_hash}\0{args}'.encode())
+
+    return digest.hexdigest()
+
+
+class CapturedOutput:
+    """Text streams whose content is read back once the capture ends."""
+
+    def __init__(self) -> None:
+        self.stdout_file = tempfile.TemporaryFile()
+        self.stderr_file = tempfile.TemporaryFile()
+
+        self.stdout: IO[str] = open(self.stdout_file.fileno(), 'w', buffering=1, closefd=False)
+        self.stderr: IO[str] = open(self.stderr_file.fileno(), 'w', buffering=1, closefd=False)
+
+    def read(self) -> tuple[str, str]:
+        values = []
+
+        for stream, file in ((self.stdout, self.stdout_file), (self.stderr, self.stderr_file)):
+            stream.close()
+            file.seek(0)
+
+            values.append(file.read().decode(errors='replace'))
+            file.close()
+
+        return values[0], values[1]
+
+
+@contextmanager
+def capture_output() -> Iterator[CapturedOutput]:
+    """Capture output written to the yielded streams and by child processes.
+
+    File descriptors 1 and 2 point at the same files as the streams while capturing, so
+    that commands run in the workspace environment are captured in order as well.
+    """
+    captured = CapturedOutput()
+
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+
+    saved = [os.dup(1), os.dup(2)]
+
+    try:
+        os.dup2(captured.stdout_file.fileno(), 1)
+        os.dup2(captured.stderr_file.fileno(), 2)
+
+        yield captured
+    finally:
+        captured.stdout.flush()
+        captured.stderr.flush()
+
+        for fd, saved_fd in zip((1, 2), saved):
+            os.dup2(saved_fd, fd)
+            os.close(saved_fd)
@@ -0,0 +1,102 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from poetry_workspaces_plugin import api
+from testing.utils import LOCK
+
+
+def add_workspace_dependency(file, name):
+    content = file.read()
+
+    if 'project' in content:
+        content['project']['dependencies'].append(f'{name} @ workspace:^')
+    else:
+        content['tool']['poetry']['dependencies'][name] = 'workspace:^'
+
+    file.write(content)
+
+
+def test_loads_workspaces_and_graph(test_package):
+    root_file, workspace_files = test_package
+
+    add_workspace_dependency(workspace_files[1], 'project-a')
+
+    project = api.load(workspace_files[0].path.parent)
+
+    assert project.name == 'project-root'
+    assert project.root == root_file.path.parent.as_posix()
+    assert sorted(w.name for w in project.workspaces) == ['project-a', 'project-b']
+
+    assert project.graph == {'project-a': [], 'project-b': ['project-a']}
+    assert project.dependents('project-a') == ['project-b']
+
+    data = json.loads(project.to_json())
+
+    assert data['graph'] == project.graph
+    assert {w['path'] for w in data['workspaces']} == {'packages/project-a', 'packages/project-b'}
+
+
+def test_reads_lock_index_from_cache(test_package):
+    root_file, _ = test_package
+
+    root_dir = root_file.path.parent
+
+    project = api.load(root_dir)
+
+    assert project.lock_index is None
+    assert project.locked_versions('pydantic') == []
+
+    (root_dir / 'poetry.lock').write_text(LOCK)
+
+    project = api.load(root_dir)
+
+    assert project.locked_versions('pydantic') == ['2.8.0']
+    assert list((root_dir / '.poetry-workspaces' / 'lock-index').glob('*.bin'))
+
+
+def test_reads_lock_index_of_target_lock_group(test_package):
+    root_file, workspace_files = test_package
+
+    root_dir = root_file.path.parent
+
+    content = root_file.read()
+    content['tool']['poetry-workspaces-plugin']['lock-groups'] = {'b': ['packages/project-b']}
+    root_file.write(content)
+
+    (root_dir / 'poetry.b.lock').write_text(LOCK)
+
+    file_a, file_b = sorted(workspace_files, key=lambda wf: wf.path.parent.name)
+
+    assert api.load(file_a.path.parent).lock_index is None
+    assert api.load(file_b.path.parent).locked_versions('pydantic') == ['2.8.0']
+    assert list((root_dir / '.poetry-workspaces' / 'lock-index-b').glob('*.bin'))
+
+
+def test_raises_outside_of_workspaces(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        api.load(tmp_path)
+
+
+def test_does_not_import_poetry_application():
+    code = 'import sys; import poetry_workspaces_plugin.api; print(" ".join(sys.modules))'
+
+    modules = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    assert 'poetry_workspaces_plugin.api' in modules
+    assert not any(m.startswith(('poetry.console', 'poetry.factory', 'poetry.installation')) for m in modules)
+
+
+def test_hashes_workspaces(test_package):
+    root_file, workspace_files = test_package
+
+    project = api.load(root_file.path.parent)
+
+    hashes = project.hashes()
+
+    assert set(hashes) == {'project-a', 'project-b'}
+    assert project.hashes(['project-a']) == {'project-a': hashes['project-a']}
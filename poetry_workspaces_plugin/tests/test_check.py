@@ -0,0 +1,23 @@
+from poetry_workspaces_plugin.check import check_references
+from poetry_workspaces_plugin.pyproject import render_workspace_pep_508
+
+
+def test_matches_references_by_normalized_name():
+    versions = {'Project_A': '1.2.0'}
+
+    data = {
+        'project': {
+            'dependencies': ['project-a @ workspace:^1.0.0', 'project.b @ workspace:'],
+        },
+        'tool': {'poetry': {'dependencies': {'PROJECT-A': 'workspace:^2.0.0'}}},
+    }
+
+    assert check_references(data, versions) == [
+        'project.dependencies: "project.b" is not a workspace',
+        'tool.poetry.dependencies: "workspace:^2.0.0" does not match the version of workspace'
+        ' "PROJECT-A" (1.2.0)',
+    ]
+
+    rendered = render_workspace_pep_508('project-a @ workspace:', versions)
+
+    assert rendered == 'project-a (==1.2.0)'
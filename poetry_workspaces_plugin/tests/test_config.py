@@ -0,0 +1,21 @@
+import pytest
+import tomlkit
+
+from poetry_workspaces_plugin.config import Config
+
+
+def load(section: str) -> Config:
+    config = Config()
+    config.load(tomlkit.parse(section))
+
+    return config
+
+
+def test_loads_merge_mode():
+    assert load('').merge_mode == 'additive'
+    assert load('merge-mode = "intersect"').merge_mode == 'intersect'
+
+
+def test_rejects_unknown_merge_mode():
+    with pytest.raises(ValueError, match='Invalid merge-mode "intersection"'):
+        load('merge-mode = "intersection"')
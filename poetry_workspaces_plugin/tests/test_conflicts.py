@@ -0,0 +1,83 @@
+from itertools import combinations
+from pathlib import Path
+
+from poetry_workspaces_plugin.conflicts import (
+    group_by_environment,
+    iter_declared_dependencies,
+    overlaps,
+    shrink_conflict,
+)
+
+
+def get_dependencies(data):
+    return {
+        (d.dependency.name, d.group): d.dependency
+        for d in iter_declared_dependencies('project', data, Path.cwd())
+    }
+
+
+def test_skips_workspace_and_path_dependencies():
+    data = {
+        'project': {
+            'dependencies': [
+                'Requests>=2.0',
+                'project-a @ workspace:^',
+                'local @ file:///tmp/local',
+            ],
+        },
+        'dependency-groups': {'test': ['pytest>=8', {'include-group': 'lint'}]},
+        'tool': {
+            'poetry': {
+                'dependencies': {'python': '^3.11', 'other': {'path': '../other'}},
+                'group': {'dev': {'dependencies': {'ipdb': [{'version': '<1', 'python': '<3.12'}]}}},
+            },
+        },
+    }
+
+    assert set(get_dependencies(data)) == {('requests', 'main'), ('pytest', 'test'), ('ipdb', 'dev')}
+
+
+def test_respects_markers():
+    left = get_dependencies({'project': {'dependencies': ['numpy<2; sys_platform == "win32"']}})
+    right = get_dependencies({'project': {'dependencies': ['numpy>=2; sys_platform == "linux"']}})
+    other = get_dependencies({'project': {'dependencies': ['numpy>=2']}})
+
+    left, right, other = (d['numpy', 'main'] for d in (left, right, other))
+
+    assert overlaps(left, right)
+    assert not overlaps(left, other)
+    assert overlaps(right, other)
+
+
+def declare(workspace, constraint):
+    data = {'tool': {'poetry': {'dependencies': {'numpy': constraint}}}}
+
+    return next(iter_declared_dependencies(workspace, data, Path.cwd()))
+
+
+def test_shrinks_constraints_that_only_conflict_together():
+    declarations = [
+        declare('a', '==1.0 || ==2.0'),
+        declare('b', '>=1.0'),
+        declare('c', '==1.0 || ==3.0'),
+        declare('d', '==2.0 || ==3.0'),
+    ]
+
+    dependencies = [d.dependency for d in declarations]
+
+    assert all(overlaps(left, right) for left, right in combinations(dependencies, 2))
+    assert not overlaps(*dependencies)
+
+    assert [d.workspace for d in shrink_conflict(declarations)] == ['a', 'c', 'd']
+
+
+def test_groups_declarations_by_environment():
+    declarations = [
+        declare('a', {'version': '<2', 'markers': 'sys_platform == "win32"'}),
+        declare('b', {'version': '>=2', 'markers': 'sys_platform == "linux"'}),
+        declare('c', '>=1'),
+    ]
+
+    groups = group_by_environment(declarations)
+
+    assert [[d.workspace for d in group] for group in groups] == [['a', 'c'], ['b', 'c']]
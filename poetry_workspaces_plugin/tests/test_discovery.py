@@ -0,0 +1,137 @@
+import os
+from pathlib import Path
+
+from poetry_workspaces_plugin.config import Config
+from poetry_workspaces_plugin.discovery import get_workspaces
+
+
+def test_records_workspaces_without_loading_documents(test_package):
+    root_file, workspace_files = test_package
+
+    config = Config(workspaces=['packages/*'])
+
+    workspaces = get_workspaces(config, root_file.path)
+
+    assert sorted(w.name for w in workspaces) == ['project-a', 'project-b']
+    assert {w.path for w in workspaces} == {wf.path for wf in workspace_files}
+    assert all(w.version == '0.1.0' for w in workspaces)
+    assert not any(w.is_loaded for w in workspaces)
+
+    project_a = next(w for w in workspaces if w.name == 'project-a')
+
+    assert set(project_a.dependencies) == {'pydantic', 'pytest', 'pytest-mock'}
+    assert project_a.workspace_dependencies == ()
+
+    assert project_a.pyproject.name == 'project-a'
+    assert project_a.is_loaded
+
+
+def test_summarizes_workspace_dependencies(test_package):
+    root_file, workspace_files = test_package
+
+    content = workspace_files[1].read()
+
+    if 'project' in content:
+        content['project']['dependencies'].append('project-a @ workspace:^')
+    else:
+        content['tool']['poetry']['dependencies']['project-a'] = {'version': 'workspace:^'}
+
+    workspace_files[1].write(content)
+
+    workspaces = get_workspaces(Config(workspaces=['packages/*']), root_file.path)
+
+    project_b = next(w for w in workspaces if w.name == 'project-b')
+
+    assert 'project-a' in project_b.dependencies
+    assert project_b.workspace_dependencies == ('project-a',)
+
+
+def make_workspace(dir, name):
+    dir.mkdir(parents=True)
+
+    (dir / 'pyproject.toml').write_text(f'[project]\nname = "{name}"\nversion = "0.1.0"\n')
+
+
+def test_walks_patterns_with_pruning_and_exclusions(tmp_path, mocker):
+    root = tmp_path / 'root'
+    root.mkdir()
+    (root / 'pyproject.toml').write_text('')
+
+    make_workspace(root / 'packages' / 'a', 'a')
+    make_workspace(root / 'packages' / 'a' / 'examples' / 'nested', 'nested')
+    make_workspace(root / 'packages' / 'legacy-b', 'legacy-b')
+    make_workspace(root / 'libs' / 'group' / 'c', 'c')
+    make_workspace(root / 'libs' / 'node_modules' / 'd', 'd')
+    make_workspace(root / '.venv' / 'e', 'e')
+    make_workspace(root / 'docs' / 'f', 'f')
+
+    scandir = mocker.spy(os, 'scandir')
+
+    config = Config(
+        workspaces=['packages/*', 'packages/a', '**/c', 'libs/**', '!packages/legacy-*'],
+        nested_workspaces=False,
+    )
+
+    workspaces = get_workspaces(config, root / 'pyproject.toml')
+
+    assert sorted(w.name for w in workspaces) == ['a', 'c']
+
+    scanned = {Path(call.args[0]).relative_to(root).as_posix() for call in scandir.call_args_list}
+
+    assert 'packages/a' not in scanned
+    assert '.venv' not in scanned
+    assert 'libs/node_modules' not in scanned
+
+    config.nested_workspaces = True
+
+    workspaces = get_workspaces(config, root / 'pyproject.toml')
+
+    assert sorted(w.name for w in workspaces) == ['a', 'c']
+
+    config.workspaces.append('packages/*/examples/*')
+
+    workspaces = get_workspaces(config, root / 'pyproject.toml')
+
+    assert sorted(w.name for w in workspaces) == ['a', 'c', 'nested']
+
+
+def test_finds_pruned_directories_listed_literally(tmp_path):
+    root = tmp_path / 'root'
+    root.mkdir()
+    (root / 'pyproject.toml').write_text('')
+
+    make_workspace(root / 'packages' / 'build', 'build')
+    make_workspace(root / 'packages' / 'a' / 'dist', 'a-dist')
+    make_workspace(root / 'tools' / 'b' / 'dist', 'b-dist')
+
+    config = Config(workspaces=['packages/build', 'tools/*/dist'])
+
+    workspaces = get_workspaces(config, root / 'pyproject.toml')
+
+    assert sorted(w.name for w in workspaces) == ['b-dist', 'build']
+
+    # Wildcards never expand to build outputs
+    config.workspaces = ['packages/*', 'packages/**']
+
+    assert get_workspaces(config, root / 'pyproject.toml') == []
+
+
+def test_nested_workspaces_are_found_by_default(tmp_path):
+    root = tmp_path / 'root'
+    make_workspace(root, 'root')
+    make_workspace(root / 'packages' / 'a', 'a')
+    make_workspace(root / 'packages' / 'a' / 'plugins' / 'b', 'b')
+
+    config = Config(workspaces=['.', 'packages/**'])
+
+    assert config.nested_workspaces
+
+    workspaces = get_workspaces(config, root / 'pyproject.toml')
+
+    assert [w.name for w in workspaces] == ['root', 'a', 'b']
+
+    config.nested_workspaces = False
+
+    workspaces = get_workspaces(config, root / 'pyproject.toml')
+
+    assert [w.name for w in workspaces] == ['root', 'a']
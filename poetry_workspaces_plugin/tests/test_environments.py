@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from poetry_workspaces_plugin.environments import LinkingWheelInstaller, WheelStore
+
+
+FILES = {
+    'demo/__init__.py': b'VALUE = 1\n',
+    'demo/data.txt': b'data\n',
+    'demo-1.0.dist-info/METADATA': b'Metadata-Version: 2.1\nName: demo\nVersion: 1.0\n',
+    'demo-1.0.dist-info/WHEEL': (
+        b'Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n'
+    ),
+    'demo-1.0.dist-info/entry_points.txt': b'[console_scripts]\ndemo = demo:main\n',
+}
+
+
+def create_wheel(directory: Path) -> Path:
+    wheel = directory / 'demo-1.0-py3-none-any.whl'
+    records = []
+
+    for path, content in FILES.items():
+        digest = base64.urlsafe_b64encode(hashlib.sha256(content).digest()).rstrip(b'=')
+        records.append(f'{path},sha256={digest.decode()},{len(content)}')
+
+    records.append('demo-1.0.dist-info/RECORD,,')
+
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with zipfile.ZipFile(wheel, 'w') as archive:
+        for path, content in FILES.items():
+            archive.writestr(path, content)
+
+        archive.writestr('demo-1.0.dist-info/RECORD', '\n'.join(records) + '\n')
+
+    return wheel
+
+
+def create_env(directory: Path) -> SimpleNamespace:
+    scheme_dict = {
+        name: str(directory / name)
+        for name in ('purelib', 'platlib', 'scripts', 'data', 'include')
+    }
+
+    return SimpleNamespace(scheme_dict=scheme_dict, python=directory / 'bin' / 'python')
+
+
+def test_links_installed_files_into_the_store(tmp_path):
+    artifacts_dir = tmp_path / 'artifacts'
+    wheel = create_wheel(artifacts_dir)
+    store = WheelStore(tmp_path / 'store')
+
+    envs = [create_env(tmp_path / 'env-a'), create_env(tmp_path / 'env-b')]
+
+    for env in envs:
+        LinkingWheelInstaller(env, store, artifacts_dir).install(wheel)
+
+    entry = store.unpack(wheel)
+    stored_stat = (entry / 'demo' / '__init__.py').stat()
+
+    for env in envs:
+        purelib = Path(env.scheme_dict['purelib'])
+        installed = purelib / 'demo' / '__init__.py'
+
+        assert installed.read_bytes() == FILES['demo/__init__.py']
+        assert installed.stat().st_ino == stored_stat.st_ino
+
+        record = (purelib / 'demo-1.0.dist-info' / 'RECORD').read_text()
+
+        assert 'demo/data.txt,sha256=' in record
+        assert (purelib / 'demo-1.0.dist-info' / 'INSTALLER').read_text().startswith('Poetry')
+
+        # Scripts are generated for each environment rather than linked
+        script = Path(env.scheme_dict['scripts']) / 'demo'
+
+        assert str(env.python) in script.read_text()
+
+    assert stored_stat.st_nlink == 3
+
+
+def test_reinstalling_replaces_links_rather_than_writing_through_them(tmp_path):
+    artifacts_dir = tmp_path / 'artifacts'
+    wheel = create_wheel(artifacts_dir)
+    store = WheelStore(tmp_path / 'store')
+    env = create_env(tmp_path / 'env')
+
+    installer = LinkingWheelInstaller(env, store, artifacts_dir)
+    installer.install(wheel)
+
+    installed = Path(env.scheme_dict['purelib']) / 'demo' / '__init__.py'
+    installed.unlink()
+    installed.write_bytes(b'changed\n')
+
+    installer.install(wheel)
+
+    assert installed.read_bytes() == FILES['demo/__init__.py']
+    assert (store.unpack(wheel) / 'demo' / '__init__.py').read_bytes() == FILES['demo/__init__.py']
+
+
+def test_installs_wheels_outside_of_the_artifact_cache_without_the_store(tmp_path):
+    wheel = create_wheel(tmp_path / 'dist')
+    store = WheelStore(tmp_path / 'store')
+    env = create_env(tmp_path / 'env')
+
+    LinkingWheelInstaller(env, store, tmp_path / 'artifacts').install(wheel)
+
+    installed = Path(env.scheme_dict['purelib']) / 'demo' / '__init__.py'
+
+    assert installed.read_bytes() == FILES['demo/__init__.py']
+    assert installed.stat().st_nlink == 1
+    assert not store.directory.exists()
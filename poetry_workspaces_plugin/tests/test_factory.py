@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import tomlkit
+
+from poetry_workspaces_plugin.context import Context
+from poetry_workspaces_plugin.factory import Factory
+from testing.utils import add_workspace_pin
+
+
+def test_builds_workspaces_poetry_concurrently(test_package, create_context):
+    root_file, workspace_files = test_package
+
+    context = create_context()
+
+    with ThreadPoolExecutor() as executor:
+        futures = Factory().create_workspaces_poetry(context, executor)
+
+        built = {path: future.result() for path, future in futures.items()}
+
+    assert set(built) == {wf.path for wf in workspace_files}
+
+    for path, poetry in built.items():
+        assert poetry.package.name == path.parent.name
+        assert poetry.locker.lock == root_file.path.parent / 'poetry.lock'
+
+    project_a = built[workspace_files[0].path]
+
+    # Other workspaces are not merged into a workspace's own Poetry instance
+    requires = {d.name for d in project_a.package.all_requires}
+
+    assert 'pydantic' in requires
+    assert 'numpy' not in requires
+
+
+def test_shares_repository_pool_between_contexts(create_context):
+    context = create_context()
+
+    root_poetry = Factory().get_poetry(context.root_only())
+
+    with ThreadPoolExecutor() as executor:
+        futures = Factory().create_workspaces_poetry(context, executor)
+
+        pools = {id(future.result().pool) for future in futures.values()}
+
+    assert pools == {id(root_poetry.pool)}
+    assert len(context.pool_cache) == 1
+
+    root_pyproject = context.root_pyproject
+    unrelated = Factory().create_poetry(
+        Context(root_pyproject, root_pyproject, [], config=context.config)
+    )
+
+    assert unrelated.pool is not root_poetry.pool
+
+
+def test_building_workspaces_poetry_keeps_rendered_references(test_package, create_context):
+    root_file, _ = test_package
+
+    add_workspace_pin(root_file, 'project-a', '0.1.0')
+
+    context = create_context()
+
+    rendered = tomlkit.dumps(context.render(context.root_pyproject))
+
+    with ThreadPoolExecutor() as executor:
+        for future in Factory().create_workspaces_poetry(context, executor).values():
+            future.result()
+
+    assert '^0.1.0' in rendered
+    assert tomlkit.dumps(context.render(context.root_pyproject)) == rendered
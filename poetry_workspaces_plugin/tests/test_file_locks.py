@@ -0,0 +1,155 @@
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+from cleo.events.console_command_event import ConsoleCommandEvent
+from cleo.io.inputs.string_input import StringInput
+from cleo.io.io import IO
+from cleo.io.outputs.null_output import NullOutput
+from poetry.console.commands.version import VersionCommand
+
+from poetry_workspaces_plugin.config import LockGroup
+from poetry_workspaces_plugin.file_locks import (
+    FileLock,
+    LockModeError,
+    LockTimeoutError,
+    get_command_locks,
+)
+from poetry_workspaces_plugin.plugin import WorkspacesPlugin
+from poetry_workspaces_plugin.pyproject import PyProjectTOML
+from testing.utils import run
+
+
+def hold_lock(path, shared=False):
+    """Start a process that holds a lock until its input is closed."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            '-c',
+            textwrap.dedent(f'''
+                import sys
+                from pathlib import Path
+                from poetry_workspaces_plugin.file_locks import FileLock
+
+                with FileLock(Path({str(path)!r}), 'test', shared={shared}):
+                    print('locked', flush=True)
+                    sys.stdin.read()
+            '''),
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+    assert process.stdout.readline() == 'locked\n'
+
+    return process
+
+
+def release(process):
+    process.stdin.close()
+    process.wait()
+
+
+def test_exclusive_lock_waits_for_holder_and_reports_it(tmp_path):
+    path = tmp_path / 'resource.lock'
+    holder = hold_lock(path)
+
+    try:
+        with pytest.raises(LockTimeoutError, match=f'held by process {holder.pid}'):
+            FileLock(path, 'resource', timeout=0.2).acquire()
+
+        with pytest.raises(LockTimeoutError):
+            FileLock(path, 'resource', shared=True, timeout=0.2).acquire()
+    finally:
+        release(holder)
+
+    with FileLock(path, 'resource', timeout=0.2):
+        assert path.read_text().startswith(f'{os.getpid()} ')
+
+    assert path.read_text() == ''
+
+
+def test_shared_locks_only_exclude_writers(tmp_path):
+    path = tmp_path / 'resource.lock'
+    holder = hold_lock(path, shared=True)
+
+    try:
+        with FileLock(path, 'resource', shared=True, timeout=0.2):
+            pass
+
+        with pytest.raises(LockTimeoutError, match='held by another process'):
+            FileLock(path, 'resource', timeout=0.2).acquire()
+    finally:
+        release(holder)
+
+
+def test_commands_lock_the_resources_they_use(test_package, create_context):
+    _, workspace_files = test_package
+
+    context = create_context(lock_groups={'b': LockGroup(['packages/project-b'], True)})
+
+    locks = get_command_locks(context, 'install')
+
+    assert [(lock.description, lock.shared) for lock in locks] == [
+        ('root environment', False),
+        ('environment of lock group b', False),
+        ('lock file poetry.b.lock', True),
+        ('lock file poetry.lock', True),
+    ]
+
+    file_a = next(wf for wf in workspace_files if wf.path.parent.name == 'project-a')
+    context_a = context.with_target(PyProjectTOML(file_a.path))
+
+    locks = get_command_locks(context_a, 'add')
+
+    assert [(lock.description, lock.shared) for lock in locks] == [
+        ('root environment', False),
+        ('lock file poetry.lock', False),
+        ('packages/project-a/pyproject.toml', False),
+    ]
+
+    assert get_command_locks(context, 'run') == []
+
+
+def test_commands_wait_for_locks_held_by_other_processes(test_package, create_context):
+    root_file, _ = test_package
+
+    root_dir = root_file.path.parent
+    (lock,) = get_command_locks(create_context(), 'version')
+    holder = hold_lock(lock.path, shared=True)
+
+    try:
+        # Showing the version only reads the pyproject.toml
+        result = run(root_dir, ['poetry', 'version'])
+
+        assert 'Waiting for' not in result.error_output
+
+        threading.Timer(0.5, release, [holder]).start()
+
+        result = run(root_dir, ['poetry', 'version', '0.2.0'])
+    finally:
+        release(holder)
+
+    assert 'Waiting for pyproject.toml, held by another process' in result.error_output
+    assert 'Bumping version from 0.1.0 to 0.2.0' in result.output
+
+
+def test_nested_commands_do_not_change_what_their_caller_only_reads(create_context):
+    context = create_context()
+
+    plugin = WorkspacesPlugin()
+    plugin._context = context
+
+    (lock,) = get_command_locks(context, 'version', read_only=True)
+    plugin._command_locks.append((VersionCommand(), [lock]))
+
+    command = VersionCommand()
+    input = StringInput('0.2.0')
+    input.bind(command.definition)
+
+    with pytest.raises(LockModeError, match='only holds shared'):
+        plugin.acquire_locks(ConsoleCommandEvent(command, IO(input, NullOutput(), NullOutput())))
@@ -0,0 +1,110 @@
+import os
+
+from poetry_workspaces_plugin import hashing
+from poetry_workspaces_plugin.hashing import (
+    StatCache,
+    hash_directories,
+    iter_tree,
+    iter_workspace_files,
+    parse_gitignore,
+)
+
+
+def write(path, content=''):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def age(path):
+    """Make a file old enough for the stat cache to keep its digest."""
+    stat = path.stat()
+
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 * hashing.RACY_INTERVAL_NS))
+
+
+def test_skips_directories_while_walking(tmp_path):
+    write(tmp_path / 'module.py')
+    write(tmp_path / '__pycache__' / 'module.pyc')
+    write(tmp_path / 'nested' / 'pyproject.toml')
+    write(tmp_path / 'nested' / 'module.py')
+    write(tmp_path / 'other' / 'nested' / 'module.py')
+
+    paths = list(iter_tree(tmp_path, skip_dirs=frozenset({tmp_path / 'nested'})))
+
+    assert paths == ['module.py', 'other/nested/module.py']
+
+
+def test_parses_gitignore():
+    rules = parse_gitignore('# comment\n\n*.log\n/out\ncache/\n!keep.log\n')
+
+    assert [rule.pattern for rule in rules] == [
+        ('**', '*.log'),
+        ('out',),
+        ('**', 'cache'),
+        ('**', 'keep.log'),
+    ]
+    assert [rule.negate for rule in rules] == [False, False, False, True]
+    assert [rule.directory_only for rule in rules] == [False, False, True, False]
+
+
+def test_selects_workspace_files(tmp_path):
+    workspace_dir = tmp_path / 'packages' / 'a'
+
+    write(tmp_path / '.gitignore', '*.log\n')
+    write(workspace_dir / '.gitignore', '/out\n!keep.log\n')
+    write(workspace_dir / 'pyproject.toml')
+    write(workspace_dir / 'src' / 'a' / '__init__.py')
+    write(workspace_dir / 'src' / 'a' / 'debug.log')
+    write(workspace_dir / 'keep.log')
+    write(workspace_dir / 'out' / 'report.txt')
+    write(workspace_dir / 'out' / 'generated.py')
+    write(workspace_dir / 'docs' / 'index.md')
+    write(workspace_dir / 'nested' / 'pyproject.toml')
+    write(tmp_path / 'shared' / 'common.py')
+
+    data = {
+        'tool': {
+            'poetry': {
+                'exclude': ['docs/**'],
+                'include': ['out/generated.py'],
+                'packages': [{'include': 'common.py', 'from': '../../shared'}],
+            },
+        },
+    }
+
+    files = iter_workspace_files(data, workspace_dir, tmp_path, skip=[workspace_dir / 'nested'])
+
+    assert [name for name, _ in files] == [
+        '../../shared/common.py',
+        '.gitignore',
+        'keep.log',
+        'out/generated.py',
+        'pyproject.toml',
+        'src/a/__init__.py',
+    ]
+
+
+def test_reuses_digests_of_unchanged_files(tmp_path, mocker):
+    workspace_dir = tmp_path / 'packages' / 'a'
+
+    write(workspace_dir / 'pyproject.toml')
+    write(workspace_dir / 'module.py', 'a = 1')
+
+    for path in workspace_dir.iterdir():
+        age(path)
+
+    cache_path = tmp_path / 'hash-stat.bin'
+
+    first = hash_directories(tmp_path, [workspace_dir], stat_cache=StatCache(cache_path))
+
+    spy = mocker.spy(hashing, 'hash_file')
+
+    assert hash_directories(tmp_path, [workspace_dir], stat_cache=StatCache(cache_path)) == first
+    assert spy.call_count == 0
+
+    write(workspace_dir / 'module.py', 'a = 2')
+
+    second = hash_directories(tmp_path, [workspace_dir], stat_cache=StatCache(cache_path))
+
+    assert second != first
+    assert spy.call_count == 1
@@ -0,0 +1,74 @@
+import pytest
+
+from poetry_workspaces_plugin.config import LockGroup
+from poetry_workspaces_plugin.factory import Factory
+from poetry_workspaces_plugin.pyproject import PyProjectTOML
+from testing.utils import add_workspace_pin
+
+
+def test_assigns_workspaces_to_groups(create_context):
+    context = create_context(lock_groups={'b': LockGroup(['packages/project-b'])})
+
+    assert context.workspace_lock_groups == {'project-a': None, 'project-b': 'b'}
+
+    groups = context.split_lock_groups()
+
+    assert [c.lock_group for c in groups] == [None, 'b']
+    assert [[w.name for w in c.workspaces] for c in groups] == [['project-a'], ['project-b']]
+
+
+def test_detached_groups_share_no_documents(create_context):
+    context = create_context(lock_groups={'b': LockGroup(['packages/project-b'])})
+    groups = [group.detached() for group in context.split_lock_groups()]
+
+    documents = [
+        {id(pyproject) for pyproject in (c.root_pyproject, *c.workspaces_pyprojects)}
+        for c in [context, *groups]
+    ]
+
+    assert sum(len(d) for d in documents) == len(set().union(*documents))
+    assert [[w.name for w in c.workspaces] for c in groups] == [['project-a'], ['project-b']]
+    assert all(group.workspace_versions == context.workspace_versions for group in groups)
+
+
+def test_merges_and_locks_each_group_on_its_own(test_package, create_context):
+    root_file, workspace_files = test_package
+
+    root_dir = root_file.path.parent
+    context = create_context(lock_groups={'b': LockGroup(['packages/project-b'])})
+
+    root_poetry = Factory().get_poetry(context)
+    root_requires = {d.name for d in root_poetry.package.all_requires}
+
+    assert 'pydantic' in root_requires
+    assert 'numpy' not in root_requires
+    assert root_poetry.locker.lock == root_dir / 'poetry.lock'
+
+    file_b = next(wf for wf in workspace_files if wf.path.parent.name == 'project-b')
+    poetry_b = Factory().get_poetry(context.with_target(PyProjectTOML(file_b.path)))
+    requires_b = {d.name for d in poetry_b.package.all_requires}
+
+    assert 'numpy' in requires_b
+    assert 'pydantic' not in requires_b
+    assert poetry_b.locker.lock == root_dir / 'poetry.b.lock'
+
+
+def test_rejects_workspaces_in_several_groups(create_context):
+    context = create_context(
+        lock_groups={'a': LockGroup(['packages/*']), 'b': LockGroup(['packages/project-b'])},
+    )
+
+    with pytest.raises(ValueError, match='more than one lock group'):
+        context.workspace_lock_groups
+
+
+def test_rejects_references_across_groups(test_package, create_context):
+    _, workspace_files = test_package
+
+    file_a = next(wf for wf in workspace_files if wf.path.parent.name == 'project-a')
+    add_workspace_pin(file_a, 'project-b', '0.1.0')
+
+    context = create_context(lock_groups={'b': LockGroup(['packages/project-b'])})
+
+    with pytest.raises(ValueError, match='from another lock group'):
+        context.workspace_lock_groups
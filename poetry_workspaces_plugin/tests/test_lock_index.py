@@ -0,0 +1,79 @@
+import os
+from pathlib import Path
+
+from poetry_workspaces_plugin import lock_index
+from poetry_workspaces_plugin.lock_index import LockIndex
+from testing.utils import LOCK
+
+
+def write_lock(tmp_path: Path, content: str = LOCK) -> Path:
+    lock_path = tmp_path / 'poetry.lock'
+    lock_path.write_text(content)
+
+    return lock_path
+
+
+def test_indexes_packages_and_edges(tmp_path):
+    index = LockIndex.load(write_lock(tmp_path))
+
+    assert 'pydantic' in index
+    assert 'typing-extensions' in index
+    assert index.versions('Typing_Extensions') == ['4.12.2']
+
+    assert index.dependencies('pydantic') == {'annotated-types', 'pydantic-core', 'typing-extensions'}
+    assert index.dependents('typing-extensions') == {'pydantic', 'pydantic-core'}
+    assert index.closure(['pydantic-core']) == {'pydantic-core', 'typing-extensions'}
+
+    markers = {d.name: d.markers for d in index.packages['pydantic'][0].dependencies}
+
+    assert markers['typing-extensions'] == 'python_version < "3.13"'
+    assert markers['annotated-types'] is None
+
+
+def test_finds_shortest_path(tmp_path):
+    index = LockIndex.load(write_lock(tmp_path))
+
+    assert index.path_to(['pydantic'], 'typing-extensions') == ['pydantic', 'typing-extensions']
+    assert index.path_to(['pydantic-core'], 'annotated-types') is None
+
+
+def test_caches_index_by_content(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    lock_path = write_lock(tmp_path)
+
+    index = LockIndex.load(lock_path, cache_dir)
+
+    assert len(list(cache_dir.glob('*.bin'))) == 1
+
+    cached = LockIndex.load(lock_path, cache_dir)
+
+    assert cached.serialize() == index.serialize()
+
+    write_lock(tmp_path, LOCK.replace('0.7.0', '0.8.0'))
+
+    updated = LockIndex.load(lock_path, cache_dir)
+
+    assert updated.versions('annotated-types') == ['0.8.0']
+
+    # The index of the previous lock file is kept for when it comes back
+    assert len(list(cache_dir.glob('*.bin'))) == 2
+    assert not list(cache_dir.glob('*.tmp'))
+
+
+def test_evicts_least_recently_used_indexes(tmp_path, monkeypatch):
+    monkeypatch.setattr(lock_index, 'MAX_CACHED_INDEXES', 2)
+
+    cache_dir = tmp_path / 'cache'
+    lock_path = write_lock(tmp_path)
+
+    LockIndex.load(lock_path, cache_dir)
+    first = next(cache_dir.glob('*.bin'))
+
+    os.utime(first, ns=(0, 0))
+
+    for version in ('0.8.0', '0.9.0'):
+        write_lock(tmp_path, LOCK.replace('0.7.0', version))
+        LockIndex.load(lock_path, cache_dir)
+
+    assert len(list(cache_dir.glob('*.bin'))) == 2
+    assert not first.exists()
@@ -0,0 +1,77 @@
+from poetry.core.packages.dependency import Dependency
+from poetry.core.packages.package import Package
+from poetry.core.packages.project_package import ProjectPackage
+from poetry.repositories import Repository, RepositoryPool
+
+from poetry_workspaces_plugin.locking import (
+    PinnedRepositoryPool,
+    get_pinned_packages,
+    get_unpinned_packages,
+)
+
+
+def create_package(name, version, requires=()):
+    package = Package(name, version)
+
+    for dependency_name, constraint in requires:
+        package.add_dependency(Dependency(dependency_name, constraint))
+
+    return package
+
+
+def create_locked_packages():
+    return [
+        create_package('httpx', '0.27.0', [('httpcore', '>=1.0'), ('idna', '*')]),
+        create_package('httpcore', '1.0.5', [('h11', '>=0.13')]),
+        create_package('h11', '0.14.0'),
+        create_package('idna', '3.7'),
+        create_package('numpy', '1.26.4'),
+    ]
+
+
+def test_unpinned_packages_follow_changed_constraints():
+    root = ProjectPackage('root', '0.1.0')
+    root.add_dependency(Dependency('httpx', '>=0.28'))
+    root.add_dependency(Dependency('numpy', '>=1.0'))
+
+    unpinned = get_unpinned_packages(root, create_locked_packages())
+
+    assert unpinned == {'httpx', 'httpcore', 'h11', 'idna'}
+
+
+def test_unchanged_constraints_pin_everything():
+    root = ProjectPackage('root', '0.1.0')
+    root.add_dependency(Dependency('httpx', '>=0.27'))
+    root.add_dependency(Dependency('numpy', '>=1.0'))
+    root.add_dependency(Dependency('pydantic', '>=2.0'))
+
+    locked_packages = create_locked_packages()
+
+    unpinned = get_unpinned_packages(root, locked_packages)
+
+    assert unpinned == {'pydantic'}
+    assert set(get_pinned_packages(locked_packages, unpinned)) == {
+        'httpx',
+        'httpcore',
+        'h11',
+        'idna',
+        'numpy',
+    }
+
+
+def test_pinned_pool_serves_locked_versions():
+    repository = Repository('pypi', [
+        create_package('numpy', '1.26.4'),
+        create_package('numpy', '2.0.0'),
+        create_package('idna', '3.7'),
+        create_package('idna', '3.8'),
+    ])
+
+    pool = PinnedRepositoryPool(
+        RepositoryPool([repository]),
+        {'numpy': [create_package('numpy', '1.26.4')]},
+    )
+
+    assert [p.pretty_version for p in pool.find_packages(Dependency('numpy', '*'))] == ['1.26.4']
+    assert pool.find_packages(Dependency('numpy', '>=2.0')) == []
+    assert len(pool.find_packages(Dependency('idna', '*'))) == 2
@@ -0,0 +1,121 @@
+from poetry_workspaces_plugin.merge import merge_data
+from poetry_workspaces_plugin.utils import get_path
+
+
+def add_dependency(file, name, constraint, extras=()):
+    content = file.read()
+
+    if 'project' in content:
+        extras = f'[{",".join(extras)}]' if extras else ''
+
+        content['project']['dependencies'].append(f'{name}{extras} ({constraint})')
+    else:
+        spec = {'version': constraint, 'extras': list(extras)} if extras else constraint
+
+        content['tool']['poetry']['dependencies'][name] = spec
+
+    file.write(content)
+
+
+def get_dependencies(data):
+    if 'project' in data and get_path(data, 'project.dependencies') is not None:
+        return list(get_path(data, 'project.dependencies'))
+
+    return dict(get_path(data, 'tool.poetry.dependencies'))
+
+
+def test_intersects_constraints_of_all_workspaces(test_package, create_context):
+    _, workspace_files = test_package
+
+    add_dependency(workspace_files[1], 'Pydantic', '<3.0', extras=['email'])
+
+    provenance = {}
+
+    merged = get_dependencies(merge_data(create_context(merge_mode='intersect'), provenance))
+
+    if isinstance(merged, list):
+        pydantic = [r for r in merged if r.lower().startswith('pydantic')]
+
+        assert [r.lower() for r in pydantic] == ['pydantic[email] (>=2.0,<3.0)']
+        assert set(provenance['project.dependencies']['pydantic']) == {
+            ('project-a', 'pydantic (>=2.0)'),
+            ('project-b', 'Pydantic[email] (<3.0)'),
+        }
+    else:
+        keys = [k for k in merged if k.lower() == 'pydantic']
+
+        assert len(keys) == 1
+        assert merged[keys[0]] == {'version': '>=2.0,<3.0', 'extras': ['email']}
+        assert set(provenance['tool.poetry.dependencies']['pydantic']) == {
+            ('project-a', '>=2.0'),
+            ('project-b', '<3.0'),
+        }
+
+
+def test_keeps_declarations_that_cannot_be_combined(test_package, create_context):
+    _, workspace_files = test_package
+
+    add_dependency(workspace_files[1], 'pydantic', '<2.0')
+
+    provenance = {}
+
+    merged = get_dependencies(merge_data(create_context(merge_mode='intersect'), provenance))
+
+    assert provenance == {}
+
+    if isinstance(merged, list):
+        assert len([r for r in merged if r.startswith('pydantic')]) == 2
+    else:
+        # A table holds one declaration per package, which is the additive result
+        assert merged['pydantic'] == '<2.0'
+
+
+def test_additive_mode_is_unchanged(test_package, create_context):
+    _, workspace_files = test_package
+
+    add_dependency(workspace_files[1], 'pydantic', '<3.0')
+
+    provenance = {}
+
+    merged = get_dependencies(merge_data(create_context(merge_mode='additive'), provenance))
+
+    assert provenance == {}
+
+    if isinstance(merged, list):
+        assert len([r for r in merged if r.startswith('pydantic')]) == 2
+    else:
+        assert merged['pydantic'] in ('>=2.0', '<3.0')
+
+
+def add_workspace_reference(file, name):
+    content = file.read()
+
+    if 'project' in content:
+        content['project']['dependencies'].append(f'{name} @ workspace:')
+    else:
+        content['tool']['poetry']['dependencies'][name] = 'workspace:'
+
+    file.write(content)
+
+
+def test_renders_workspace_references_with_discovered_versions(test_package, create_context):
+    _, workspace_files = test_package
+
+    file_a, file_b = workspace_files
+
+    add_workspace_reference(file_b, 'project-a')
+
+    context = create_context(merge_mode='additive')
+
+    assert context.workspace_versions == {'project-a': '0.1.0', 'project-b': '0.1.0'}
+
+    # The map comes from discovery, without loading any workspace document
+    assert not any(workspace.is_loaded for workspace in context.workspaces)
+
+    target_b = context.with_target(context.find_workspace('project-b').pyproject)
+
+    assert 'project-a' in str(get_dependencies(target_b.render(target_b.target_pyproject)))
+
+    # References are resolved from workspace directories, so only builds keep them
+    assert 'project-a' not in str(get_dependencies(merge_data(target_b)))
+    assert '==0.1.0' in str(get_dependencies(merge_data(target_b.with_pinned_workspaces())))
@@ -0,0 +1,85 @@
+import subprocess
+import sys
+import tracemalloc
+
+import pytest
+
+from poetry_workspaces_plugin import pyproject
+from testing.utils import run
+
+
+# Modules the plugin needs to locate the root project and register its commands
+ACTIVATION_MODULES = {
+    'poetry_workspaces_plugin',
+    'poetry_workspaces_plugin.config',
+    'poetry_workspaces_plugin.constants',
+    'poetry_workspaces_plugin.counters',
+    'poetry_workspaces_plugin.discovery',
+    'poetry_workspaces_plugin.plugin',
+    'poetry_workspaces_plugin.pyproject',
+    'poetry_workspaces_plugin.utils',
+}
+
+# Extra import time allowed for `poetry --help` with the plugin, in microseconds
+IMPORT_TIME_BUDGET = 50_000
+
+
+def get_import_times(cwd, *args) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'poetry', *args, '--help'],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    import_times = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_time, _, name = line.removeprefix('import time:').split('|')
+
+        import_times[name.strip()] = int(self_time)
+
+    return import_times
+
+
+@pytest.mark.parametrize('inside', (True, False), ids=('workspaces', 'other'))
+def test_help_imports_stay_within_budget(test_package, tmp_path, inside):
+    root_file, _ = test_package
+
+    cwd = root_file.path.parent if inside else tmp_path
+
+    with_plugins = get_import_times(cwd)
+    without_plugins = get_import_times(cwd, '--no-plugins')
+
+    plugin_modules = {name for name in with_plugins if name.startswith('poetry_workspaces_plugin')}
+
+    assert plugin_modules <= ACTIVATION_MODULES
+    assert 'mergedeep' not in with_plugins
+
+    extra = sum(t for name, t in with_plugins.items() if name not in without_plugins)
+
+    assert extra < IMPORT_TIME_BUDGET
+
+
+def test_debug_traces_memory_from_activation(test_package, mocker):
+    root_file, _ = test_package
+
+    get_root_pyproject = pyproject.get_root_pyproject
+    tracing = []
+
+    def spy(*args, **kwargs):
+        tracing.append(tracemalloc.is_tracing())
+
+        return get_root_pyproject(*args, **kwargs)
+
+    mocker.patch.object(pyproject, 'get_root_pyproject', spy)
+
+    result = run(root_file.path.parent, ['poetry', 'workspaces', 'list', '--workspaces-debug'])
+
+    assert tracing == [True]
+    assert 'peak memory' in result.error_output
+    assert not tracemalloc.is_tracing()
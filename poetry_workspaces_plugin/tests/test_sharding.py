@@ -0,0 +1,41 @@
+import pytest
+
+from poetry_workspaces_plugin.sharding import Timings, parse_shard, partition
+
+
+def test_parses_shards():
+    assert parse_shard('2/4') == (2, 4)
+
+    for value in ('0/4', '5/4', '1', 'a/b'):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+
+def test_balances_by_duration():
+    durations = {'a': 20.0, 'b': 1.0, 'c': 1.0, 'd': 9.0, 'e': 10.0}
+
+    bins = partition(['e', 'd', 'c', 'b', 'a'], durations, 2)
+
+    assert bins == [['a', 'c'], ['b', 'd', 'e']]
+
+
+def test_assumes_average_duration_for_new_names():
+    bins = partition(['a', 'b', 'c'], {'a': 4.0, 'b': 2.0}, 2)
+
+    # c counts as 3 seconds, so it joins the lighter bin
+    assert bins == [['a'], ['b', 'c']]
+
+
+def test_slices_by_count_without_durations():
+    assert partition(['e', 'd', 'c', 'b', 'a'], {}, 2) == [['a', 'b', 'c'], ['d', 'e']]
+    assert partition(['a'], {}, 3) == [['a'], [], []]
+
+
+def test_smooths_recorded_durations(tmp_path):
+    timings = Timings(tmp_path / 'timings.json')
+
+    timings.record('a', 4.0)
+    timings.record('a', 2.0)
+    timings.save()
+
+    assert Timings(tmp_path / 'timings.json').durations == {'a': 3.0}
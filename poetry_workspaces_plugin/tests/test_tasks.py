@@ -0,0 +1,93 @@
+from poetry_workspaces_plugin.lock_index import LockIndex
+from poetry_workspaces_plugin.tasks import (
+    DirectoryBackend,
+    TaskCache,
+    get_input_hashes,
+    read_entry,
+    restore_outputs,
+)
+from testing.utils import add_workspace_pin
+
+
+def test_input_hashes_include_referenced_workspaces(test_package, create_context):
+    _, workspace_files = test_package
+
+    file_a, file_b = sorted(workspace_files, key=lambda wf: wf.path.parent.name)
+
+    add_workspace_pin(file_b, 'project-a', '0.1.0')
+
+    before = get_input_hashes(create_context(), {})
+
+    (file_a.path.parent / 'module.py').write_text('')
+
+    after = get_input_hashes(create_context(), {})
+
+    assert before['project-a'] != after['project-a']
+    assert before['project-b'] != after['project-b']
+
+    (file_b.path.parent / 'module.py').write_text('')
+
+    assert get_input_hashes(create_context(), {})['project-a'] == after['project-a']
+
+
+def test_input_hashes_include_root_configuration(test_package, create_context):
+    root_file, _ = test_package
+
+    root_data = root_file.read()
+    root_data['dependency-groups'] = {'dev': ['pytest']}
+    root_file.write(root_data)
+
+    def lock_index(version):
+        return LockIndex.from_lock_data({'package': [{'name': 'pytest', 'version': version}]})
+
+    before = get_input_hashes(create_context(), {None: lock_index('8.0.0')})
+    after = get_input_hashes(create_context(), {None: lock_index('8.1.0')})
+
+    assert before['project-a'] != after['project-a']
+
+    root_data['tool']['pytest'] = {'ini_options': {'addopts': '-x'}}
+    root_file.write(root_data)
+
+    assert get_input_hashes(create_context(), {None: lock_index('8.1.0')}) != after
+
+
+def test_copies_remote_hits_to_local_backend(tmp_path):
+    local = DirectoryBackend(tmp_path / 'local')
+    remote = DirectoryBackend(tmp_path / 'remote')
+
+    workspace_dir = tmp_path / 'workspace'
+    (workspace_dir / 'dist').mkdir(parents=True)
+    (workspace_dir / 'dist' / 'report.txt').write_text('report')
+
+    outputs = [workspace_dir / 'dist' / 'report.txt']
+
+    TaskCache([remote]).put('key', 'out', 'err', workspace_dir, outputs)
+
+    entry = TaskCache([local, remote]).get('key')
+
+    assert entry is not None
+    assert local.get('key') is not None
+    assert read_entry(entry)['stdout'] == 'out'
+
+    (workspace_dir / 'dist' / 'report.txt').unlink()
+
+    assert restore_outputs(entry, workspace_dir) == [workspace_dir / 'dist' / 'report.txt']
+    assert (workspace_dir / 'dist' / 'report.txt').read_text() == 'report'
+
+
+def test_cached_outputs_do_not_change_with_the_workspace(tmp_path):
+    backend = DirectoryBackend(tmp_path / 'cache')
+
+    workspace_dir = tmp_path / 'workspace'
+    (workspace_dir / 'dist').mkdir(parents=True)
+    (workspace_dir / 'dist' / 'report.txt').write_text('report')
+
+    TaskCache([backend]).put('key', '', '', workspace_dir, [workspace_dir / 'dist' / 'report.txt'])
+
+    # Tasks may rewrite their outputs in place on the next run
+    with open(workspace_dir / 'dist' / 'report.txt', 'w') as f:
+        f.write('changed')
+
+    restore_outputs(backend.get('key'), tmp_path / 'restored')
+
+    assert (tmp_path / 'restored' / 'dist' / 'report.txt').read_text() == 'report'
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from poetry_workspaces_plugin.transaction import FileTransaction
+
+
+def test_commit_writes_all_files(tmp_path):
+    a = tmp_path / 'a.toml'
+    b = tmp_path / 'b.toml'
+
+    a.write_text('a = 1\n')
+
+    with FileTransaction() as transaction:
+        transaction.stage(a, 'a = 2\n')
+        transaction.stage(b, 'b = 2\n')
+
+    assert a.read_text() == 'a = 2\n'
+    assert b.read_text() == 'b = 2\n'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.toml', 'b.toml']
+
+
+def test_failed_commit_restores_files(tmp_path, mocker):
+    a = tmp_path / 'a.toml'
+    b = tmp_path / 'b.toml'
+
+    a.write_text('a = 1\n')
+    b.write_text('b = 1\n')
+
+    replace = os.replace
+
+    def fail_on_b(src, dst):
+        if dst == b:
+            raise OSError('disk full')
+
+        replace(src, dst)
+
+    mocker.patch('poetry_workspaces_plugin.transaction.os.replace', side_effect=fail_on_b)
+
+    transaction = FileTransaction()
+    transaction.stage(a, 'a = 2\n')
+    transaction.stage(b, 'b = 2\n')
+
+    with pytest.raises(OSError):
+        transaction.commit()
+
+    assert a.read_text() == 'a = 1\n'
+    assert b.read_text() == 'b = 1\n'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.toml', 'b.toml']
+
+
+def test_rollback_restores_tracked_files(tmp_path):
+    existing = tmp_path / 'poetry.lock'
+    missing = tmp_path / 'poetry.data.lock'
+
+    existing.write_text('# previous lock\n')
+
+    transaction = FileTransaction()
+    transaction.track(existing)
+    transaction.track(missing)
+    transaction.stage(tmp_path / 'a.toml', 'a = 2\n')
+    transaction.commit()
+
+    # Written by something else after the commit, such as the lock command
+    existing.write_text('# new lock\n')
+    missing.write_text('# new lock\n')
+
+    transaction.rollback()
+
+    assert existing.read_text() == '# previous lock\n'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['poetry.lock']
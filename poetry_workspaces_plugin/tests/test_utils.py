@@ -0,0 +1,153 @@
+import pytest
+import tomlkit
+
+from poetry_workspaces_plugin.utils import (
+    delete_path,
+    get_dependency_from_content,
+    update_from_diff,
+    update_list_from_diff,
+)
+
+
+def test_update_from_diff_preserves_target_only_items():
+    target = tomlkit.parse(
+        '[project]\n'
+        'dependencies = [\n'
+        '    "numpy (>=1.0)",  # pinned for abi\n'
+        '    "package-b @ workspace:^",\n'
+        ']\n'
+    )
+
+    old = {'project': {'dependencies': ['numpy (>=1.0)', 'pydantic (>=2.0)']}}
+    new = {'project': {'dependencies': ['numpy (>=1.0)', 'pydantic (>=2.0)', 'attrs (>=23.0)']}}
+
+    update_from_diff(old, new, target)
+
+    assert target['project']['dependencies'] == [
+        'numpy (>=1.0)',
+        'package-b @ workspace:^',
+        'attrs (>=23.0)',
+    ]
+    assert '# pinned for abi' in tomlkit.dumps(target)
+
+
+def test_update_from_diff_removes_items_in_place():
+    target = tomlkit.parse(
+        '[project]\n'
+        'dependencies = ["numpy (>=1.0)", "pydantic (>=2.0)"]\n'
+        '\n'
+        '[tool.poetry.dependencies]\n'
+        'requests = "*"  # keep\n'
+        'httpx = "*"\n'
+    )
+
+    dependencies = target['project']['dependencies']
+
+    old = {
+        'project': {'dependencies': ['numpy (>=1.0)', 'pydantic (>=2.0)']},
+        'tool': {'poetry': {'dependencies': {'requests': '*', 'httpx': '*'}}},
+    }
+    new = {
+        'project': {'dependencies': ['pydantic (>=2.0)']},
+        'tool': {'poetry': {'dependencies': {'requests': '*'}}},
+    }
+
+    update_from_diff(old, new, target)
+
+    assert target['project']['dependencies'] is dependencies
+    assert dependencies == ['pydantic (>=2.0)']
+    assert tomlkit.dumps(target).endswith('requests = "*"  # keep\n')
+
+
+def test_update_from_diff_merges_added_tables_into_existing():
+    target = tomlkit.parse('[tool.poetry.group.dev.dependencies]\nipdb = "*"\n')
+
+    old = {}
+    new = {'tool': {'poetry': {'group': {'dev': {'dependencies': {'ipython': '*'}}}}}}
+
+    update_from_diff(old, new, target)
+
+    assert target['tool']['poetry']['group']['dev']['dependencies'] == {
+        'ipdb': '*',
+        'ipython': '*',
+    }
+
+
+@pytest.mark.parametrize('source', (
+    'a = ["x", "y", "z"]',
+    'a = [ "x", "y", "z" ]',
+    'a = [\n    "x",  # first\n    "y",\n    # between\n    "z",\n]',
+    'a = [\n    "x"\n  , "y"\n  , "z"\n]',
+))
+def test_update_list_from_diff_formats_like_item_by_item_edits(source):
+    old = ['x', 'y', 'z']
+    new = ['y', 'n-1', 'n-2', 'n-3']
+
+    target = tomlkit.parse(source)
+    expected = tomlkit.parse(source)
+
+    update_list_from_diff(old, new, target['a'])
+
+    # The same edits through tomlkit's own methods, one item at a time
+    del expected['a'][2]
+    del expected['a'][0]
+
+    for item in new[1:]:
+        expected['a'].append(item)
+
+    assert target['a'] == ['y', 'n-1', 'n-2', 'n-3']
+    assert tomlkit.dumps(target) == tomlkit.dumps(expected)
+
+
+def test_update_list_from_diff_applies_large_diffs_to_arrays():
+    n = 2_000
+
+    old = [f'package-{i}' for i in range(n)]
+    target = tomlkit.parse(f'a = {old}')['a']
+
+    new = [*old[n // 2:], *(f'added-{i}' for i in range(n // 2))]
+
+    update_list_from_diff(old, new, target)
+
+    assert list(target) == new
+    assert tomlkit.parse(tomlkit.dumps({'a': target}))['a'] == new
+
+
+def test_delete_path_missing_parent():
+    data = {'project': {'name': 'project-a'}}
+
+    delete_path(data, 'tool.poetry.source')
+
+    assert data == {'project': {'name': 'project-a'}}
+
+    data = {'tool': {'poetry': {'source': [], 'name': 'project-a'}}}
+
+    delete_path(data, 'tool.poetry.source')
+
+    assert data == {'tool': {'poetry': {'name': 'project-a'}}}
+
+    data = {'tool': {'poetry': 'not a table'}}
+
+    delete_path(data, 'tool.poetry.source')
+
+    assert data == {'tool': {'poetry': 'not a table'}}
+
+
+def test_gets_dependencies_from_loaded_content():
+    content = tomlkit.parse(
+        '[project]\n'
+        'dependencies = ["Pydantic (>=2.0)"]\n'
+        '\n'
+        '[dependency-groups]\n'
+        'test = ["pytest (>=8.0)"]\n'
+        '\n'
+        '[tool.poetry.group.dev.dependencies]\n'
+        'ipdb = "*"\n'
+    )
+
+    assert get_dependency_from_content(content, 'pydantic').location == 'project.dependencies'
+    assert get_dependency_from_content(content, 'pytest').location == 'dependency-groups.test'
+    assert get_dependency_from_content(content, 'ipdb', 'dev').location == (
+        'tool.poetry.group.dev.dependencies'
+    )
+    assert get_dependency_from_content(content, 'numpy') is None
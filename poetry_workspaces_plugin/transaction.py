@@ -0,0 +1,81 @@
+import os
+import tempfile
+from pathlib import Path
+
+
+class FileTransaction:
+    """Apply writes to several files together, or not at all.
+
+    Staged contents are first written to temporary files next to their targets, so any
+    failure while serializing leaves every target untouched. The temporary files are
+    then moved over the targets, and if any move fails the targets already replaced are
+    restored to their original contents.
+    """
+
+    def __init__(self) -> None:
+        self._staged: dict[Path, str] = {}
+        self._originals: dict[Path, bytes | None] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+
+    @property
+    def paths(self) -> list[Path]:
+        return list(self._staged)
+
+    def stage(self, path: Path, content: str):
+        """Stage the new content of a file."""
+        self._staged[path] = content
+
+    def track(self, path: Path):
+        """Restore a file that something else writes on rollback, or remove it if missing."""
+        if path not in self._originals:
+            self._originals[path] = path.read_bytes() if path.exists() else None
+
+    def commit(self):
+        """Write all staged files, restoring the originals if any write fails."""
+        temporary: dict[Path, Path] = {}
+
+        try:
+            for path, content in self._staged.items():
+                fd, name = tempfile.mkstemp(prefix=f'.{path.name}.', dir=path.parent)
+
+                temporary[path] = Path(name)
+
+                with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                if path.exists():
+                    os.chmod(name, path.stat().st_mode)
+
+            for path, temporary_path in temporary.items():
+                self.track(path)
+
+                os.replace(temporary_path, path)
+
+        except BaseException:
+            self.rollback()
+
+            raise
+
+        finally:
+            for temporary_path in temporary.values():
+                temporary_path.unlink(missing_ok=True)
+
+        self._staged.clear()
+
+    def rollback(self):
+        """Restore every file replaced by this transaction to its original content."""
+        for path, original in self._originals.items():
+            if original is None:
+                path.unlink(missing_ok=True)
+            else:
+                path.write_bytes(original)
+
+        self._originals.clear()
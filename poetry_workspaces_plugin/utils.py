@@ -7,13 +7,15 @@ from typing import Any, TypeVar, cast
 from poetry.core.packages.dependency import Dependency
 from poetry.core.packages.dependency_group import MAIN_GROUP
 from poetry.core.packages.utils.utils import convert_markers
-from poetry.factory import Factory
+from poetry.core.factory import Factory
 from poetry.core.packages.dependency import Dependency
 from poetry.toml import TOMLFile
 from tomlkit import TOMLDocument, inline_table, table
 from tomlkit.api import array
 from tomlkit.items import Table
 
+from poetry_workspaces_plugin import counters
+
 
 T = TypeVar('T')
 
@@ -64,40 +66,103 @@ def dedupe(o: Any):
         return o
 
 
+def _item_key(item: Any) -> Any:
+    """Get a hashable key for a list item so that list diffs can be set based."""
+    if hasattr(item, 'unwrap'):
+        item = item.unwrap()
+
+    if isinstance(item, (dict, list)):
+        return json.dumps(item, sort_keys=True, default=str)
+
+    return item
+
+
+def _remove_list_items(target_list: list, removed: set):
+    """Remove the items whose keys are in removed from a list."""
+    # Deleted back to front through the list's own methods, which keep the formatting of
+    # tomlkit arrays consistent
+    for i in reversed(range(len(target_list))):
+        if _item_key(target_list[i]) in removed:
+            del target_list[i]
+
+
+def update_list_from_diff(old_list: list, new_list: list, target_list: list):
+    """Update target_list in place by applying differences between old_list and new_list.
+
+    Items removed between old_list and new_list are deleted from target_list and items
+    added are appended in the order they appear in new_list. Items only present in
+    target_list are left untouched, as is the position of every retained item.
+    """
+    old_keys = {_item_key(item) for item in old_list}
+    new_keys = {_item_key(item) for item in new_list}
+
+    removed = old_keys - new_keys
+
+    if removed:
+        _remove_list_items(target_list, removed)
+
+    target_keys = {_item_key(item) for item in target_list}
+    added = []
+
+    for item in new_list:
+        key = _item_key(item)
+
+        if key not in old_keys and key not in target_keys:
+            added.append(item)
+            target_keys.add(key)
+
+    for item in added:
+        target_list.append(item)
+
+
 def update_from_diff(old_dict, new_dict, target_dict):
-    """Update target_dict by applying differences between old_dict and new_dict."""
+    """Update target_dict in place by applying differences between old_dict and new_dict.
+
+    Existing containers in target_dict are edited rather than replaced so that a
+    tomlkit document keeps the formatting of every entry that did not change.
+    """
     # Handle added or modified keys
     for key in new_dict:
         new_val = new_dict[key]
-        old_val = old_dict.get(key)
+        target_val = target_dict.get(key)
+
+        if key in old_dict:
+            old_val = old_dict[key]
+
+            if old_val == new_val:
+                continue
 
-        if key not in old_dict:
+        elif isinstance(new_val, dict) and isinstance(target_val, dict):
+            # Key was added but target already has a table for it - merge into it
+            old_val = {}
+
+        elif isinstance(new_val, list) and isinstance(target_val, list):
+            old_val = []
+
+        else:
             # Key was added - add to target
-            target_dict[key] = new_val
+            if key not in target_dict or target_val != new_val:
+                target_dict[key] = new_val
 
-        elif old_val != new_val:
-            if isinstance(old_val, dict) and isinstance(new_val, dict):
-                # Recursively handle nested dictionaries
-                if key not in target_dict:
-                    target_dict[key] = {}
+            continue
 
-                update_from_diff(old_val, new_val, target_dict[key])
+        if isinstance(old_val, dict) and isinstance(new_val, dict):
+            # Recursively handle nested dictionaries
+            if not isinstance(target_val, dict):
+                target_dict[key] = {}
 
-            elif isinstance(old_val, list) and isinstance(new_val, list):
-                # Handle list differences - add new items, remove missing ones
-                if key not in target_dict:
-                    target_dict[key] = []
+            update_from_diff(old_val, new_val, target_dict[key])
 
-                # Remove items that are in old but not in new
-                target_dict[key] = [item for item in target_dict[key] if item in new_val]
+        elif isinstance(old_val, list) and isinstance(new_val, list):
+            # Handle list differences - add new items, remove missing ones
+            if not isinstance(target_val, list):
+                target_dict[key] = []
 
-                # Add items that are in new but not in target
-                for item in new_val:
-                    if item not in target_dict[key]:
-                        target_dict[key].append(item)
-            else:
-                # Simple value change
-                target_dict[key] = new_val
+            update_list_from_diff(old_val, new_val, target_dict[key])
+
+        elif target_val != new_val:
+            # Simple value change
+            target_dict[key] = new_val
 
     # Handle removed keys
     for key in old_dict:
@@ -136,8 +201,12 @@ def delete_path(o: dict[str, Any], path: str):
         key = path
         keys = []
 
-    for key in keys:
-        o = o.get(key, dict)
+    for k in keys:
+        o = o.get(k)
+
+        # Nothing to delete below a missing table or a value that is not one
+        if not isinstance(o, dict):
+            return
 
     if key in o:
         del o[key]
@@ -209,9 +278,18 @@ def get_dependency_from_pyproject(
     group_name: str | None = None,
 ) -> ResolvedDependency | None:
     """Get the spec and dot notation path of a package (if it exists) in a pyproject file."""
-    group_name = group_name if group_name != MAIN_GROUP else None
+    counters.count(counters.TOML_PARSE)
+
+    return get_dependency_from_content(TOMLFile(pyproject_path).read(), package, group_name)
 
-    content = TOMLFile(pyproject_path).read()
+
+def get_dependency_from_content(
+    content: dict[str, Any],
+    package: str,
+    group_name: str | None = None,
+) -> ResolvedDependency | None:
+    """Get the spec and dot notation path of a package (if it exists) in pyproject data."""
+    group_name = group_name if group_name != MAIN_GROUP else None
 
     groups_content = content.get('dependency-groups', {})
     poetry_content = content.get('tool', {}).get('poetry', {})
@@ -241,7 +319,7 @@ def get_dependency_from_pyproject(
             location = f'dependency-groups.{group_name}'
 
             if res := get_dependency(package, content, location):
-               return res
+                return res
 
         location = 'tool.poetry.dependencies'
 
@@ -8,6 +8,61 @@ from poetry.console.application import Application
 from poetry.core.packages.dependency import Dependency
 from tomlkit import TOMLDocument
 
+from poetry_workspaces_plugin.constants import SECTION_KEY
+
+
+# Lock file of pydantic and its dependencies, in the format of Poetry 2
+LOCK = '''
+[[package]]
+name = "Pydantic"
+version = "2.8.0"
+description = ""
+optional = false
+python-versions = ">=3.8"
+groups = ["main"]
+files = []
+
+[package.dependencies]
+annotated-types = ">=0.4.0"
+pydantic-core = "2.20.0"
+typing-extensions = {version = ">=4.6.1", markers = "python_version < \\"3.13\\""}
+
+[[package]]
+name = "pydantic-core"
+version = "2.20.0"
+description = ""
+optional = false
+python-versions = ">=3.8"
+groups = ["main"]
+files = []
+
+[package.dependencies]
+typing-extensions = ">=4.6.0,!=4.7.0"
+
+[[package]]
+name = "annotated-types"
+version = "0.7.0"
+description = ""
+optional = false
+python-versions = ">=3.8"
+groups = ["main"]
+files = []
+
+[[package]]
+name = "typing_extensions"
+version = "4.12.2"
+description = ""
+optional = false
+python-versions = ">=3.8"
+groups = ["main"]
+files = []
+
+[metadata]
+lock-version = "2.1"
+python-versions = ">=3.11"
+content-hash = "0"
+'''
+
 
 def create_project_pyproject(
     name: str,
@@ -99,7 +154,10 @@ def run(working_dir: Path, args: list[str]):
     app = Application()
     app._auto_exit = False
 
-    input = ArgvInput([*args, '--directory', working_dir.as_posix()])
+    # Pass the directory before the command so it is not taken as an argument after `--`
+    program, *command = args
+
+    input = ArgvInput([program, '--directory', working_dir.as_posix(), *command])
 
     output = StreamOutput(StringIO())
     error_output = StreamOutput(StringIO())
@@ -112,3 +170,72 @@ def run(working_dir: Path, args: list[str]):
     result = RunResult(app, output.stream.read(), error_output.stream.read())
 
     return result
+
+
+def create_synthetic_repo(root: Path, n: int):
+    """Create a monorepo of n workspaces without external dependencies, so that commands
+    run offline. Each workspace references the previous one, and `vendor/lib` is a local
+    package that can be added to workspaces."""
+    root.mkdir(parents=True, exist_ok=True)
+
+    (root / 'pyproject.toml').write_text(
+        '[project]\n'
+        'name = "synthetic-root"\n'
+        'version = "0.1.0"\n'
+        'requires-python = ">=3.11,<4.0"\n'
+        '\n'
+        '[tool.poetry]\n'
+        'package-mode = false\n'
+        '\n'
+        f'[tool.{SECTION_KEY}]\n'
+        'workspaces = ["packages/*"]\n'
+    )
+    (root / 'poetry.toml').write_text('[virtualenvs]\nin-project = true\n')
+
+    build_system = (
+        '[build-system]\n'
+        'requires = ["poetry-core"]\n'
+        'build-backend = "poetry.core.masonry.api"\n'
+    )
+
+    for i in range(n):
+        workspace_dir = root / 'packages' / f'package-{i}'
+        (workspace_dir / f'package_{i}').mkdir(parents=True)
+        (workspace_dir / f'package_{i}' / '__init__.py').write_text('')
+
+        dependencies = f'["package-{i - 1} @ workspace:"]' if i else '[]'
+
+        (workspace_dir / 'pyproject.toml').write_text(
+            '[project]\n'
+            f'name = "package-{i}"\n'
+            'version = "0.1.0"\n'
+            'requires-python = ">=3.11,<4.0"\n'
+            f'dependencies = {dependencies}\n'
+            '\n'
+            f'{build_system}'
+        )
+
+    lib_dir = root / 'vendor' / 'lib'
+    (lib_dir / 'lib').mkdir(parents=True)
+    (lib_dir / 'lib' / '__init__.py').write_text('')
+    (lib_dir / 'pyproject.toml').write_text(
+        '[project]\n'
+        'name = "lib"\n'
+        'version = "1.0.0"\n'
+        'requires-python = ">=3.11"\n'
+        '\n'
+        f'{build_system}'
+    )
+
+
+def add_workspace_pin(file, name, version):
+    content = file.read()
+
+    if 'project' in content:
+        content['project'].setdefault('dependencies', []).append(
+            f'{name} @ workspace:^{version}'
+        )
+    else:
+        content['tool']['poetry']['dependencies'][name] = f'workspace:^{version}'
+
+    file.write(content)